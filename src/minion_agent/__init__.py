@@ -1,3 +1,9 @@
-from .browser import MinionAgent
+from .browser import (
+    MinionAgent, BrowserPool, ExtractionCache, NavigationPolicy,
+    SearchAggregator, SearchBackend, GoogleSearchBackend, DuckDuckGoSearchBackend, StubSearchBackend
+)
 
-__all__ = ['MinionAgent'] 
\ No newline at end of file
+__all__ = [
+    'MinionAgent', 'BrowserPool', 'ExtractionCache', 'NavigationPolicy',
+    'SearchAggregator', 'SearchBackend', 'GoogleSearchBackend', 'DuckDuckGoSearchBackend', 'StubSearchBackend'
+]
@@ -1,3 +1,12 @@
 from .main import MinionAgent
+from .utils.browser_pool import BrowserPool
+from .utils.extraction_cache import ExtractionCache
+from .services.navigation import NavigationPolicy
+from .services.search_backends import (
+    SearchAggregator, SearchBackend, GoogleSearchBackend, DuckDuckGoSearchBackend, StubSearchBackend
+)
 
-__all__ = ['MinionAgent']
+__all__ = [
+    'MinionAgent', 'BrowserPool', 'ExtractionCache', 'NavigationPolicy',
+    'SearchAggregator', 'SearchBackend', 'GoogleSearchBackend', 'DuckDuckGoSearchBackend', 'StubSearchBackend'
+]
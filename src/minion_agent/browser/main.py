@@ -1,13 +1,18 @@
 import asyncio
 import logging
 import argparse
-from typing import Optional, Union
-from playwright.async_api import async_playwright
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Tuple, Union
 from langchain_openai import ChatOpenAI
 from langchain_core.language_models.base import BaseLanguageModel
 from .utils.browser_wrapper import BrowserWrapper
+from .utils.browser_pool import BrowserPool
 from .utils.page_extraction_llm import OpenAIPageExtractionLLM
-from .services.orchestrator import ai_web_scraper
+from .utils.extraction_cache import ExtractionCache
+from .utils.resource_blocking import RESOURCE_PROFILES, apply_resource_profile
+from .services.orchestrator import ai_web_scraper, stream_web_scraper
+from .services.navigation import NavigationPolicy
+from .services.search_backends import SearchAggregator
 from .utils.mcp_planner import MCPPlanner
 
 
@@ -17,21 +22,50 @@ logger = logging.getLogger(__name__)
 class MinionAgent:
     def __init__(
         self,
-        task: str,
+        task: Optional[str] = None,
         llm: Optional[Union[BaseLanguageModel, ChatOpenAI]] = None,
-        headless: bool = False
+        headless: bool = False,
+        browser_pool: Optional[BrowserPool] = None,
+        fanout: int = 1,
+        extraction_cache: Optional[ExtractionCache] = None,
+        resource_profile: str = "full",
+        blocked_domains: Optional[List[str]] = None,
+        navigation_policy: Optional[NavigationPolicy] = None,
+        prefetch: int = 0,
+        search_backend: Optional[SearchAggregator] = None
     ):
         """
         Initialize the Agent with a task and configuration.
         
         Args:
-            task: The user-defined task or prompt
+            task: The user-defined task or prompt (optional when only using run_many)
             llm: A language model instance (e.g., ChatOpenAI) that implements an 'analyze' method.
                  If not provided, will create a default ChatOpenAI instance
             headless: Whether to run browser in headless mode
+            browser_pool: Optional long-lived BrowserPool to lease contexts from.
+                 When omitted, each run launches and closes its own browser
+            fanout: Number of search results to open and extract in parallel on each NAVIGATE
+            extraction_cache: Optional ExtractionCache shared by every run of this agent
+            resource_profile: Page-load profile, "full", "no_media" or "text_only"
+            blocked_domains: Hosts whose requests are aborted; defaults to common ad and
+                 analytics hosts for the lighter profiles
+            navigation_policy: Readiness strategy, per-domain timeouts and deadline for page loads
+            prefetch: Number of likely next search results to load and extract in the
+                 background while the planner decides (0 disables speculative prefetching)
+            search_backend: Optional SearchAggregator used instead of the built-in Google search
         """
         self.task = task
         self.headless = headless
+        self.browser_pool = browser_pool
+        self.fanout = fanout
+        self.extraction_cache = extraction_cache
+        if resource_profile not in RESOURCE_PROFILES:
+            raise ValueError(f"Unknown resource profile '{resource_profile}'")
+        self.resource_profile = resource_profile
+        self.blocked_domains = blocked_domains
+        self.navigation_policy = navigation_policy
+        self.prefetch = prefetch
+        self.search_backend = search_backend
         
         # Initialize LLM
         if llm is None:
@@ -39,55 +73,161 @@ class MinionAgent:
         self.llm = llm
         self.result = None
 
-    async def run(self):
+    @asynccontextmanager
+    async def _lease_context(self):
+        """
+        Yield a BrowserContext, leased from the shared pool when one is attached,
+        otherwise from a single-use pool that is torn down afterwards.
+        """
+        if self.browser_pool is not None:
+            async with self.browser_pool.lease() as context:
+                yield context
+        else:
+            async with BrowserPool(size=1, headless=self.headless) as pool:
+                async with pool.lease() as context:
+                    yield context
+
+    async def _prepare_task(self, context) -> Tuple[BrowserWrapper, OpenAIPageExtractionLLM, MCPPlanner]:
+        """
+        Open a fresh page in the given browser context and build the per-task
+        planner and extraction LLM (for function calling).
         """
-        Set up Playwright, create the browser context, and run the orchestrator with the provided task.
+        await apply_resource_profile(context, self.resource_profile, self.blocked_domains)
+        page = await context.new_page()
+        browser_wrapper = BrowserWrapper(page, self.navigation_policy)
+        mcp_planner = MCPPlanner(self.llm)
+        extraction_llm = OpenAIPageExtractionLLM(llm=self.llm, cache=self.extraction_cache)
+        return browser_wrapper, extraction_llm, mcp_planner
+
+    async def _run_task(self, task: str, context) -> str:
+        """
+        Run a single task in a fresh page of the given browser context.
         Uses the planning LLM (self.llm) and instantiates an extraction LLM for function calling.
         """
-        async with async_playwright() as playwright:
-            browser_instance = await playwright.chromium.launch(
-                args=[
-                    '--no-sandbox',
-                    '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-infobars',
-                    '--disable-background-timer-throttling',
-                    '--disable-popup-blocking',
-                    '--disable-backgrounding-occluded-windows',
-                    '--disable-renderer-backgrounding',
-                    '--disable-window-activation',
-                    '--disable-focus-on-load',
-                    '--no-first-run',
-                    '--no-default-browser-check',
-                    '--no-startup-window',
-                    '--window-position=0,0',
-                ],
-                headless=self.headless
+        browser_wrapper, extraction_llm, mcp_planner = await self._prepare_task(context)
+        try:
+            # Run the orchestrator with MCP planner
+            return await ai_web_scraper(
+                task,
+                browser_wrapper,
+                extraction_llm,
+                self.llm,
+                mcp_planner,
+                fanout=self.fanout,
+                prefetch=self.prefetch,
+                search_backend=self.search_backend
             )
-            context = await browser_instance.new_context()
-            page = await context.new_page()
-            browser_wrapper = BrowserWrapper(page)
-            mcp_planner = MCPPlanner(self.llm)
+        except Exception as e:
+            logger.error(f"Error in web scraper: {e}")
+            return f"An error occurred during web scraping: {str(e)}"
 
-            # Instantiate the extraction LLM (for function calling)
-            extraction_llm = OpenAIPageExtractionLLM(llm=self.llm)
+    async def run(self):
+        """
+        Lease a browser context and run the orchestrator with the provided task.
+        """
+        if not self.task:
+            raise ValueError("A task must be provided to run()")
+        async with self._lease_context() as context:
+            self.result = await self._run_task(self.task, context)
+        
+        return self.result
+
+    async def stream(self, task: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Run a task and yield the final answer in pieces as the LLM generates it.
+        The complete answer is stored in `self.result` once the stream ends.
+
+        Args:
+            task: The task prompt, defaults to the agent's task
+        """
+        task = task or self.task
+        if not task:
+            raise ValueError("A task must be provided to stream()")
+        parts: List[str] = []
+        async with self._lease_context() as context:
+            browser_wrapper, extraction_llm, mcp_planner = await self._prepare_task(context)
             try:
-                # Run the orchestrator with MCP planner
-                self.result = await ai_web_scraper(
-                    self.task,
+                async for token in stream_web_scraper(
+                    task,
                     browser_wrapper,
                     extraction_llm,
                     self.llm,
-                    mcp_planner
-                )
+                    mcp_planner,
+                    fanout=self.fanout,
+                    prefetch=self.prefetch,
+                    search_backend=self.search_backend
+                ):
+                    parts.append(token)
+                    yield token
             except Exception as e:
                 logger.error(f"Error in web scraper: {e}")
-                self.result = f"An error occurred during web scraping: {str(e)}"
-            finally:
-                await context.close()
-                await browser_instance.close()
-        
-        return self.result
+                error = f"An error occurred during web scraping: {str(e)}"
+                parts.append(error)
+                yield error
+        self.result = "".join(parts)
+
+    async def iter_many(
+        self,
+        tasks: List[str],
+        concurrency: int = 4,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[Tuple[int, str, str]]:
+        """
+        Run many tasks concurrently, yielding each result as soon as it is ready.
+
+        Each task gets its own planner, extraction LLM and page in a context
+        leased from the attached pool (or a temporary pool of `concurrency`
+        contexts, closed once every task is done).
+
+        Args:
+            tasks: The task prompts to run
+            concurrency: Maximum number of tasks running at the same time
+            timeout: Optional per-task timeout in seconds, counted once the task has a browser context
+
+        Yields:
+            Tuple[int, str, str]: (index in `tasks`, task, result) in completion order
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        pool = self.browser_pool or BrowserPool(size=concurrency, headless=self.headless)
+        owns_pool = self.browser_pool is None
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_one(index: int, task: str) -> Tuple[int, str, str]:
+            # the timeout covers the task itself, not the wait for a free context
+            async with semaphore, pool.lease() as context:
+                try:
+                    result = await asyncio.wait_for(self._run_task(task, context), timeout)
+                except asyncio.TimeoutError:
+                    logger.error(f"Task timed out after {timeout} seconds: {task}")
+                    result = f"An error occurred during web scraping: task timed out after {timeout} seconds"
+                return index, task, result
+
+        pending = [asyncio.ensure_future(run_one(i, task)) for i, task in enumerate(tasks)]
+        try:
+            for future in asyncio.as_completed(pending):
+                yield await future
+        finally:
+            for future in pending:
+                future.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            if owns_pool:
+                await pool.close()
+
+    async def run_many(
+        self,
+        tasks: List[str],
+        concurrency: int = 4,
+        timeout: Optional[float] = None
+    ) -> List[str]:
+        """
+        Run many tasks concurrently and return their results in input order.
+        See `iter_many` for streaming results as they complete.
+        """
+        results: List[str] = [""] * len(tasks)
+        async for index, _, result in self.iter_many(tasks, concurrency=concurrency, timeout=timeout):
+            results[index] = result
+        return results
 
             # result = await ai_web_scraper(self.task, browser_wrapper, extraction_llm, self.llm)
             # logger.info("Final output: " + result)
@@ -1,23 +1,557 @@
 import logging
 import markdownify
 import re
-import tempfile
+from tempfile import NamedTemporaryFile
 import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from html.parser import HTMLParser
 from urllib.parse import urlparse
 from pypdf import PdfReader
 import asyncio
-import subprocess
-import io
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Callable, Dict, Any, List, Optional, Union
 import requests
-from io import BytesIO
 
 logger = logging.getLogger(__name__)
 
+class _FastMarkdownConverter(HTMLParser):
+    """
+    Single-pass, streaming HTML to markdown converter built on the standard
+    library parser. Keeps headings, lists, links, emphasis, code and tables,
+    and drops scripts, styles and other non-content markup.
+    """
+    SKIP_TAGS = {"script", "style", "noscript", "svg", "head", "template", "iframe", "canvas", "object"}
+    BLOCK_TAGS = {"p", "div", "section", "article", "main", "header", "footer", "aside", "nav", "form",
+                  "fieldset", "figure", "figcaption", "address", "dl", "dt", "dd", "blockquote",
+                  "details", "summary", "center"}
+    HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+    VOID_TAGS = {"br", "hr", "img", "input", "meta", "link", "source", "wbr", "area", "col", "base"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.buffers: List[List[str]] = [[]]
+        self.skip_depth = 0
+        self.pre_depth = 0
+        self.lists: List[List[Union[bool, int]]] = []
+        self.links: List[Optional[str]] = []
+        self.tables: List[Dict[str, Any]] = []
+
+    def _emit(self, text: str) -> None:
+        self.buffers[-1].append(text)
+
+    def _last_char(self) -> str:
+        buffer = self.buffers[-1]
+        return buffer[-1][-1:] if buffer and buffer[-1] else "\n"
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth += 1
+            return
+        if self.skip_depth:
+            return
+        attrs = dict(attrs)
+        if tag in self.HEADINGS:
+            self._emit("\n\n" + "#" * self.HEADINGS[tag] + " ")
+        elif tag in self.BLOCK_TAGS:
+            self._emit("\n\n")
+        elif tag == "br":
+            self._emit("\n")
+        elif tag == "hr":
+            self._emit("\n\n---\n\n")
+        elif tag in ("ul", "ol"):
+            self.lists.append([tag == "ol", 0])
+            self._emit("\n")
+        elif tag == "li":
+            indent = "  " * max(0, len(self.lists) - 1)
+            if self.lists and self.lists[-1][0]:
+                self.lists[-1][1] += 1
+                self._emit(f"\n{indent}{self.lists[-1][1]}. ")
+            else:
+                self._emit(f"\n{indent}- ")
+        elif tag == "a":
+            self.links.append(attrs.get("href"))
+            self.buffers.append([])
+        elif tag in ("strong", "b"):
+            self._emit("**")
+        elif tag in ("em", "i"):
+            self._emit("*")
+        elif tag == "code" and not self.pre_depth:
+            self._emit("`")
+        elif tag == "pre":
+            self.pre_depth += 1
+            self._emit("\n\n```\n")
+        elif tag == "img":
+            alt = (attrs.get("alt") or "").strip()
+            if alt and attrs.get("src"):
+                self._emit(f"![{alt}]({attrs['src']})")
+        elif tag == "table":
+            self.tables.append({"rows": [], "row": None, "cell": None})
+        elif tag == "tr" and self.tables:
+            # </td> and </tr> are optional, so a new row closes the open one
+            self._close_row(self.tables[-1])
+            self.tables[-1]["row"] = []
+        elif tag in ("td", "th") and self.tables:
+            table = self.tables[-1]
+            self._close_cell(table)
+            self.buffers.append([])
+            table["cell"] = len(self.buffers)
+
+    def _close_cell(self, table: Dict[str, Any]) -> None:
+        if table["cell"] is None:
+            return
+        # fold anything left open inside the cell (e.g. an unclosed link) into it
+        while len(self.buffers) > table["cell"]:
+            if self.links:
+                self.links.pop()
+            text = "".join(self.buffers.pop())
+            self._emit(text)
+        cell = " ".join("".join(self.buffers.pop()).split()).replace("|", "\\|")
+        table["cell"] = None
+        if table["row"] is None:
+            table["row"] = []
+        table["row"].append(cell)
+
+    def _close_row(self, table: Dict[str, Any]) -> None:
+        self._close_cell(table)
+        if table["row"]:
+            table["rows"].append(table["row"])
+        table["row"] = None
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if self.skip_depth or tag in self.VOID_TAGS:
+            return
+        if tag in self.HEADINGS or tag in self.BLOCK_TAGS:
+            self._emit("\n\n")
+        elif tag in ("ul", "ol"):
+            if self.lists:
+                self.lists.pop()
+            self._emit("\n")
+        elif tag == "a" and self.links:
+            href = self.links.pop()
+            text = " ".join("".join(self.buffers.pop()).split())
+            if text and href and not href.startswith(("javascript:", "#")):
+                self._emit(f"[{text}]({href})")
+            else:
+                self._emit(text)
+        elif tag in ("strong", "b"):
+            self._emit("**")
+        elif tag in ("em", "i"):
+            self._emit("*")
+        elif tag == "code" and not self.pre_depth:
+            self._emit("`")
+        elif tag == "pre" and self.pre_depth:
+            self.pre_depth -= 1
+            self._emit("\n```\n\n")
+        elif tag in ("td", "th") and self.tables:
+            self._close_cell(self.tables[-1])
+        elif tag == "tr" and self.tables:
+            self._close_row(self.tables[-1])
+        elif tag == "table" and self.tables:
+            table = self.tables[-1]
+            self._close_row(table)
+            self.tables.pop()
+            self._emit(self._render_table(table["rows"]))
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        if self.pre_depth:
+            self._emit(data)
+            return
+        text = re.sub(r"\s+", " ", data)
+        if text.startswith(" ") and self._last_char() in ("\n", " ", ""):
+            text = text[1:]
+        if text:
+            self._emit(text)
+
+    @staticmethod
+    def _render_table(rows: List[List[str]]) -> str:
+        if not rows:
+            return ""
+        width = max(len(row) for row in rows)
+        rows = [row + [""] * (width - len(row)) for row in rows]
+        lines = ["| " + " | ".join(rows[0]) + " |", "|" + " --- |" * width]
+        lines += ["| " + " | ".join(row) + " |" for row in rows[1:]]
+        return "\n\n" + "\n".join(lines) + "\n\n"
+
+    def markdown(self) -> str:
+        # flush anything left open by malformed markup
+        while len(self.buffers) > 1:
+            text = "".join(self.buffers.pop())
+            self._emit(text)
+        text = "".join(self.buffers[0])
+        text = re.sub(r"[ \t]+\n", "\n", text)
+        text = re.sub(r"\n{3,}", "\n\n", text)
+        return text.strip()
+
+
+def fast_html_to_markdown(html: str) -> str:
+    """
+    Convert HTML to markdown with the streaming converter.
+    """
+    converter = _FastMarkdownConverter()
+    converter.feed(html)
+    converter.close()
+    return converter.markdown()
+
+
+def markdownify_html(html: str) -> str:
+    return markdownify.markdownify(html)
+
+
+# Converters selectable by name in convert_html_to_markdown; register others with
+# register_html_converter. They must be module-level functions so they can run
+# in the process pool.
+HTML_CONVERTERS: Dict[str, Callable[[str], str]] = {
+    "markdownify": markdownify_html,
+    "fast": fast_html_to_markdown,
+}
+
+# "auto" switches to the fast converter for HTML at least this long
+FAST_CONVERTER_MIN_CHARS = 200_000
+# HTML at least this long is converted in a worker process so the event loop stays free
+OFFLOAD_MIN_CHARS = 100_000
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_thread_pool: Optional[ThreadPoolExecutor] = None
+
+
+def register_html_converter(name: str, converter: Callable[[str], str]) -> None:
+    HTML_CONVERTERS[name] = converter
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1))
+    return _process_pool
+
+
+def _discard_process_pool(reason: BaseException) -> None:
+    """Shut the shared process pool down so the next call starts a fresh one."""
+    global _process_pool
+    logger.warning(f"Process pool unavailable, converting in a thread: {reason}")
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def _get_thread_pool() -> ThreadPoolExecutor:
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(thread_name_prefix="cpu-bound")
+    return _thread_pool
+
+
+def _submit_cpu_bound(fn: Callable, *args) -> Future:
+    """
+    Submit a CPU-bound, picklable function to the shared process pool, or to
+    a thread when worker processes are unavailable.
+    """
+    try:
+        return _get_process_pool().submit(fn, *args)
+    except (BrokenProcessPool, OSError) as e:
+        # OSError (e.g. PermissionError): the sandbox refuses to create the pool or fork workers
+        _discard_process_pool(e)
+        return _get_thread_pool().submit(fn, *args)
+
+
+async def _await_cpu_bound(future: Future, fn: Callable, *args):
+    """
+    Wait for a future from _submit_cpu_bound. Exceptions raised by `fn`
+    itself propagate unchanged.
+    """
+    try:
+        return await asyncio.wrap_future(future)
+    except BrokenProcessPool as e:
+        # a worker died (e.g. was killed); the task never completed, so run it here
+        _discard_process_pool(e)
+        return await asyncio.wrap_future(_get_thread_pool().submit(fn, *args))
+
+
+async def _run_cpu_bound(fn: Callable, *args):
+    """
+    Run a CPU-bound, picklable function in the shared process pool, falling
+    back to a thread when worker processes are unavailable. Exceptions raised
+    by `fn` itself propagate unchanged.
+    """
+    return await _await_cpu_bound(_submit_cpu_bound(fn, *args), fn, *args)
+
+
+async def convert_html_to_markdown(html: str, converter: str = "auto") -> str:
+    """
+    Convert HTML to markdown without stalling other agents sharing the event loop.
+
+    Args:
+        html: The HTML to convert
+        converter: A name from HTML_CONVERTERS, or "auto" to use markdownify for
+            regular pages and the fast streaming converter for very large ones
+
+    Returns:
+        str: The markdown
+    """
+    if converter == "auto":
+        converter = "fast" if len(html) >= FAST_CONVERTER_MIN_CHARS else "markdownify"
+    if converter not in HTML_CONVERTERS:
+        raise ValueError(f"Unknown HTML converter '{converter}', expected one of {sorted(HTML_CONVERTERS)}")
+    convert = HTML_CONVERTERS[converter]
+    if len(html) < OFFLOAD_MIN_CHARS:
+        return convert(html)
+    logger.info(f"Converting {len(html)} chars of HTML with '{converter}' in a worker process")
+    return await _run_cpu_bound(convert, html)
+
+
+# PDF pipeline limits: pages beyond MAX_PDF_PAGES are ignored and text is
+# extracted PDF_PAGE_BATCH pages per worker task. PDFs are kept in a temporary
+# file that each worker opens itself, so the document is never held in memory
+# whole or copied to every worker.
+MAX_PDF_PAGES = 200
+PDF_PAGE_BATCH = 20
+PDF_MAX_DOWNLOAD_BYTES = 100 * 1024 * 1024
+
+
+def _download_pdf(url: str, max_bytes: int = PDF_MAX_DOWNLOAD_BYTES, timeout: float = 30.0) -> str:
+    """
+    Stream a PDF to a temporary file and return its path; the caller deletes it.
+    Blocking; run it in an executor.
+    """
+    with requests.get(url, stream=True, timeout=timeout) as resp:
+        resp.raise_for_status()
+        with NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            try:
+                size = 0
+                for chunk in resp.iter_content(chunk_size=64 * 1024):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise ValueError(f"PDF at {url} exceeds {max_bytes} bytes")
+                    tmp.write(chunk)
+            except BaseException:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+            return tmp.name
+
+
+def _write_temp_pdf(data: bytes) -> str:
+    with NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        tmp.write(data)
+        return tmp.name
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError as e:
+        logger.warning(f"Could not remove temporary PDF {path}: {e}")
+
+
+def _pdf_page_count(path: str) -> int:
+    return len(PdfReader(path).pages)
+
+
+def _extract_pdf_pages(path: str, start: int, stop: int) -> str:
+    """
+    Extract the text of pages [start, stop) of the PDF at `path`. Runs in a worker process.
+    """
+    reader = PdfReader(path)
+    texts = []
+    for i in range(start, min(stop, len(reader.pages))):
+        try:
+            texts.append(reader.pages[i].extract_text() or "")
+        except Exception as e:
+            texts.append("")
+            logger.warning(f"Could not extract text from PDF page {i + 1}: {e}")
+    return "\n".join(texts)
+
+
+async def iter_pdf_text(
+    url: str,
+    max_pages: int = MAX_PDF_PAGES,
+    batch_pages: int = PDF_PAGE_BATCH
+) -> AsyncIterator[str]:
+    """
+    Download a PDF without blocking the event loop and yield its text in
+    batches of `batch_pages` pages, in document order.
+
+    The download is streamed to a temporary file; all batches are extracted
+    from it in parallel in the shared process pool, and each is yielded as
+    soon as it and every batch before it are done.
+
+    Args:
+        url: URL of the PDF document
+        max_pages: Pages beyond this limit are not extracted
+        batch_pages: Pages per extraction task and per yielded batch
+
+    Yields:
+        str: Text of the next batch of pages
+    """
+    loop = asyncio.get_event_loop()
+    path = await loop.run_in_executor(None, _download_pdf, url)
+    batches = iter_pdf_file_text(path, max_pages=max_pages, batch_pages=batch_pages)
+    try:
+        async for batch in batches:
+            yield batch
+    finally:
+        # closing it waits for batches still being read from the file
+        await batches.aclose()
+        _remove_file(path)
+
+
+async def iter_pdf_bytes_text(
+    data: bytes,
+    max_pages: int = MAX_PDF_PAGES,
+    batch_pages: int = PDF_PAGE_BATCH
+) -> AsyncIterator[str]:
+    """
+    Yield the text of an in-memory PDF in batches of `batch_pages` pages (see iter_pdf_text).
+    """
+    path = _write_temp_pdf(data)
+    batches = iter_pdf_file_text(path, max_pages=max_pages, batch_pages=batch_pages)
+    try:
+        async for batch in batches:
+            yield batch
+    finally:
+        # closing it waits for batches still being read from the file
+        await batches.aclose()
+        _remove_file(path)
+
+
+async def iter_pdf_file_text(
+    path: str,
+    max_pages: int = MAX_PDF_PAGES,
+    batch_pages: int = PDF_PAGE_BATCH
+) -> AsyncIterator[str]:
+    """
+    Yield the text of the PDF at `path` in batches of `batch_pages` pages
+    (see iter_pdf_text). Workers receive only the path and a page range.
+    When iteration stops early, batches that have not started are cancelled
+    and the ones already running are waited for, so the caller can remove
+    the file once this generator is closed.
+    """
+    total = await _run_cpu_bound(_pdf_page_count, path)
+    pages = min(total, max_pages)
+    if total > max_pages:
+        logger.info(f"PDF has {total} pages, extracting the first {max_pages}")
+
+    ranges = [(path, start, start + batch_pages) for start in range(0, pages, batch_pages)]
+    batches = [(args, _submit_cpu_bound(_extract_pdf_pages, *args)) for args in ranges]
+    try:
+        for args, future in batches:
+            yield await _await_cpu_bound(future, _extract_pdf_pages, *args)
+    finally:
+        for _, future in batches:
+            future.cancel()
+        # cancel() only drops batches that have not started; wait for the ones
+        # a worker is still reading before the caller removes the file
+        running = [asyncio.wrap_future(future) for _, future in batches if not future.done()]
+        await asyncio.gather(*running, return_exceptions=True)
+
+
+def _merge_pdf_results(results: List[Dict[str, Any]], title: str, url: str) -> Dict[str, Any]:
+    """
+    Combine the non-final extraction results of several PDF batches.
+    """
+    key_points: List[str] = []
+    for result in results:
+        for point in result.get("key_points", []):
+            if point not in key_points:
+                key_points.append(point)
+
+    def join(field: str) -> str:
+        return "\n\n".join(r[field] for r in results if r.get(field))
+
+    return {
+        "action": "next_url",
+        "summary": join("summary"),
+        "key_points": key_points,
+        "context": join("context"),
+        "output": join("output"),
+        "relevance_score": max((r.get("relevance_score", 0) for r in results), default=0),
+        "page_url": url,
+        "page_title": title,
+    }
+
+
+async def extract_pdf_with_pipeline(url: str, title: str, goal: str, page_extraction_llm,
+                                    max_pages: int = MAX_PDF_PAGES,
+                                    batch_pages: int = PDF_PAGE_BATCH) -> Dict[str, Any]:
+    """
+    Feed a PDF to process_extracted_content batch by batch, stopping as soon
+    as a batch yields a final answer so the rest is never sent to the LLM.
+    """
+    results: List[Dict[str, Any]] = []
+    batches = iter_pdf_text(url, max_pages=max_pages, batch_pages=batch_pages)
+    try:
+        async for index, text in _aenumerate(batches):
+            if not text.strip():
+                continue
+            result = await process_extracted_content(text, title, url, goal, page_extraction_llm)
+            if result.get("action") == "final":
+                logger.info(f"Final answer found in PDF batch {index + 1}, skipping the rest")
+                return result
+            results.append(result)
+    finally:
+        await batches.aclose()
+    if len(results) == 1:
+        return results[0]
+    return _merge_pdf_results(results, title, url)
+
+
+async def _aenumerate(iterator: AsyncIterator[Any]):
+    index = 0
+    async for item in iterator:
+        yield index, item
+        index += 1
+
+
+async def _fetch_pdf_bytes(page, url: str, timeout: float = 30.0) -> bytes:
+    """
+    Download `url` as binary through the page's APIRequestContext, so the
+    request carries the browser session's cookies without going through page JS.
+    """
+    response = await page.request.get(url, timeout=timeout * 1000)
+    if not response.ok:
+        raise ValueError(f"HTTP {response.status} fetching {url}")
+    return await response.body()
+
+
+async def _pdftotext(data: bytes, timeout: float = 30.0) -> Optional[str]:
+    """
+    Run poppler's pdftotext on PDF bytes over stdin/stdout, without a temp file.
+    Returns None when the tool is missing or fails.
+    """
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "pdftotext", "-", "-",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+    except FileNotFoundError:
+        logger.warning("pdftotext not available on the system")
+        return None
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(input=data), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        logger.warning("pdftotext timed out")
+        return None
+    if process.returncode == 0 and stdout.strip():
+        logger.info("Successfully extracted PDF text with pdftotext")
+        return stdout.decode("utf-8", errors="replace")
+    logger.warning(f"pdftotext extraction failed: {stderr.decode('utf-8', errors='replace')}")
+    return None
+
+
 async def extract_pdf_content(browser, url: str) -> str:
     """
     Extract text content from a PDF file.
-    Uses a combination of browser PDF.js extraction and downloading + external tools if available.
+    Uses the browser's PDF.js viewer when present, otherwise downloads the bytes
+    through the browser context and runs pdftotext, falling back to pypdf.
     
     Args:
         browser: Browser wrapper instance
@@ -57,85 +591,152 @@ async def extract_pdf_content(browser, url: str) -> str:
     except Exception as e:
         logger.warning(f"Error extracting PDF text from viewer: {e}")
     
-    # Method 2: Try to download the PDF and extract text with text extraction tools
+    # Method 2: Fetch the raw bytes through the browser context, which shares
+    # its cookies, and pipe them straight into pdftotext (pypdf as fallback)
     try:
-        # Create a temporary file for the PDF
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_file:
-            pdf_path = temp_file.name
-        
-        # Download the PDF
         logger.info(f"Downloading PDF from {url}")
-        
-        # Use browser's download capabilities
-        download_script = f'''
-        async () => {{
-            const response = await fetch("{url}");
-            const blob = await response.blob();
-            const buffer = await blob.arrayBuffer();
-            
-            // Convert ArrayBuffer to Base64
-            const base64 = btoa(
-                new Uint8Array(buffer).reduce(
-                    (data, byte) => data + String.fromCharCode(byte), ''
-                )
-            );
-            
-            return base64;
-        }}
-        '''
-        
-        try:
-            pdf_base64 = await page.evaluate(download_script)
-            
-            if pdf_base64:
-                # Decode base64 and write to file
-                with open(pdf_path, 'wb') as f:
-                    f.write(io.BytesIO(bytes(pdf_base64, encoding='utf-8')).getvalue())
-                    
-                logger.info(f"PDF downloaded to {pdf_path}")
-            else:
-                logger.warning("Failed to download PDF content")
-                return ""
-                
-        except Exception as e:
-            logger.warning(f"Error downloading PDF: {e}")
-            return ""
-        
-        # Extract text using pdftotext if available
-        try:
-            logger.info("Attempting PDF text extraction with external tool")
-            result = subprocess.run(
-                ["pdftotext", pdf_path, "-"],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode == 0 and result.stdout:
-                logger.info("Successfully extracted PDF text with pdftotext")
-                return result.stdout
-                
-            logger.warning(f"pdftotext extraction failed: {result.stderr}")
-        except FileNotFoundError:
-            logger.warning("pdftotext not available on the system")
-        except Exception as e:
-            logger.warning(f"Error in PDF extraction: {e}")
-        finally:
-            # Clean up the temporary file
-            try:
-                os.unlink(pdf_path)
-            except:
-                pass
-    
+        pdf_bytes = await _fetch_pdf_bytes(page, url)
     except Exception as e:
-        logger.error(f"Overall error in PDF extraction: {e}")
-    
+        logger.warning(f"Error downloading PDF: {e}")
+        return ""
+    if not pdf_bytes:
+        logger.warning("Failed to download PDF content")
+        return ""
+
+    pdf_text = await _pdftotext(pdf_bytes)
+    if pdf_text:
+        return pdf_text
+
+    try:
+        pdf_text = "\n".join([batch async for batch in iter_pdf_bytes_text(pdf_bytes)])
+        if pdf_text.strip():
+            logger.info("Successfully extracted PDF text with pypdf")
+            return pdf_text
+    except Exception as e:
+        logger.error(f"Error in PDF extraction: {e}")
+
     logger.warning("All PDF extraction methods failed")
     return ""
 
-async def process_extracted_content(content: str, title: str, url: str, goal: str, page_extraction_llm) -> Dict[str, Any]:
+# Readability-style main-content finder. Works on a clone of <body> so the live
+# page (which later interactions rely on) is left untouched. Paragraph text
+# scores its ancestors, candidates are weighted by tag, class/id hints and link
+# density, and related siblings of the winner are merged back in.
+_MAIN_CONTENT_SCRIPT = r"""
+() => {
+    if (!document.body) return null;
+    const UNLIKELY = /cookie|consent|gdpr|banner|newsletter|subscribe|advert|\bads?\b|promo|share|social|related|sidebar|popup|modal|breadcrumb|comment|footer|masthead|menu|skip/i;
+    const MAYBE = /article|content|main|body|post|entry|story|text/i;
+    const POSITIVE = /article|body|content|entry|main|page|post|text|blog|story/i;
+    const NEGATIVE = /hidden|banner|combx|comment|footer|footnote|masthead|media|meta|outbrain|promo|related|scroll|share|shoutbox|sidebar|sponsor|shopping|tags|tool|widget|cookie|consent/i;
+
+    const root = document.body.cloneNode(true);
+    root.querySelectorAll(
+        'script, style, noscript, svg, canvas, iframe, template, dialog, nav, header, footer, aside, ' +
+        '[role="navigation"], [role="banner"], [role="contentinfo"], [role="complementary"], ' +
+        '[role="dialog"], [aria-hidden="true"], [hidden]'
+    ).forEach(el => el.remove());
+    root.querySelectorAll('[id], [class]').forEach(el => {
+        const hint = `${el.id} ${typeof el.className === 'string' ? el.className : ''}`;
+        if (UNLIKELY.test(hint) && !MAYBE.test(hint) && el.tagName !== 'BODY' && el.tagName !== 'ARTICLE') {
+            el.remove();
+        }
+    });
+
+    const textOf = (el) => (el.textContent || '').replace(/\s+/g, ' ').trim();
+    const classWeight = (el) => {
+        const hint = `${el.id} ${typeof el.className === 'string' ? el.className : ''}`;
+        let weight = 0;
+        if (POSITIVE.test(hint)) weight += 25;
+        if (NEGATIVE.test(hint)) weight -= 25;
+        return weight;
+    };
+    const tagWeight = {DIV: 5, ARTICLE: 10, MAIN: 10, SECTION: 3, PRE: 3, TD: 3, BLOCKQUOTE: 3,
+                       ADDRESS: -3, OL: -3, UL: -3, DL: -3, DD: -3, DT: -3, LI: -3, FORM: -3,
+                       H1: -5, H2: -5, H3: -5, H4: -5, H5: -5, H6: -5, TH: -5};
+    const scores = new Map();
+    const init = (el) => {
+        if (!scores.has(el)) scores.set(el, (tagWeight[el.tagName] || 0) + classWeight(el));
+    };
+
+    root.querySelectorAll('p, pre, td, li, blockquote, h2, h3').forEach(node => {
+        const text = textOf(node);
+        if (text.length < 25) return;
+        const score = 1 + text.split(',').length + Math.min(3, Math.floor(text.length / 100));
+        let ancestor = node.parentElement;
+        for (let level = 0; ancestor && level < 3; level++, ancestor = ancestor.parentElement) {
+            init(ancestor);
+            scores.set(ancestor, scores.get(ancestor) + score / (level === 0 ? 1 : level * 2));
+        }
+    });
+
+    const linkDensity = (el) => {
+        const length = textOf(el).length || 1;
+        let linkLength = 0;
+        el.querySelectorAll('a').forEach(a => { linkLength += textOf(a).length; });
+        return linkLength / length;
+    };
+
+    let top = null;
+    let topScore = 0;
+    for (const [el, raw] of scores) {
+        const score = raw * (1 - linkDensity(el));
+        scores.set(el, score);
+        if (score > topScore) { top = el; topScore = score; }
+    }
+    if (!top) return {html: '', score: 0, textLength: 0};
+
+    const threshold = Math.max(10, topScore * 0.2);
+    const parts = [];
+    const siblings = top.parentElement ? Array.from(top.parentElement.children) : [top];
+    for (const sibling of siblings) {
+        if (sibling === top || (scores.get(sibling) || 0) >= threshold) {
+            parts.push(sibling.outerHTML);
+        } else if (sibling.tagName === 'P') {
+            const text = textOf(sibling);
+            if (text.length > 80 && linkDensity(sibling) < 0.25) parts.push(sibling.outerHTML);
+        }
+    }
+    const html = parts.join('\n');
+    return {html: html, score: topScore, textLength: textOf(top).length};
+}
+"""
+
+
+async def extract_main_content_html(page, min_score: float = 20, min_text_chars: int = 250) -> Optional[str]:
+    """
+    Return the HTML of the page's article-like main region, without navigation,
+    footers, scripts, inline SVG, cookie banners and similar boilerplate.
+
+    Args:
+        page: Playwright page
+        min_score: Minimum readability score for the best candidate
+        min_text_chars: Minimum text length for the best candidate
+
+    Returns:
+        Optional[str]: The main-content HTML, or None when no candidate is
+        convincing enough and the caller should fall back to the full page
+    """
+    try:
+        result = await page.evaluate(_MAIN_CONTENT_SCRIPT)
+    except Exception as e:
+        logger.warning(f"Main-content detection failed: {e}")
+        return None
+    if not result or result.get("score", 0) < min_score or result.get("textLength", 0) < min_text_chars:
+        logger.info(f"Main-content score too low ({(result or {}).get('score', 0):.1f}), using full page")
+        return None
+    logger.info(f"Main content found (score={result['score']:.1f}, {result['textLength']} chars)")
+    return result["html"]
+
+
+async def process_extracted_content(content: str, title: str, url: str, goal: str, page_extraction_llm,
+                                    cache_key: Optional[str] = None) -> Dict[str, Any]:
     """
     Process extracted content using the LLM.
+
+    When the extraction LLM carries an ExtractionCache (`page_extraction_llm.cache`),
+    results are looked up and stored under a key built from `content`, the goal
+    and the model, so a hit skips the LLM entirely.
     
     Args:
         content: The extracted text content
@@ -143,10 +744,19 @@ async def process_extracted_content(content: str, title: str, url: str, goal: st
         url: Page URL
         goal: User's search goal
         page_extraction_llm: LLM instance for extraction
+        cache_key: Cache key the caller has already looked up (e.g. one built from
+            the raw HTML); the result is stored under it on completion
         
     Returns:
         Dict[str, Any]: Extraction result with action, summary, etc.
     """
+    cache = getattr(page_extraction_llm, "cache", None)
+    if cache is not None and cache_key is None:
+        cache_key = cache.make_key(content, goal, _model_name(page_extraction_llm))
+        cached = await _cached_result(cache, cache_key, url, title)
+        if cached is not None:
+            return cached
+
     # Add page metadata to help with content assessment
     page_metadata = f"""
     URL: {url}
@@ -178,17 +788,34 @@ async def process_extracted_content(content: str, title: str, url: str, goal: st
     extraction_result["relevance_score"] = relevance_score
     extraction_result["page_url"] = url
     extraction_result["page_title"] = title
+
+    if cache is not None:
+        await cache.set(cache_key, extraction_result)
     
     return extraction_result
 
 
+def _model_name(page_extraction_llm) -> str:
+    return getattr(page_extraction_llm, "model_name", "") or ""
+
+
+async def _cached_result(cache, cache_key: str, url: str, title: str) -> Optional[Dict[str, Any]]:
+    cached = await cache.get(cache_key)
+    if cached is not None:
+        cached["page_url"] = url
+        cached["page_title"] = title
+    return cached
+
+
 async def extract_content(goal: str,
                           browser,
                           page_extraction_llm,
-                          target_selector: str = "") -> dict:
+                          target_selector: str = "",
+                          html_converter: str = "auto") -> dict:
     """
     Extract page content (HTML or PDF), or if it’s a form, extract form fields,
     then call the LLM to answer the goal.
+    `html_converter` selects the HTML to markdown converter (see convert_html_to_markdown).
     Returns a dict with {action, summary, key_points, context, output, relevance_score}.
     """
     page = await browser.get_current_page()
@@ -196,7 +823,7 @@ async def extract_content(goal: str,
     url = page.url
     title = await page.title()
 
-    # --- 1) PDF handling via PyPDF2 ------------------
+    # --- 1) PDF handling via pypdf, off the event loop ------------------
     is_pdf = (
         url.lower().endswith('.pdf') or
         '/pdf/' in url.lower() or
@@ -212,13 +839,7 @@ async def extract_content(goal: str,
 
     if is_pdf:
         logger.info(f"Detected PDF at {url}, fetching and extracting text…")
-        resp = requests.get(url)
-        reader = PdfReader(BytesIO(resp.content))
-        pdf_text = ""
-        for p in reader.pages:
-            text = p.extract_text() or ""
-            pdf_text += text + "\n"
-        return await process_extracted_content(pdf_text, title, url, goal, page_extraction_llm)
+        return await extract_pdf_with_pipeline(url, title, goal, page_extraction_llm)
 
     # # --- 2) Form-element extraction ------------------
     # form_elems = await page.query_selector_all("input, textarea, select")
@@ -295,8 +916,21 @@ async def extract_content(goal: str,
     #         logger.debug(f"Selector '{sel}' failed: {e}")
 
     if not content_html:
-        logger.warning("No selector matched; grabbing full page HTML")
+        content_html = await extract_main_content_html(page)
+
+    if not content_html:
+        logger.warning("No main content detected; grabbing full page HTML")
         content_html = await page.content()
 
-    content_markdown = markdownify.markdownify(content_html)
-    return await process_extracted_content(content_markdown, title, url, goal, page_extraction_llm)
+    # Key the cache on the HTML so a hit skips markdownify as well as the LLM
+    cache_key = None
+    cache = getattr(page_extraction_llm, "cache", None)
+    if cache is not None:
+        cache_key = cache.make_key(content_html, goal, _model_name(page_extraction_llm))
+        cached = await _cached_result(cache, cache_key, url, title)
+        if cached is not None:
+            return cached
+
+    content_markdown = await convert_html_to_markdown(content_html, html_converter)
+    return await process_extracted_content(content_markdown, title, url, goal, page_extraction_llm,
+                                           cache_key=cache_key)
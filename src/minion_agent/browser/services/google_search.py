@@ -4,6 +4,14 @@ from langchain_core.messages import SystemMessage, HumanMessage
 
 logger = logging.getLogger(__name__)
 
+# Organic result links on a Google results page (udm=14 is the plain "Web" view).
+GOOGLE_RESULTS_SCRIPT = '''() => {
+    return Array.from(document.querySelectorAll('a h3')).map(h => ({
+        title: h.innerText,
+        url: h.parentElement.href
+    })).slice(0, 10);
+}'''
+
 async def refine_search_query(llm: BaseLanguageModel, original_query: str) -> str:
     """
     Uses GPT to refine the raw user query into an optimized search query for Google.
@@ -31,12 +39,7 @@ async def search_google(query: str, browser) -> list:
     search_url = f'https://www.google.com/search?q={query}&udm=14'
     await page.goto(search_url)
     await page.wait_for_load_state()
-    results = await page.evaluate('''() => {
-        return Array.from(document.querySelectorAll('a h3')).map(h => ({
-            title: h.innerText,
-            url: h.parentElement.href
-        })).slice(0, 10);
-    }''')
+    results = await page.evaluate(GOOGLE_RESULTS_SCRIPT)
     logger.info(f'Searched for "{query}" on Google. Found {len(results)} results.')
     return results
 
@@ -49,12 +52,7 @@ async def search_next_page(browser) -> list:
     if next_button:
         await next_button.click()
         await page.wait_for_load_state()
-        new_results = await page.evaluate('''() => {
-            return Array.from(document.querySelectorAll('a h3')).map(h => ({
-                title: h.innerText,
-                url: h.parentElement.href
-            })).slice(0, 10);
-        }''')
+        new_results = await page.evaluate(GOOGLE_RESULTS_SCRIPT)
         logger.info("Loaded next page of search results.")
         return new_results
     else:
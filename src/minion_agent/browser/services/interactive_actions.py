@@ -5,35 +5,114 @@ import json
 from typing import Optional, List, Dict, Any, Tuple
 import re
 import os
+import weakref
+from langchain_core.messages import HumanMessage
+
+from .navigation import settle
 
 # OpenAI client setup
 HAS_OPENAI = False
 try:
-    from openai import OpenAI
+    import httpx
+    from openai import AsyncOpenAI
     HAS_OPENAI = True
 except ImportError:
     logging.warning("OpenAI library not found, LLM-based element selection will be disabled")
 
 logger = logging.getLogger(__name__)
 
+# Connection pool shared by every ElementSelector on an event loop, so concurrent
+# pages reuse keep-alive connections instead of opening one client each.
+OPENAI_HTTP_LIMITS = {"max_connections": 20, "max_keepalive_connections": 10, "keepalive_expiry": 30.0}
+OPENAI_TIMEOUT_SECONDS = 60.0
+# Fields sent to ElementSelector.plan_form for one page; the rest are decided one by one
+MAX_PLANNED_FIELDS = 30
+# Scroll driver limits: quiet period that counts as settled, overall time
+# limit, and the infinite-scroll budgets (added DOM nodes, document HTML size)
+SCROLL_QUIET_MS = 300
+SCROLL_TIMEOUT_SECONDS = 10.0
+SCROLL_MAX_ITEMS = 2000
+SCROLL_MAX_BYTES = 5_000_000
+SCROLL_MAX_STEPS = 40
+_async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_async_openai_client(api_key: str):
+    """
+    Return the pooled AsyncOpenAI client for `api_key` on the current event loop.
+    Clients are per loop because their connections cannot outlive it.
+    """
+    loop = asyncio.get_event_loop()
+    clients = _async_clients.setdefault(loop, {})
+    if api_key not in clients:
+        clients[api_key] = AsyncOpenAI(
+            api_key=api_key,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(**OPENAI_HTTP_LIMITS),
+                timeout=httpx.Timeout(OPENAI_TIMEOUT_SECONDS, connect=10.0)
+            )
+        )
+    return clients[api_key]
+
+
 class ElementSelector:
     """
     Uses LLM to intelligently select elements and generate input text
     """
-    def __init__(self, model="gpt-4o"):
+    def __init__(self, model="gpt-4o", llm=None):
+        """
+        Args:
+            model: OpenAI model used when no LangChain `llm` is given
+            llm: Optional LangChain chat model (e.g. the agent's own) used instead of
+                the pooled OpenAI client
+        """
         self.model = model
+        self.llm = llm
         # Get API key from environment
-        api_key = os.environ.get("OPENAI_API_KEY")
+        self.api_key = os.environ.get("OPENAI_API_KEY")
         
         # Check if OpenAI is available and API key is set
-        if not HAS_OPENAI:
+        if llm is not None:
+            pass
+        elif not HAS_OPENAI:
             logger.warning("OpenAI library not available, LLM-based element selection will be disabled")
-            self.client = None
-        elif not api_key:
+        elif not self.api_key:
             logger.warning("OPENAI_API_KEY not found, LLM-based element selection will be disabled")
-            self.client = None
-        else:
-            self.client = OpenAI(api_key=api_key)
+
+    @property
+    def client(self):
+        """
+        The model used for decisions (the LangChain llm or the pooled async
+        OpenAI client), or None when LLM-based selection is disabled.
+        """
+        if self.llm is not None:
+            return self.llm
+        if HAS_OPENAI and self.api_key:
+            return get_async_openai_client(self.api_key)
+        return None
+
+    async def _complete(self, prompt: str, max_tokens: Optional[int] = None, json_mode: bool = False) -> str:
+        """
+        Send a single-message prompt to the model without blocking the event loop.
+        """
+        if self.llm is not None:
+            response = await self.llm.ainvoke(input=[HumanMessage(content=prompt)])
+            text = response.content.strip()
+            if json_mode and text.startswith("```"):
+                text = "\n".join(text.splitlines()[1:-1])
+            return text
+        kwargs: Dict[str, Any] = {}
+        if max_tokens:
+            kwargs["max_tokens"] = max_tokens
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+            **kwargs
+        )
+        return response.choices[0].message.content.strip()
     
     async def select_best_element(self, elements_with_info: List[Dict], user_prompt: str, page_info: Dict) -> Optional[Dict]:
         """
@@ -79,14 +158,7 @@ class ElementSelector:
         """
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                temperature=0.3,
-            )
-            
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(await self._complete(prompt, json_mode=True))
             
             # Find the element with the matching ID
             for element in elements_with_info:
@@ -186,14 +258,7 @@ class ElementSelector:
         """
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=100,
-                temperature=0.3,
-            )
-            
-            generated_text = response.choices[0].message.content.strip()
+            generated_text = await self._complete(prompt, max_tokens=100)
             # Make sure it's not too long
             return generated_text[:100]
             
@@ -215,7 +280,110 @@ class ElementSelector:
             # Default fallback
             return user_prompt[:50]
 
-async def perform_page_interactions(browser, user_prompt: str, max_time_seconds: int = 60) -> Dict[str, Any]:
+    async def plan_form(
+        self,
+        fields: List[Dict[str, Any]],
+        user_prompt: str,
+        page_info: Dict,
+        description: str = ""
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Decide values for every field of a form in a single LLM call.
+        
+        Args:
+            fields: Field schemas from form_field_schema
+            user_prompt: User's search query or goal
+            page_info: Information about the current page
+            description: Form description (e.g. from get_form_description)
+            
+        Returns:
+            Mapping of field id to value: text for inputs, True/False for
+            checkboxes and radios, an option's exact text for dropdowns. Fields
+            to leave alone are omitted. None when no LLM is available or the
+            call fails, so callers can fall back to per-field decisions.
+        """
+        if not fields or not self.client:
+            return None
+        
+        prompt = f"""
+        You are an AI assistant filling in a form on a website based on the user's goal.
+        
+        USER'S GOAL: {user_prompt}
+        
+        CURRENT PAGE:
+        Title: {page_info.get('title', 'Unknown')}
+        URL: {page_info.get('url', 'Unknown')}
+        
+        FORM: {description or 'N/A'}
+        
+        FIELDS:
+        {json.dumps(fields, indent=2)}
+        
+        Return ONLY a JSON object mapping every field id to its value:
+        - "input" fields: the text to enter (max 100 characters), or null to leave it empty
+        - "checkbox" fields: true to check it, false to leave it unchecked
+        - "dropdown" fields: the exact text of one of its options, or null to leave it unchanged
+        """
+        
+        try:
+            raw_plan = json.loads(await self._complete(prompt, json_mode=True))
+        except Exception as e:
+            logger.warning(f"Error using LLM for form planning: {e}")
+            return None
+        if not isinstance(raw_plan, dict):
+            return None
+        
+        plan: Dict[str, Any] = {}
+        for field in fields:
+            value = raw_plan.get(field["id"])
+            if value is None:
+                continue
+            if field["kind"] == "checkbox":
+                plan[field["id"]] = value is True or str(value).strip().lower() in ("true", "yes")
+            elif field["kind"] == "dropdown":
+                option = match_option(str(value), field.get("options") or [])
+                if option or not field.get("options"):
+                    plan[field["id"]] = option or str(value)
+            elif str(value).strip():
+                plan[field["id"]] = str(value).strip()[:100]
+        logger.info(f"Planned {len(plan)}/{len(fields)} form fields in one LLM call")
+        return plan
+
+def form_field_schema(kind: str, info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Describe an element from get_interactive_elements_with_details for plan_form.
+    `kind` is "input", "checkbox" or "dropdown".
+    """
+    schema = {
+        "id": info.get("id"),
+        "kind": kind,
+        "type": info.get("type") or info.get("element_type", ""),
+        "label": info.get("label", ""),
+        "name": info.get("name", ""),
+    }
+    if kind == "input":
+        schema["placeholder"] = info.get("placeholder", "")
+    if kind == "checkbox":
+        schema["checked"] = bool(info.get("checked"))
+    if kind == "dropdown":
+        schema["options"] = info.get("options") or []
+    return schema
+
+def match_option(value: str, options: List[str]) -> Optional[str]:
+    """Return the option equal to `value`, or the first one containing it (case-insensitive)."""
+    if value in options:
+        return value
+    for option in options:
+        if value.lower() in option.lower():
+            return option
+    return None
+
+async def perform_page_interactions(
+    browser,
+    user_prompt: str,
+    max_time_seconds: int = 60,
+    element_selector: Optional[ElementSelector] = None
+) -> Dict[str, Any]:
     """
     Performs human-like interactive actions on the current page based on available UI elements.
     Thoroughly examines and interacts with all types of interactive elements including:
@@ -232,6 +400,8 @@ async def perform_page_interactions(browser, user_prompt: str, max_time_seconds:
         browser: The browser wrapper instance
         user_prompt: The user query to contextualize interactions
         max_time_seconds: Maximum time to spend on interactions before timing out
+        element_selector: ElementSelector to use, e.g. one built on the agent's LLM;
+            a default pooled-OpenAI selector is created when omitted
         
     Returns:
         dict: Information about actions performed
@@ -246,7 +416,7 @@ async def perform_page_interactions(browser, user_prompt: str, max_time_seconds:
     checkbox_radio_count = 0
     
     # Initialize the element selector with LLM capabilities
-    element_selector = ElementSelector()
+    element_selector = element_selector or ElementSelector()
     
     # Get page information for context
     page_info = {
@@ -261,7 +431,6 @@ async def perform_page_interactions(browser, user_prompt: str, max_time_seconds:
     try:
         await thorough_page_scrolling(page)
         actions_performed.append("Thoroughly scrolled the page to discover all content")
-        await asyncio.sleep(2)  # Wait for content to load
     except Exception as e:
         logger.warning(f"Error during page scanning: {e}")
     
@@ -355,16 +524,40 @@ async def perform_page_interactions(browser, user_prompt: str, max_time_seconds:
                 "timeout_reached": True
             }
             
+        # Fields of a form group were already filled together with their form above
+        grouped_ids = {field["id"] for group in form_groups for field in form_group_fields(group)}
+        standalone_inputs = [input for input in element_details["inputs"] 
+                            if input.get("type") in ["text", "search", "email", "tel", "number"]
+                            and input.get("id") not in grouped_ids]
+        dropdowns = [d for d in element_details.get("dropdowns", []) if d.get("id") not in grouped_ids]
+        checkbox_radio = [c for c in element_details.get("checkbox_radio", []) if c.get("id") not in grouped_ids]
+        
+        # Plan the page's remaining dropdowns, checkboxes and inputs in one LLM
+        # call; fields left out of the plan (or all of them, if planning fails)
+        # are decided one by one below
+        page_fields = (
+            [form_field_schema("dropdown", d) for d in dropdowns]
+            + [form_field_schema("checkbox", c) for c in checkbox_radio]
+            + [form_field_schema("input", i) for i in standalone_inputs]
+        )[:MAX_PLANNED_FIELDS]
+        page_plan = await element_selector.plan_form(page_fields, user_prompt, page_info) if page_fields else None
+        planned_ids = {field["id"] for field in page_fields} if page_plan is not None else set()
+        page_plan = page_plan or {}
+        
         # 3.2: Handle individual dropdowns (select elements)
-        if element_details.get("dropdowns"):
-            for dropdown in element_details["dropdowns"]:
+        if dropdowns:
+            for dropdown in dropdowns:
                 # Check timeout before expensive operations
                 if is_timeout():
                     actions_performed.append("Timeout reached during dropdown interaction")
                     timeout_reached = True
                     break
-                    
-                if await interact_with_dropdown(page, dropdown, user_prompt, element_selector, page_info):
+                
+                planned_option = page_plan.get(dropdown["id"])
+                if dropdown["id"] in planned_ids and planned_option is None:
+                    continue
+                if await interact_with_dropdown(page, dropdown, user_prompt, element_selector, page_info,
+                                                planned_option=planned_option):
                     actions_performed.append(f"Selected option from dropdown: {dropdown.get('label', 'Dropdown')}")
         
         # Check timeout again before next interaction type
@@ -381,15 +574,17 @@ async def perform_page_interactions(browser, user_prompt: str, max_time_seconds:
             }
             
         # 3.3: Handle checkbox/radio button groups
-        if element_details.get("checkbox_radio"):
-            for element in element_details["checkbox_radio"]:
+        if checkbox_radio:
+            for element in checkbox_radio:
                 # Check timeout before expensive operations
                 if is_timeout():
                     actions_performed.append("Timeout reached during checkbox/radio interaction")
                     timeout_reached = True
                     break
                     
-                if await interact_with_checkbox_radio(page, element, user_prompt, element_selector, page_info):
+                if await interact_with_checkbox_radio(page, element, user_prompt, element_selector, page_info,
+                                                      planned=page_plan.get(element["id"], False)
+                                                      if element["id"] in planned_ids else None):
                     actions_performed.append(f"Toggled {element.get('type', 'checkbox/radio')}: {element.get('label', 'Option')}")
         
         # Check if timeout reached after checkbox/radio interactions
@@ -406,9 +601,6 @@ async def perform_page_interactions(browser, user_prompt: str, max_time_seconds:
             }
             
         # 3.4: Handle individual input fields that weren't part of a form group
-        standalone_inputs = [input for input in element_details["inputs"] 
-                            if input.get("type") in ["text", "search", "email", "tel", "number"]]
-        
         if standalone_inputs:
             # Check timeout before LLM operations
             if is_timeout():
@@ -436,8 +628,8 @@ async def perform_page_interactions(browser, user_prompt: str, max_time_seconds:
                 try:
                     input_elem = await page.query_selector(best_input["selector"])
                     if input_elem:
-                        # Generate appropriate input text using LLM
-                        input_text = await element_selector.generate_input_text(
+                        # Use the planned text, or generate appropriate input text using LLM
+                        input_text = page_plan.get(best_input["id"]) or await element_selector.generate_input_text(
                             best_input,
                             user_prompt,
                             page_info
@@ -453,7 +645,7 @@ async def perform_page_interactions(browser, user_prompt: str, max_time_seconds:
                             await submit_btn.click()
                             logger.info("Clicked nearby submit button")
                             actions_performed.append("Submitted form by clicking submit button")
-                            await asyncio.sleep(2)  # Wait for page to load
+                            await settle(page)  # Wait for page to load
                             return {
                                 "actions_performed": actions_performed,
                                 "elements_found": {
@@ -500,8 +692,8 @@ async def perform_page_interactions(browser, user_prompt: str, max_time_seconds:
                             logger.info(f"Clicked dropdown trigger: {best_element['text']}")
                             actions_performed.append(f"Opened dropdown: {best_element['text']}")
                             
-                            # After opening dropdown, wait and try to select an option
-                            await asyncio.sleep(1)
+                            # After opening dropdown, wait for its options and try to select one
+                            await settle(page, selector=DROPDOWN_OPTION_SELECTOR, timeout=1.0)
                             await select_dropdown_option(page, user_prompt)
                             actions_performed.append("Selected option from dropdown menu")
                         else:
@@ -510,7 +702,7 @@ async def perform_page_interactions(browser, user_prompt: str, max_time_seconds:
                             logger.info(f"Clicked element: {best_element['text']} (Reason: {best_element.get('selection_reason', 'N/A')})")
                             actions_performed.append(f"Clicked on: {best_element['text']}")
                             
-                        await asyncio.sleep(2)  # Wait for any changes to take effect
+                        await settle(page)  # Wait for any changes to take effect
                 except Exception as e:
                     logger.warning(f"Error clicking element: {e}")
     except Exception as e:
@@ -531,219 +723,256 @@ async def perform_page_interactions(browser, user_prompt: str, max_time_seconds:
     
     return result
 
-async def get_interactive_elements_with_details(page) -> Dict[str, List[Dict]]:
-    """Get detailed information about all interactive elements on the page."""
-    elements_info = {
-        "clickable": [],
-        "inputs": [],
-        "dropdowns": [],
-        "checkbox_radio": []
+CLICKABLE_SELECTORS = [
+    'button', 
+    'a[href]', 
+    '[role="button"]', 
+    '[onclick]', 
+    'input[type="button"]', 
+    'input[type="submit"]',
+    '.btn',
+    '[class*="button"]',
+    '[class*="btn"]',
+    '[tabindex="0"]',
+    '[data-toggle]',
+    '.accordion-header',
+    '.card-header',
+    '[aria-haspopup="true"]',
+    '[role="tab"]'
+]
+
+INPUT_SELECTORS = [
+    'input[type="text"]', 
+    'input[type="search"]', 
+    'input[type="email"]',
+    'input[type="password"]',
+    'input[type="tel"]',
+    'input[type="number"]',
+    'input[type="date"]',
+    'input[type="url"]',
+    'textarea',
+    '[contenteditable="true"]',
+    '[role="textbox"]'
+]
+
+DROPDOWN_SELECTORS = [
+    'select',
+    '[role="combobox"]',
+    '[role="listbox"]',
+    '.dropdown',
+    '.dropdown-toggle',
+    '[data-toggle="dropdown"]',
+    '[aria-haspopup="listbox"]'
+]
+
+# Options of an opened custom dropdown; waited for after clicking its trigger
+DROPDOWN_OPTION_SELECTOR = (
+    '[role="option"]:visible, .dropdown-item:visible, .select-option:visible, '
+    '.menu-item:visible, .autocomplete-option:visible'
+)
+
+CHECKBOX_RADIO_SELECTORS = [
+    'input[type="checkbox"]',
+    'input[type="radio"]',
+    '[role="checkbox"]',
+    '[role="radio"]',
+    '[role="switch"]'
+]
+
+# In-page port of get_element_text, find_input_label, generate_unique_selector and
+# Playwright's is_visible, so the whole inventory is built in one round trip.
+_ELEMENT_INVENTORY_SCRIPT = r"""
+(selectors) => {
+    const attr = (el, name) => el.getAttribute(name) || '';
+
+    const isVisible = (el) => {
+        const style = window.getComputedStyle(el);
+        if (style.visibility === 'hidden') return false;
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+
+    const elementText = (el) => {
+        const text = (el.textContent || '').trim();
+        if (text) return text;
+        for (const name of ['value', 'placeholder', 'title', 'aria-label', 'alt']) {
+            const value = attr(el, name).trim();
+            if (value) return value;
+        }
+        return '';
+    };
+
+    const xpathTo = (el) => {
+        if (el.id) return `//*[@id="${el.id}"]`;
+        const parent = el.parentNode;
+        if (!parent || !parent.children) return '';
+        const tagSiblings = Array.from(parent.children).filter(s => s.tagName === el.tagName);
+        return `${xpathTo(parent)}/${el.tagName.toLowerCase()}[${tagSiblings.indexOf(el) + 1}]`;
+    };
+
+    const uniqueSelector = (el) => {
+        const id = attr(el, 'id');
+        if (id) return '#' + id.replace(/:/g, '\\:').replace(/\./g, '\\.');
+        for (const name of ['name', 'placeholder', 'role', 'type']) {
+            const value = attr(el, name);
+            if (value) return `${el.tagName.toLowerCase()}[${name}="${value}"]`;
+        }
+        return xpathTo(el);
+    };
+
+    const labelsFor = new Map();
+    for (const label of document.querySelectorAll('label[for]')) {
+        const key = label.getAttribute('for');
+        if (!labelsFor.has(key)) labelsFor.set(key, label);
     }
-    
-    # Process clickable elements
-    try:
-        # Get all potentially clickable elements
-        clickable_selectors = [
-            'button', 
-            'a[href]', 
-            '[role="button"]', 
-            '[onclick]', 
-            'input[type="button"]', 
-            'input[type="submit"]',
-            '.btn',
-            '[class*="button"]',
-            '[class*="btn"]',
-            '[tabindex="0"]',
-            '[data-toggle]',
-            '.accordion-header',
-            '.card-header',
-            '[aria-haspopup="true"]',
-            '[role="tab"]'
-        ]
-        
-        clickable_elements = await page.query_selector_all(', '.join(clickable_selectors))
-        
-        id_counter = 0
-        for element in clickable_elements:
-            id_counter += 1
-            
-            # Get element properties
-            tag_name = await page.evaluate('el => el.tagName.toLowerCase()', element)
-            text = await get_element_text(element)
-            href = await element.get_attribute('href') if tag_name == 'a' else None
-            role = await element.get_attribute('role') 
-            element_id = await element.get_attribute('id')
-            element_class = await element.get_attribute('class')
-            
-            # Get element selector for future reference
-            selector = await generate_unique_selector(page, element)
-            
-            # Determine element type
-            element_type = "link" if tag_name == 'a' else "button"
-            if role:
-                element_type = role
-                
-            # Only include visible elements with some text or identifiable attributes
-            is_visible = await element.is_visible()
-            if is_visible and (text or href or element_id or element_class):
-                elements_info["clickable"].append({
-                    "id": f"clickable_{id_counter}",
-                    "text": text,
-                    "element_type": element_type,
-                    "href": href,
-                    "tag": tag_name,
-                    "selector": selector,
-                    "visible": is_visible
-                })
-    except Exception as e:
-        logger.warning(f"Error analyzing clickable elements: {e}")
-    
-    # Process regular form inputs (text, search, email, etc.)
-    try:
-        input_selectors = [
-            'input[type="text"]', 
-            'input[type="search"]', 
-            'input[type="email"]',
-            'input[type="password"]',
-            'input[type="tel"]',
-            'input[type="number"]',
-            'input[type="date"]',
-            'input[type="url"]',
-            'textarea',
-            '[contenteditable="true"]',
-            '[role="textbox"]'
-        ]
-        
-        input_elements = await page.query_selector_all(', '.join(input_selectors))
-        
-        id_counter = 0
-        for element in input_elements:
-            id_counter += 1
-            
-            # Get input properties
-            input_type = await element.get_attribute('type') or 'text'
-            placeholder = await element.get_attribute('placeholder') or ''
-            name = await element.get_attribute('name') or ''
-            element_id = await element.get_attribute('id') or ''
-            
-            # Try to find associated label
-            label_text = await find_input_label(page, element, element_id)
-            
-            # Get element selector for future reference
-            selector = await generate_unique_selector(page, element)
-            
-            # Only include visible inputs
-            is_visible = await element.is_visible()
-            if is_visible:
-                elements_info["inputs"].append({
-                    "id": f"input_{id_counter}",
-                    "type": input_type,
-                    "placeholder": placeholder,
-                    "name": name,
-                    "label": label_text,
-                    "element_id": element_id,
-                    "selector": selector,
-                    "visible": is_visible
-                })
-    except Exception as e:
-        logger.warning(f"Error analyzing form inputs: {e}")
-    
-    # Process dropdowns (select elements and custom dropdowns)
-    try:
-        dropdown_selectors = [
-            'select',
-            '[role="combobox"]',
-            '[role="listbox"]',
-            '.dropdown',
-            '.dropdown-toggle',
-            '[data-toggle="dropdown"]',
-            '[aria-haspopup="listbox"]'
-        ]
-        
-        dropdown_elements = await page.query_selector_all(', '.join(dropdown_selectors))
-        
-        id_counter = 0
-        for element in dropdown_elements:
-            id_counter += 1
-            
-            # Get dropdown properties
-            tag_name = await page.evaluate('el => el.tagName.toLowerCase()', element)
-            text = await get_element_text(element)
-            element_id = await element.get_attribute('id') or ''
-            
-            # Try to find associated label
-            label_text = await find_input_label(page, element, element_id)
-            
-            # Get element selector for future reference
-            selector = await generate_unique_selector(page, element)
-            
-            # Determine dropdown type
-            dropdown_type = "select" if tag_name == "select" else "dropdown"
-            
-            # Only include visible dropdowns
-            is_visible = await element.is_visible()
-            if is_visible:
-                elements_info["dropdowns"].append({
-                    "id": f"dropdown_{id_counter}",
-                    "text": text,
-                    "element_type": dropdown_type,
-                    "label": label_text,
-                    "element_id": element_id,
-                    "selector": selector,
-                    "visible": is_visible
-                })
-    except Exception as e:
-        logger.warning(f"Error analyzing dropdowns: {e}")
-    
-    # Process checkboxes and radio buttons
+    let labelCandidates = null;
+    const candidateRects = () => {
+        if (!labelCandidates) {
+            labelCandidates = Array.from(document.querySelectorAll('label, span, div, p'))
+                .map(node => ({node, rect: node.getBoundingClientRect()}));
+        }
+        return labelCandidates;
+    };
+
+    const findLabel = (el, id) => {
+        if (id && labelsFor.has(id)) {
+            const text = (labelsFor.get(id).textContent || '').trim();
+            if (text) return text;
+        }
+        const wrapping = el.closest('label');
+        if (wrapping && wrapping.textContent) {
+            let text = wrapping.textContent;
+            const own = elementText(el);
+            if (own) text = text.replace(own, '');
+            return text.trim();
+        }
+        const aria = attr(el, 'aria-label');
+        if (aria) return aria.trim();
+        const sibling = el.previousElementSibling;
+        if (sibling && sibling.textContent.trim()) return sibling.textContent.trim();
+        const parent = el.parentElement;
+        if (parent && parent.firstElementChild && parent.firstElementChild !== el) {
+            return (parent.firstElementChild.textContent || '').trim();
+        }
+        const rect = el.getBoundingClientRect();
+        for (const {node, rect: r} of candidateRects()) {
+            const isAbove = Math.abs(r.bottom - rect.top) < 20;
+            const isLeftAligned = Math.abs(r.left - rect.left) < 20;
+            const isToLeft = Math.abs(r.right - rect.left) < 20;
+            if ((isAbove || isLeftAligned || isToLeft) && node.textContent.trim()) {
+                return node.textContent.trim();
+            }
+        }
+        return '';
+    };
+
+    const info = {clickable: [], inputs: [], dropdowns: [], checkbox_radio: []};
+
+    let counter = 0;
+    for (const el of document.querySelectorAll(selectors.clickable)) {
+        counter++;
+        const tag = el.tagName.toLowerCase();
+        const text = elementText(el);
+        const href = tag === 'a' ? el.getAttribute('href') : null;
+        const role = el.getAttribute('role');
+        const id = el.getAttribute('id');
+        const cls = el.getAttribute('class');
+        if (isVisible(el) && (text || href || id || cls)) {
+            info.clickable.push({
+                id: `clickable_${counter}`,
+                text: text,
+                element_type: role || (tag === 'a' ? 'link' : 'button'),
+                href: href,
+                tag: tag,
+                selector: uniqueSelector(el),
+                visible: true
+            });
+        }
+    }
+
+    counter = 0;
+    for (const el of document.querySelectorAll(selectors.inputs)) {
+        counter++;
+        if (!isVisible(el)) continue;
+        const id = attr(el, 'id');
+        info.inputs.push({
+            id: `input_${counter}`,
+            type: attr(el, 'type') || 'text',
+            placeholder: attr(el, 'placeholder'),
+            name: attr(el, 'name'),
+            label: findLabel(el, id),
+            element_id: id,
+            selector: uniqueSelector(el),
+            visible: true
+        });
+    }
+
+    counter = 0;
+    for (const el of document.querySelectorAll(selectors.dropdowns)) {
+        counter++;
+        if (!isVisible(el)) continue;
+        const id = attr(el, 'id');
+        info.dropdowns.push({
+            id: `dropdown_${counter}`,
+            text: elementText(el),
+            element_type: el.tagName.toLowerCase() === 'select' ? 'select' : 'dropdown',
+            options: el.tagName === 'SELECT'
+                ? Array.from(el.options).map(o => o.text.trim()).filter(t => t).slice(0, 50)
+                : [],
+            label: findLabel(el, id),
+            element_id: id,
+            selector: uniqueSelector(el),
+            visible: true
+        });
+    }
+
+    counter = 0;
+    for (const el of document.querySelectorAll(selectors.checkbox_radio)) {
+        counter++;
+        if (!isVisible(el)) continue;
+        const id = attr(el, 'id');
+        const checked = el.tagName === 'INPUT'
+            ? !!el.checked
+            : el.getAttribute('aria-checked') === 'true';
+        info.checkbox_radio.push({
+            id: `check_radio_${counter}`,
+            type: attr(el, 'type') || attr(el, 'role') || 'checkbox',
+            name: attr(el, 'name'),
+            label: findLabel(el, id),
+            element_id: id,
+            selector: uniqueSelector(el),
+            visible: true,
+            checked: checked
+        });
+    }
+
+    return info;
+}
+"""
+
+async def get_interactive_elements_with_details(page) -> Dict[str, List[Dict]]:
+    """
+    Get detailed information about all interactive elements on the page.
+
+    Text, labels, visibility and a unique selector for every clickable element,
+    input, dropdown and checkbox/radio are computed inside the page in a single
+    evaluate call rather than one round trip per element attribute.
+    """
     try:
-        checkbox_radio_selectors = [
-            'input[type="checkbox"]',
-            'input[type="radio"]',
-            '[role="checkbox"]',
-            '[role="radio"]',
-            '[role="switch"]'
-        ]
-        
-        checkbox_radio_elements = await page.query_selector_all(', '.join(checkbox_radio_selectors))
-        
-        id_counter = 0
-        for element in checkbox_radio_elements:
-            id_counter += 1
-            
-            # Get properties
-            input_type = await element.get_attribute('type') or await element.get_attribute('role') or 'checkbox'
-            name = await element.get_attribute('name') or ''
-            element_id = await element.get_attribute('id') or ''
-            # Try to get checked state safely
-            try:
-                is_checked = await element.is_checked()
-            except Exception:
-                is_checked = False
-            
-            # Try to find associated label
-            label_text = await find_input_label(page, element, element_id)
-            
-            # Get element selector for future reference
-            selector = await generate_unique_selector(page, element)
-            
-            # Only include visible elements
-            is_visible = await element.is_visible()
-            if is_visible:
-                elements_info["checkbox_radio"].append({
-                    "id": f"check_radio_{id_counter}",
-                    "type": input_type,
-                    "name": name,
-                    "label": label_text,
-                    "element_id": element_id,
-                    "selector": selector,
-                    "visible": is_visible,
-                    "checked": is_checked
-                })
+        return await page.evaluate(_ELEMENT_INVENTORY_SCRIPT, {
+            "clickable": ', '.join(CLICKABLE_SELECTORS),
+            "inputs": ', '.join(INPUT_SELECTORS),
+            "dropdowns": ', '.join(DROPDOWN_SELECTORS),
+            "checkbox_radio": ', '.join(CHECKBOX_RADIO_SELECTORS)
+        })
     except Exception as e:
-        logger.warning(f"Error analyzing checkboxes/radio buttons: {e}")
-        
-    return elements_info
+        logger.warning(f"Error analyzing interactive elements: {e}")
+        return {
+            "clickable": [],
+            "inputs": [],
+            "dropdowns": [],
+            "checkbox_radio": []
+        }
 
 async def find_input_label(page, element, element_id=""):
     """Find the label text associated with an input element."""
@@ -912,77 +1141,171 @@ async def extract_page_content_snippet(page, max_length=1000):
     
     return ""
 
-async def thorough_page_scrolling(page):
-    """Scroll through the page thoroughly to load all dynamic content."""
-    try:
-        # Get page height
-        height = await page.evaluate('() => document.body.scrollHeight')
-        
-        # Scroll in increments
-        step = height / 5  # Divide into 5 sections
-        
-        for i in range(6):  # 0%, 20%, 40%, 60%, 80%, 100%
-            position = i * step
-            await page.evaluate(f'''
-                () => {{
-                    window.scrollTo({{
-                        top: {position},
-                        behavior: 'smooth'
-                    }});
-                }}
-            ''')
-            await asyncio.sleep(0.5)  # Wait between scrolls
-            
-        # Final scroll back to top
-        await page.evaluate('''
-            () => {
-                window.scrollTo({
-                    top: 0,
-                    behavior: 'smooth'
-                });
+_SCROLL_DRIVER_SCRIPT = r"""
+async (opts) => {
+    const started = performance.now();
+    const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+    const scrollHeight = () => Math.max(
+        document.documentElement.scrollHeight, document.body ? document.body.scrollHeight : 0
+    );
+    const requestCount = () => performance.getEntriesByType('resource').length;
+
+    let lastActivity = performance.now();
+    let addedNodes = 0;
+    const observer = new MutationObserver(records => {
+        lastActivity = performance.now();
+        for (const record of records) addedNodes += record.addedNodes.length;
+    });
+    observer.observe(document.documentElement, {childList: true, subtree: true});
+
+    // Resolve once neither the DOM nor the resource count changed for quietMs
+    const settle = async () => {
+        let requests = requestCount();
+        lastActivity = performance.now();
+        while (performance.now() - started < opts.timeoutMs) {
+            await sleep(50);
+            const current = requestCount();
+            if (current !== requests) {
+                requests = current;
+                lastActivity = performance.now();
             }
-        ''')
-        await asyncio.sleep(0.5)
+            if (performance.now() - lastActivity >= opts.quietMs) return;
+        }
+    };
+
+    let steps = 0;
+    let reason = 'settled';
+    let height = scrollHeight();
+    try {
+        let position = 0;
+        const stride = Math.max(window.innerHeight, height / opts.sections);
+        while (true) {
+            position = Math.min(position + stride, height);
+            window.scrollTo(0, position);
+            steps++;
+            await settle();
+            const newHeight = scrollHeight();
+            if (performance.now() - started >= opts.timeoutMs) { reason = 'timeout'; break; }
+            if (addedNodes >= opts.maxItems) { reason = 'item_budget'; break; }
+            if (document.documentElement.innerHTML.length >= opts.maxBytes) { reason = 'byte_budget'; break; }
+            if (steps >= opts.maxSteps) { reason = 'max_steps'; break; }
+            // at the bottom and nothing more was loaded
+            if (position + window.innerHeight >= newHeight && newHeight === height) break;
+            height = newHeight;
+        }
+    } finally {
+        observer.disconnect();
+        window.scrollTo(0, 0);
+    }
+    return {
+        steps: steps,
+        height: scrollHeight(),
+        added_nodes: addedNodes,
+        reason: reason,
+        elapsed_ms: Math.round(performance.now() - started)
+    };
+}
+"""
+
+async def thorough_page_scrolling(
+    page,
+    quiet_ms: int = SCROLL_QUIET_MS,
+    timeout_seconds: float = SCROLL_TIMEOUT_SECONDS,
+    max_items: int = SCROLL_MAX_ITEMS,
+    max_bytes: int = SCROLL_MAX_BYTES
+) -> Dict[str, Any]:
+    """
+    Scroll through the page to load all dynamic content.
+
+    The page is scrolled in steps inside a single evaluate call; after each
+    step the driver waits until DOM mutations and the resource request count
+    have been quiet for `quiet_ms`, and it stops once the bottom is reached
+    without `scrollHeight` growing. Infinite-scroll feeds stop at the item
+    (added DOM nodes) or byte (document HTML size) budget, or at the timeout.
+
+    Returns:
+        Dict[str, Any]: steps, height, added_nodes, reason and elapsed_ms, or
+        an empty dict if scrolling failed
+    """
+    try:
+        stats = await page.evaluate(_SCROLL_DRIVER_SCRIPT, {
+            "quietMs": quiet_ms,
+            "timeoutMs": int(timeout_seconds * 1000),
+            "maxItems": max_items,
+            "maxBytes": max_bytes,
+            "maxSteps": SCROLL_MAX_STEPS,
+            "sections": 5
+        })
+        logger.info(
+            f"Scrolled page in {stats['steps']} steps ({stats['added_nodes']} nodes loaded, "
+            f"{stats['elapsed_ms']} ms, stopped: {stats['reason']})"
+        )
+        return stats
     except Exception as e:
         logger.warning(f"Error during thorough scrolling: {e}")
+        return {}
+
+_FORM_MEMBERSHIP_SCRIPT = r"""
+(args) => {
+    const find = (selector) => {
+        try {
+            if (selector.startsWith('/')) {
+                return document.evaluate(selector, document, null,
+                    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            }
+            return document.querySelector(selector);
+        } catch (e) {
+            return null;
+        }
+    };
+    const form = find(args.form);
+    return args.selectors.map(selector => {
+        const el = find(selector);
+        return !!(form && el && form.contains(el));
+    });
+}
+"""
 
 async def identify_form_groups(page, element_details):
-    """Identify logical form groups (inputs that should be filled together)."""
+    """
+    Identify logical form groups (fields that should be filled together).
+    Each group lists the form's text `inputs`, `dropdowns` and `checkbox_radio`
+    elements; membership is checked for all fields of a form in one evaluate call.
+    """
     form_groups = []
     
     try:
         # Find all form elements
         forms = await page.query_selector_all('form')
+        fields = [
+            (kind, field)
+            for kind in ("inputs", "dropdowns", "checkbox_radio")
+            for field in element_details.get(kind, [])
+        ]
+        if not fields:
+            return form_groups
         
         for i, form in enumerate(forms):
-            # Get all inputs within this form
-            form_inputs = []
-            
             # Find selector for the form
             form_selector = await generate_unique_selector(page, form)
             
-            # Collect all inputs that belong to this form
-            for input_elem in element_details["inputs"]:
-                input_selector = input_elem["selector"]
-                belongs_to_form = await page.evaluate(f'''
-                    (selector, formSelector) => {{
-                        const input = document.querySelector(selector);
-                        const form = document.querySelector(formSelector);
-                        return input && form && form.contains(input);
-                    }}
-                ''', input_selector, form_selector)
-                
-                if belongs_to_form:
-                    form_inputs.append(input_elem)
-            
-            # If we found multiple inputs in this form, consider it a form group
-            if len(form_inputs) > 1:
+            belongs_to_form = await page.evaluate(_FORM_MEMBERSHIP_SCRIPT, {
+                "form": form_selector,
+                "selectors": [field["selector"] for _, field in fields]
+            })
+            group = {"inputs": [], "dropdowns": [], "checkbox_radio": []}
+            for (kind, field), member in zip(fields, belongs_to_form):
+                if member:
+                    group[kind].append(field)
+            
+            # If we found multiple fields in this form, consider it a form group
+            if sum(len(members) for members in group.values()) > 1:
                 # Try to get form description (e.g. from legend, title attribute, etc.)
                 description = await get_form_description(page, form) or f"Form {i+1}"
                 
                 form_groups.append({
                     "id": f"form_group_{i}",
-                    "inputs": form_inputs,
+                    **group,
                     "description": description,
                     "selector": form_selector
                 })
@@ -991,6 +1314,17 @@ async def identify_form_groups(page, element_details):
     
     return form_groups
 
+def form_group_fields(form_group) -> List[Dict[str, Any]]:
+    """Field schemas for every fillable field of a form group, for ElementSelector.plan_form."""
+    fields = [
+        form_field_schema("checkbox" if info.get("type") in ("checkbox", "radio") else "input", info)
+        for info in form_group.get("inputs", [])
+        if info.get("type", "text") in ("text", "search", "email", "tel", "number", "password", "checkbox", "radio")
+    ]
+    fields += [form_field_schema("dropdown", info) for info in form_group.get("dropdowns", [])]
+    fields += [form_field_schema("checkbox", info) for info in form_group.get("checkbox_radio", [])]
+    return fields
+
 async def get_form_description(page, form_elem):
     """Try to get a description for a form from various attributes."""
     try:
@@ -1174,13 +1508,13 @@ async def interact_with_search_form(page, search_form, user_prompt, element_sele
             if submit_btn:
                 await submit_btn.click()
                 logger.info("Clicked search submit button")
-                await asyncio.sleep(2)  # Wait for search results
+                await settle(page)  # Wait for search results
                 return True
                 
         # Otherwise, press Enter to submit
         await input_elem.press("Enter")
         logger.info("Pressed Enter to submit search")
-        await asyncio.sleep(2)  # Wait for search results
+        await settle(page)  # Wait for search results
         return True
         
     except Exception as e:
@@ -1188,9 +1522,16 @@ async def interact_with_search_form(page, search_form, user_prompt, element_sele
         return False
 
 async def interact_with_form_group(page, form_group, user_prompt, element_selector, page_info):
-    """Fill in all fields in a form group intelligently."""
+    """
+    Fill in all fields in a form group intelligently.
+    Values for the whole form are planned in one LLM call; if planning is
+    unavailable each field is decided on its own.
+    """
     try:
         inputs_filled = 0
+        plan = await element_selector.plan_form(
+            form_group_fields(form_group), user_prompt, page_info, form_group.get("description", "")
+        )
         
         # For each input in the form
         for input_info in form_group["inputs"]:
@@ -1203,11 +1544,16 @@ async def interact_with_form_group(page, form_group, user_prompt, element_select
             # Handle different input types
             if input_type in ["text", "search", "email", "tel", "number", "password"]:
                 # Generate appropriate text
-                input_text = await element_selector.generate_input_text(
-                    input_info,
-                    user_prompt,
-                    page_info
-                )
+                if plan is not None:
+                    input_text = plan.get(input_info.get("id"))
+                    if not input_text:
+                        continue
+                else:
+                    input_text = await element_selector.generate_input_text(
+                        input_info,
+                        user_prompt,
+                        page_info
+                    )
                 
                 await input_elem.fill(input_text)
                 logger.info(f"Filled form input ({input_type}): '{input_text}'")
@@ -1215,7 +1561,10 @@ async def interact_with_form_group(page, form_group, user_prompt, element_select
                 
             elif input_type == "checkbox" or input_type == "radio":
                 # Decide whether to check this box/radio based on relevance to user goal
-                should_check = await should_toggle_checkbox(input_info, user_prompt, element_selector, page_info)
+                if plan is not None:
+                    should_check = plan.get(input_info.get("id"), False)
+                else:
+                    should_check = await should_toggle_checkbox(input_info, user_prompt, element_selector, page_info)
                 
                 if should_check:
                     await input_elem.check()
@@ -1226,8 +1575,24 @@ async def interact_with_form_group(page, form_group, user_prompt, element_select
                 # File uploads are complex, just log for now
                 logger.info(f"Found file input: {input_info.get('id', 'Unknown')} (not automatically handling file uploads)")
                 
-            # Brief pause between inputs to simulate human behavior
-            await asyncio.sleep(0.5)
+            # Let autocompletion and dependent fields react before the next input
+            await settle(page, timeout=1.0, quiet_ms=100)
+        
+        for dropdown in form_group.get("dropdowns", []):
+            planned_option = plan.get(dropdown.get("id")) if plan is not None else None
+            if plan is not None and planned_option is None:
+                continue
+            if await interact_with_dropdown(page, dropdown, user_prompt, element_selector, page_info,
+                                            planned_option=planned_option):
+                inputs_filled += 1
+        
+        for element in form_group.get("checkbox_radio", []):
+            planned = plan.get(element.get("id")) if plan is not None else None
+            if plan is not None and planned is None:
+                continue
+            if await interact_with_checkbox_radio(page, element, user_prompt, element_selector, page_info,
+                                                  planned=planned):
+                inputs_filled += 1
             
         # After filling inputs, try to find and click a submit button
         form_elem = await page.query_selector(form_group["selector"])
@@ -1237,7 +1602,7 @@ async def interact_with_form_group(page, form_group, user_prompt, element_select
             if submit_btns and len(submit_btns) > 0:
                 await submit_btns[0].click()
                 logger.info(f"Submitted form: {form_group['description']}")
-                await asyncio.sleep(2)  # Wait for form submission
+                await settle(page)  # Wait for form submission
                 return True
                 
         return inputs_filled > 0
@@ -1270,14 +1635,7 @@ async def should_toggle_checkbox(checkbox_info, user_prompt, element_selector, p
             Return ONLY 'yes' or 'no'.
             """
             
-            response = element_selector.client.chat.completions.create(
-                model=element_selector.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=10,
-                temperature=0.3,
-            )
-            
-            decision = response.choices[0].message.content.strip().lower()
+            decision = (await element_selector._complete(prompt, max_tokens=10)).lower()
             return decision == "yes"
             
         except Exception as e:
@@ -1354,8 +1712,13 @@ async def should_toggle_checkbox(checkbox_info, user_prompt, element_selector, p
     
     return should_check
 
-async def interact_with_dropdown(page, dropdown_info, user_prompt, element_selector, page_info):
-    """Select an appropriate option from a dropdown menu based on user goal."""
+async def interact_with_dropdown(page, dropdown_info, user_prompt, element_selector, page_info,
+                                planned_option: Optional[str] = None):
+    """
+    Select an appropriate option from a dropdown menu based on user goal.
+    `planned_option` (e.g. from ElementSelector.plan_form) is used when it
+    matches an available option, skipping the per-dropdown LLM call.
+    """
     try:
         dropdown = await page.query_selector(dropdown_info["selector"])
         if not dropdown or not await dropdown.is_visible():
@@ -1366,10 +1729,10 @@ async def interact_with_dropdown(page, dropdown_info, user_prompt, element_selec
         if not options or len(options) == 0:
             return False
             
-        # Use LLM to select the best option if available
-        selected_option = None
+        # Use the planned option, or ask the LLM if available
+        selected_option = match_option(planned_option, options) if planned_option else None
         
-        if element_selector.client:
+        if not selected_option and element_selector.client:
             try:
                 prompt = f"""
                 You are helping select the most appropriate option from a dropdown menu
@@ -1392,24 +1755,10 @@ async def interact_with_dropdown(page, dropdown_info, user_prompt, element_selec
                 If none seem appropriate, select a default or neutral option.
                 """
                 
-                response = element_selector.client.chat.completions.create(
-                    model=element_selector.model,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=50,
-                    temperature=0.3,
-                )
+                selected_option = await element_selector._complete(prompt, max_tokens=50)
                 
-                selected_option = response.choices[0].message.content.strip()
-                
-                # Make sure the selected option actually exists
-                if selected_option not in options:
-                    # Try to find a close match
-                    for option in options:
-                        if selected_option.lower() in option.lower():
-                            selected_option = option
-                            break
-                    else:
-                        selected_option = None  # No match found
+                # Make sure the selected option actually exists, or find a close match
+                selected_option = match_option(selected_option, options)
                         
             except Exception as e:
                 logger.warning(f"Error using LLM for dropdown selection: {e}")
@@ -1522,7 +1871,7 @@ async def try_select_dropdown_option(page, dropdown, option_text):
             
         # Method 2: Click the dropdown to open it
         await dropdown.click()
-        await asyncio.sleep(0.5)  # Wait for animation
+        await settle(page, selector=DROPDOWN_OPTION_SELECTOR, timeout=1.0)  # Wait for the options to open
         
         # Method 3: Find and click the specific option
         option_found = await page.evaluate('''
@@ -1639,15 +1988,19 @@ async def select_dropdown_option(page, user_prompt):
         logger.warning(f"Error selecting from open dropdown: {e}")
         return False
 
-async def interact_with_checkbox_radio(page, element_info, user_prompt, element_selector, page_info):
-    """Toggle a checkbox or radio button based on user goal."""
+async def interact_with_checkbox_radio(page, element_info, user_prompt, element_selector, page_info,
+                                      planned: Optional[bool] = None):
+    """Toggle a checkbox or radio button based on user goal, or to the `planned` state if given."""
     try:
         element = await page.query_selector(element_info["selector"])
         if not element or not await element.is_visible():
             return False
             
         # Decide whether to check this box/radio
-        should_check = await should_toggle_checkbox(element_info, user_prompt, element_selector, page_info)
+        if planned is not None:
+            should_check = planned
+        else:
+            should_check = await should_toggle_checkbox(element_info, user_prompt, element_selector, page_info)
         
         # Get current state
         is_checked = await element.is_checked()
@@ -1,16 +1,164 @@
 import asyncio
 import logging
+from typing import Dict, Optional
+from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
+READINESS_STRATEGIES = ("domcontentloaded", "load", "networkidle", "content")
+
+# Resolves once some main-content region (or else the body) has enough text to
+# be worth extracting, or when the document is not HTML at all (e.g. a PDF).
+# Every candidate region is checked, not just the first match, so a short
+# banner or an empty <main> does not hold readiness back.
+_MAIN_CONTENT_READY_SCRIPT = '''
+(minChars) => {
+    if (document.contentType && !document.contentType.includes('html')) return true;
+    if (!document.body || document.readyState === 'loading') return false;
+    const length = (el) => (el.innerText || '').trim().length;
+    for (const region of document.querySelectorAll('main, article, [role="main"], #main, #content, .content')) {
+        if (length(region) >= minChars) return true;
+    }
+    return length(document.body) >= minChars;
+}
+'''
+
+
+# Resolves once neither the DOM nor the count of finished resource requests has
+# changed for quietMs, or after timeoutMs at the latest.
+_DOM_QUIET_SCRIPT = '''
+(opts) => new Promise(resolve => {
+    const started = performance.now();
+    const requestCount = () => performance.getEntriesByType('resource').length;
+    let lastActivity = started;
+    let requests = requestCount();
+    const observer = new MutationObserver(() => { lastActivity = performance.now(); });
+    observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+    const timer = setInterval(() => {
+        const now = performance.now();
+        const current = requestCount();
+        if (current !== requests) {
+            requests = current;
+            lastActivity = now;
+        }
+        const quiet = now - lastActivity >= opts.quietMs;
+        if (quiet || now - started >= opts.timeoutMs) {
+            clearInterval(timer);
+            observer.disconnect();
+            resolve(quiet);
+        }
+    }, 50);
+})
+'''
+
+# Requests worth waiting for after an interaction; beacons, media and
+# long-lived streams would keep a page from ever settling.
+SETTLE_RESOURCE_TYPES = ("document", "xhr", "fetch")
+SETTLE_TIMEOUT = 5.0
+SETTLE_QUIET_MS = 250
+
+
+class NavigationPolicy:
+    """
+    How navigation decides a page is ready for extraction.
+
+    Strategies:
+        domcontentloaded: return as soon as the DOM is parsed
+        load: wait for the full load event (the old behaviour)
+        networkidle: wait for network quiet, but no longer than `network_idle_cap`
+        content: wait until a main-content region (or the body) holds `min_content_chars`
+            of text, but no longer than `content_wait_cap`
+    """
+
+    def __init__(
+        self,
+        strategy: str = "content",
+        timeout: float = 15.0,
+        deadline: float = 30.0,
+        network_idle_cap: float = 3.0,
+        content_wait_cap: float = 3.0,
+        min_content_chars: int = 200,
+        domain_timeouts: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            strategy: One of READINESS_STRATEGIES
+            timeout: Seconds allowed for the initial navigation response
+            deadline: Hard cap in seconds for navigation plus readiness waiting
+            network_idle_cap: Longest wait for network idle under the "networkidle" strategy
+            content_wait_cap: Longest wait for content under the "content" strategy; past it
+                the page is used as of domcontentloaded
+            min_content_chars: Text length that counts as content under the "content" strategy
+            domain_timeouts: Per-domain navigation timeouts; subdomains inherit their parent's value
+        """
+        if strategy not in READINESS_STRATEGIES:
+            raise ValueError(f"Unknown readiness strategy '{strategy}', expected one of {READINESS_STRATEGIES}")
+        self.strategy = strategy
+        self.timeout = timeout
+        self.deadline = deadline
+        self.network_idle_cap = network_idle_cap
+        self.content_wait_cap = content_wait_cap
+        self.min_content_chars = min_content_chars
+        self.domain_timeouts = {d.lower(): t for d, t in (domain_timeouts or {}).items()}
+
+    def timeout_for(self, url: str) -> float:
+        host = (urlparse(url).hostname or "").lower()
+        matches = [d for d in self.domain_timeouts if host == d or host.endswith("." + d)]
+        if matches:
+            return self.domain_timeouts[max(matches, key=len)]
+        return self.timeout
+
+
+DEFAULT_NAVIGATION_POLICY = NavigationPolicy()
+
+
+async def navigate(page, url: str, policy: Optional[NavigationPolicy] = None) -> str:
+    """
+    Navigate `page` to `url` and wait until it is ready according to `policy`.
+
+    A failed or timed-out navigation raises. Running past the readiness wait or
+    the overall deadline does not: extraction proceeds on whatever has loaded.
+
+    Returns:
+        str: How readiness was reached ("ready", "timeout" or "deadline")
+    """
+    policy = policy or DEFAULT_NAVIGATION_POLICY
+    loop = asyncio.get_event_loop()
+    deadline_at = loop.time() + policy.deadline
+    goto_timeout = min(policy.timeout_for(url), policy.deadline)
+    wait_until = "load" if policy.strategy == "load" else "domcontentloaded"
+
+    await page.goto(url, wait_until=wait_until, timeout=goto_timeout * 1000)
+
+    remaining = deadline_at - loop.time()
+    if policy.strategy in ("domcontentloaded", "load"):
+        return "ready"
+    if remaining <= 0:
+        logger.warning(f"Navigation deadline reached for {url} before readiness check")
+        return "deadline"
+    try:
+        if policy.strategy == "networkidle":
+            await page.wait_for_load_state("networkidle", timeout=min(policy.network_idle_cap, remaining) * 1000)
+        else:
+            await page.wait_for_function(
+                _MAIN_CONTENT_READY_SCRIPT,
+                arg=policy.min_content_chars,
+                timeout=min(policy.content_wait_cap, remaining) * 1000,
+                polling=100
+            )
+        return "ready"
+    except Exception as e:
+        logger.info(f"Readiness wait ({policy.strategy}) for {url} ended early: {e}")
+        return "timeout"
+
+
 async def go_to_url(url: str, browser) -> str:
     """
-    Navigate to the specified URL.
+    Navigate to the specified URL, using the browser's navigation policy if it has one.
     """
     page = await browser.get_current_page()
     try:
-        await page.goto(url)
-        await page.wait_for_load_state()
+        await navigate(page, url, getattr(browser, "navigation_policy", None))
         logger.info(f'Navigated to {url}')
         return f'Navigated to {url}'
     except Exception as e:
@@ -24,3 +172,81 @@ async def wait_seconds(seconds: int = 3) -> str:
     logger.info(f'Waiting for {seconds} seconds.')
     await asyncio.sleep(seconds)
     return f'Waited for {seconds} seconds.'
+
+
+async def settle(page, selector: Optional[str] = None, timeout: float = SETTLE_TIMEOUT,
+                 quiet_ms: int = SETTLE_QUIET_MS) -> str:
+    """
+    Wait until the page has reacted to an interaction, but no longer than `timeout`.
+
+    With a `selector`, waits for that element to become visible. Otherwise the
+    page is settled once the DOM and the resource count have been quiet for
+    `quiet_ms` and no document/XHR/fetch request is in flight. If the
+    interaction navigated away, waits for the new document's DOM instead.
+
+    Returns:
+        str: "selector", "quiet", "navigation" or "timeout"
+    """
+    loop = asyncio.get_event_loop()
+    deadline_at = loop.time() + timeout
+
+    if selector:
+        try:
+            await page.wait_for_selector(selector, state="visible", timeout=timeout * 1000)
+            return "selector"
+        except Exception as e:
+            logger.debug(f"Settle wait for {selector} ended: {e}")
+            return "timeout"
+
+    inflight = set()
+    navigated = []
+
+    def on_request(request):
+        if request.resource_type in SETTLE_RESOURCE_TYPES:
+            inflight.add(request)
+
+    def on_request_done(request):
+        inflight.discard(request)
+
+    def on_frame_navigated(frame):
+        if frame == page.main_frame:
+            navigated.append(frame.url)
+
+    listeners = {
+        "request": on_request,
+        "requestfinished": on_request_done,
+        "requestfailed": on_request_done,
+        "framenavigated": on_frame_navigated,
+    }
+    for event, listener in listeners.items():
+        page.on(event, listener)
+    try:
+        while True:
+            remaining = deadline_at - loop.time()
+            if remaining <= 0:
+                return "timeout"
+            try:
+                quiet = await page.evaluate(
+                    _DOM_QUIET_SCRIPT, {"quietMs": quiet_ms, "timeoutMs": int(remaining * 1000)}
+                )
+            except Exception as e:
+                # the document was replaced while we were watching it
+                logger.debug(f"Settle interrupted by navigation: {e}")
+                try:
+                    await page.wait_for_load_state(
+                        "domcontentloaded", timeout=max(deadline_at - loop.time(), 0.001) * 1000
+                    )
+                    return "navigation"
+                except Exception:
+                    return "timeout"
+            if not quiet:
+                return "timeout"
+            if not inflight:
+                return "navigation" if navigated else "quiet"
+            # the DOM is quiet but requests are still running: wait for them,
+            # then make sure their responses have been rendered
+            while inflight and loop.time() < deadline_at:
+                await asyncio.sleep(0.05)
+    finally:
+        for event, listener in listeners.items():
+            page.remove_listener(event, listener)
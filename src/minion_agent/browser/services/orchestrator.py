@@ -1,68 +1,135 @@
 import logging
 import asyncio
-from typing import List, Dict, Any, Union
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple, Union
 from src.minion_agent.browser.services.google_search import (
     search_google, search_next_page, refine_search_query
 )
-from src.minion_agent.browser.services.navigation import go_to_url
+from src.minion_agent.browser.services.navigation import go_to_url, settle
 from src.minion_agent.browser.services.content_extraction import extract_content
+from src.minion_agent.browser.services.prefetch import Prefetcher
+from src.minion_agent.browser.services.search_backends import SearchAggregator, canonicalize_url
 from src.minion_agent.browser.utils.helpers import save_output, format_context_for_display
 from src.minion_agent.browser.utils.browser_wrapper import BrowserWrapper  # adjust import path as needed
+from src.minion_agent.browser.utils.element_registry import ElementRegistry
 
 logger = logging.getLogger(__name__)
 
-async def snapshot_interactive_elements(page_or_wrapper) -> List[Dict[str, str]]:
-    """
-    Return up to 20 interactive elements with selectors and label/text,
-    including checkboxes, radios, selects, inputs, links, and buttons.
-    Unwraps BrowserWrapper if needed, uses Playwright Page methods.
-    """
-    # unwrap wrapper if needed
+async def _resolve_page(page_or_wrapper):
+    """Unwrap a BrowserWrapper into its current Playwright Page."""
     if hasattr(page_or_wrapper, 'get_current_page'):
-        page = await page_or_wrapper.get_current_page()
+        return await page_or_wrapper.get_current_page()
+    return page_or_wrapper
+
+
+async def _goto(page_or_wrapper, url: str) -> None:
+    if hasattr(page_or_wrapper, 'goto'):
+        await page_or_wrapper.goto(url)
     else:
-        page = page_or_wrapper
-
-    elements: List[Dict[str, str]] = []
-    # 1) labels with inputs (checkboxes, radios)
-    labels = await page.query_selector_all("label")
-    for lbl in labels[:20]:
-        text = (await lbl.text_content() or "").strip()
-        inp = await lbl.query_selector("input[type=checkbox], input[type=radio]")
-        if inp:
-            sel = f"label:has-text(\"{text}\") input"
-            elements.append({"selector": sel, "text": text})
-    # 2) selects (dropdowns)
-    selects = await page.query_selector_all("select")
-    for sel in selects[:10]:
-        ident = await sel.get_attribute("id") or await sel.get_attribute("name")
-        if ident:
-            elements.append({"selector": f"select#{ident}", "text": "<dropdown>"})
-    # 3) text/search inputs
-    inputs = await page.query_selector_all("input[type=text], input[type=search]")
-    for inp in inputs[:10]:
-        ph = (await inp.get_attribute("placeholder") or "").strip()
-        sel = f"input[placeholder=\"{ph}\"]" if ph else "input[type=text]"
-        elements.append({"selector": sel, "text": ph or "<text>"})
-    # 4) hyperlinks
-    links = await page.query_selector_all("a[href]")
-    for link in links[:20]:
-        text = (await link.text_content() or "").strip()
-        href = await link.get_attribute("href") or ""
-        # CSS-escape quotes in href
-        sel = f"a[href=\"{href}\"]"
-        elements.append({"selector": sel, "text": text or href})
-    # 5) buttons
-    buttons = await page.query_selector_all("button")
-    for btn in buttons[:10]:
-        text = (await btn.text_content() or "").strip()
-        btn_id = await btn.get_attribute("id")
-        if btn_id:
-            sel = f"button#{btn_id}"
-        else:
-            sel = f"button:has-text(\"{text}\")"
-        elements.append({"selector": sel, "text": text or "<button>"})
-    return elements
+        await go_to_url(url, page_or_wrapper)
+
+
+def _unvisited_result_urls(mcp_planner, exclude: str = None) -> List[str]:
+    visited = set(mcp_planner.context.get("visited_urls", []))
+    urls = []
+    for result in mcp_planner.context.get("search_results", []):
+        url = result.get("url")
+        if url and url != exclude and url not in visited and url not in urls:
+            urls.append(url)
+    return urls
+
+
+async def snapshot_interactive_elements(
+    page_or_wrapper,
+    registry: Optional[ElementRegistry] = None
+) -> List[Dict[str, str]]:
+    """
+    Return the page's checkboxes, radios, selects, inputs, links and buttons
+    as {"id", "kind", "text"} entries. Unwraps BrowserWrapper if needed; the
+    ids are stable across snapshots of the same page and resolve through
+    `registry` (see ElementRegistry).
+    """
+    page = await _resolve_page(page_or_wrapper)
+    return await (registry or ElementRegistry()).snapshot(page)
+
+
+async def fan_out_navigate(
+    user_prompt: str,
+    page: Union[BrowserWrapper, Any],
+    page_extraction_llm,
+    mcp_planner,
+    primary_url: str,
+    extra_urls: List[str],
+    max_workers: int = 3,
+    prefetcher: Optional[Prefetcher] = None
+) -> str:
+    """
+    Visit `primary_url` in the main page and `extra_urls` in parallel pages of the
+    same browser context, extracting all of them concurrently with at most
+    `max_workers` pages open at once. Every result is merged into the planner
+    context as it arrives; the remaining work is cancelled as soon as one page
+    returns a final answer. Extra URLs that `prefetcher` already loaded (or is
+    loading) are taken over from it instead of being loaded a second time.
+
+    Returns:
+        str: The planner state after the fan-out ("DONE", "EXTRACTED" or "ERROR")
+    """
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+    context = (await _resolve_page(page)).context
+
+    async def visit_main() -> Dict[str, Any]:
+        await _goto(page, primary_url)
+        return await extract_content(
+            user_prompt, page, page_extraction_llm, target_selector="div#main"
+        )
+
+    async def visit_side(url: str) -> Dict[str, Any]:
+        prefetched = await prefetcher.take(url) if prefetcher is not None else None
+        if prefetched is not None:
+            prefetched_page, result = prefetched
+            await prefetched_page.close()
+            return result
+        side_page = await context.new_page()
+        try:
+            side_wrapper = BrowserWrapper(side_page, getattr(page, "navigation_policy", None))
+            await side_wrapper.goto(url)
+            return await extract_content(
+                user_prompt, side_wrapper, page_extraction_llm, target_selector="div#main"
+            )
+        finally:
+            await side_page.close()
+
+    async def bounded(url: str, visit) -> Tuple[str, Dict[str, Any]]:
+        async with semaphore:
+            return url, await visit()
+
+    # every dispatched URL counts as visited, so failing or cancelled pages
+    # are not picked again; successes are tracked by their extracted content
+    tasks = {asyncio.ensure_future(bounded(primary_url, visit_main)): primary_url}
+    mcp_planner.add_visited_url(primary_url)
+    for url in extra_urls:
+        tasks[asyncio.ensure_future(bounded(url, lambda url=url: visit_side(url)))] = url
+        mcp_planner.add_visited_url(url)
+    logger.info(f"Fanning out over {len(tasks)} URLs with {max_workers} workers")
+
+    state = "ERROR"
+    try:
+        for future in asyncio.as_completed(list(tasks)):
+            try:
+                url, result = await future
+            except Exception as e:
+                logger.error(f"Fan-out extract error: {e}")
+                continue
+            mcp_planner.add_extracted_content(url, result)
+            if result.get("action") == "final":
+                logger.info(f"Final answer found at {url}, cancelling remaining fan-out pages")
+                state = "DONE"
+                break
+            state = "EXTRACTED"
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return state
 
 
 async def ai_web_scraper(
@@ -70,32 +137,122 @@ async def ai_web_scraper(
     page: Union[BrowserWrapper, Any],  # Playwright Page or BrowserWrapper
     page_extraction_llm,
     gpt_llm,
-    mcp_planner=None
+    mcp_planner=None,
+    fanout: int = 1,
+    fanout_workers: int = 3,
+    prefetch: int = 0,
+    search_backend: Optional[SearchAggregator] = None
 ) -> str:
     if not mcp_planner:
         raise RuntimeError("MCP planner is required for LLM-guided scraping.")
     return await mcp_guided_scraping(
-        user_prompt, page, page_extraction_llm, gpt_llm, mcp_planner
+        user_prompt, page, page_extraction_llm, gpt_llm, mcp_planner,
+        fanout=fanout, fanout_workers=fanout_workers, prefetch=prefetch,
+        search_backend=search_backend
+    )
+
+async def stream_web_scraper(
+    user_prompt: str,
+    page: Union[BrowserWrapper, Any],  # Playwright Page or BrowserWrapper
+    page_extraction_llm,
+    gpt_llm,
+    mcp_planner=None,
+    fanout: int = 1,
+    fanout_workers: int = 3,
+    prefetch: int = 0,
+    search_backend: Optional[SearchAggregator] = None
+) -> AsyncIterator[str]:
+    """
+    Like ai_web_scraper, but yields the final answer as it is generated
+    instead of returning it once complete. Outputs are saved as usual.
+    """
+    if not mcp_planner:
+        raise RuntimeError("MCP planner is required for LLM-guided scraping.")
+    await mcp_guided_scraping(
+        user_prompt, page, page_extraction_llm, gpt_llm, mcp_planner,
+        fanout=fanout, fanout_workers=fanout_workers, prefetch=prefetch,
+        search_backend=search_backend, generate_answer=False
     )
+    async for token in mcp_planner.stream_final_answer(user_prompt):
+        yield token
+    save_output("final_output.txt", mcp_planner.context["final_answers"][-1])
+    save_output("mcp_context_summary.md", format_context_for_display(mcp_planner.context))
 
 async def mcp_guided_scraping(
     user_prompt: str,
     page: Union[BrowserWrapper, Any],  # Playwright Page or BrowserWrapper
     page_extraction_llm,
     gpt_llm,
-    mcp_planner
+    mcp_planner,
+    fanout: int = 1,
+    fanout_workers: int = 3,
+    generate_answer: bool = True,
+    prefetch: int = 0,
+    search_backend: Optional[SearchAggregator] = None,
+    incremental_snapshots: bool = True
+) -> str:
+    """
+    Run the planner loop. With `fanout` > 1, each NAVIGATE also opens up to
+    `fanout - 1` further unvisited search results in parallel pages.
+    With `prefetch` > 0 (and a BrowserWrapper `page`), the next `prefetch`
+    unvisited results are loaded and extracted in background pages while the
+    planner decides, and adopted if it navigates to one of them.
+    With `generate_answer` False, stop once the planner is done and return ""
+    so the caller can produce (e.g. stream) the final answer itself.
+    `search_backend` replaces the built-in Google scrape for SEARCH and for
+    fetching more results.
+    With `incremental_snapshots`, the planner is shown what changed on the
+    page since its last step (see ElementRegistry.snapshot_changes) instead
+    of the full element list.
+    """
+    prefetcher = None
+    if prefetch > 0 and hasattr(page, "switch_to_page"):
+        prefetcher = Prefetcher(user_prompt, page, page_extraction_llm, depth=prefetch)
+    try:
+        return await _planner_loop(
+            user_prompt, page, page_extraction_llm, gpt_llm, mcp_planner,
+            fanout, fanout_workers, generate_answer, prefetcher, search_backend,
+            incremental_snapshots
+        )
+    finally:
+        if prefetcher is not None:
+            await prefetcher.close()
+
+async def _planner_loop(
+    user_prompt: str,
+    page: Union[BrowserWrapper, Any],
+    page_extraction_llm,
+    gpt_llm,
+    mcp_planner,
+    fanout: int,
+    fanout_workers: int,
+    generate_answer: bool,
+    prefetcher: Optional[Prefetcher],
+    search_backend: Optional[SearchAggregator],
+    incremental_snapshots: bool
 ) -> str:
     current_url = None
+    registry = ElementRegistry()
+    # result page of this task's last query that search_more continues at
+    next_search_page = 0
     while mcp_planner.should_continue_scraping():
+        if prefetcher is not None:
+            await prefetcher.start(_unvisited_result_urls(mcp_planner, exclude=current_url))
         # decide with or without page_elements based on current_url
         elements = None
-        if current_url:
-            elements = await snapshot_interactive_elements(page)
+        changes = None
+        if current_url and incremental_snapshots:
+            changes = await registry.snapshot_changes(await _resolve_page(page))
+            elements = changes["elements"]
+        elif current_url:
+            elements = await snapshot_interactive_elements(page, registry)
+        if elements is not None:
             logger.info(f"page elements>>>> {elements}")
         action_data = await mcp_planner.decide_next_action(
             user_goal=user_prompt,
             current_url=current_url,
-            page_elements=elements
+            page_elements=elements,
+            page_changes=changes
         )
         action = action_data.get("action", "").upper()
         logger.info(f"Planner → {action}")
@@ -119,7 +276,11 @@ async def mcp_guided_scraping(
             query = action_data.get("query", user_prompt)
             refined = await refine_search_query(gpt_llm, query)
             mcp_planner.add_search_query(refined)
-            results = await search_google(refined, page)
+            if search_backend is not None:
+                results = await search_backend.search(refined, page)
+                next_search_page = search_backend.pages_per_backend
+            else:
+                results = await search_google(refined, page)
             # Add the query to the context
             mcp_planner.add_search_query(refined)
             
@@ -127,14 +288,16 @@ async def mcp_guided_scraping(
             # search_results = await search_google(refined, browser)
             
             # Make sure to store search results in a way that preserves them
-            if not mcp_planner.context.get("search_results"):
-                logger.info(f"results>>>> : {results}")
-                mcp_planner.context["search_results"] = results
-            else:
-                # Only add new results
-                existing_urls = {result["url"] for result in mcp_planner.context["search_results"]}
-                new_results = [result for result in results if result["url"] not in existing_urls]
-                mcp_planner.context["search_results"].extend(new_results)
+            logger.info(f"results>>>> : {results}")
+            # Only add new results; URLs differing only in scheme, "www.",
+            # tracking parameters and the like count as the same result
+            stored = mcp_planner.context.setdefault("search_results", [])
+            seen_urls = {canonicalize_url(result["url"]) for result in stored}
+            for result in results:
+                canonical = canonicalize_url(result["url"])
+                if canonical not in seen_urls:
+                    seen_urls.add(canonical)
+                    stored.append(result)
                 
             logger.info(f"Search results available: {len(mcp_planner.context['search_results'])}")
             mcp_planner.state = "SEARCH_RESULTS_AVAILABLE"
@@ -146,17 +309,35 @@ async def mcp_guided_scraping(
                 sr = mcp_planner.context.get("search_results", [])
                 url = sr[0]["url"] if sr else None
             if not url:
-                nxt = await search_next_page(page)
+                if search_backend is not None:
+                    # the aggregator is shared between tasks; page through this task's own query
+                    queries = mcp_planner.context.get("search_queries", [])
+                    nxt = await search_backend.search_more(page, queries[-1] if queries else "", next_search_page)
+                    next_search_page += search_backend.pages_per_backend
+                else:
+                    nxt = await search_next_page(page)
                 if nxt:
                     mcp_planner.context["search_results"] = nxt
                     continue
                 break
             current_url = url
-            # unwrap and goto
-            if hasattr(page, 'goto'):
-                await page.goto(current_url)
-            else:
-                await go_to_url(current_url, page)
+            budget = mcp_planner.max_visited_urls - len(mcp_planner.context["visited_urls"]) - 1
+            extra_urls = _unvisited_result_urls(mcp_planner, exclude=url)[:max(0, min(fanout - 1, budget))]
+            prefetched = await prefetcher.take(url) if prefetcher is not None else None
+            if prefetched is not None:
+                prefetched_page, extract_res = prefetched
+                await page.switch_to_page(prefetched_page)
+                mcp_planner.add_visited_url(current_url)
+                mcp_planner.add_extracted_content(current_url, extract_res)
+                mcp_planner.state = "DONE" if extract_res.get("action")=="final" else "EXTRACTED"
+                continue
+            if extra_urls:
+                mcp_planner.state = await fan_out_navigate(
+                    user_prompt, page, page_extraction_llm, mcp_planner,
+                    url, extra_urls, max_workers=fanout_workers, prefetcher=prefetcher
+                )
+                continue
+            await _goto(page, current_url)
             mcp_planner.add_visited_url(current_url)
             try:
                 extract_res = await extract_content(
@@ -171,23 +352,28 @@ async def mcp_guided_scraping(
 
         elif action == "PAGE_INTERACTIONS":
             for it in action_data.get("interactions", []):
-                sel = it.get("selector")
+                # element id from the snapshot; plain selectors are still accepted
+                ref = it.get("id") or it.get("selector")
                 typ = it.get("type")
                 val = it.get("value")
-                # unwrap
-                page_obj = await page.get_current_page() if hasattr(page, 'get_current_page') else page
+                page_obj = await _resolve_page(page)
+                sel = registry.describe(ref)
                 try:
-                    elem = await page_obj.query_selector(sel)
+                    elem = await registry.resolve(page_obj, ref)
                     if not elem:
-                        logger.warning(f"No element for selector {sel}")
+                        logger.warning(f"No element for {sel}")
                         continue
                     if typ == "click":
                         await elem.click()
                     elif typ == "select":
-                        await page_obj.select_option(sel, val)
+                        await elem.select_option(val)
                     elif typ in ("type", "fill"):
                         await elem.fill(val)
-                    await asyncio.sleep(1)
+                    # move on as soon as the page has reacted; typing rarely navigates
+                    if typ in ("type", "fill"):
+                        await settle(page_obj, timeout=1.0, quiet_ms=100)
+                    else:
+                        await settle(page_obj)
                     logger.info(f"Interacted {typ} on {sel}")
                 except Exception as e:
                     logger.warning(f"Failed interaction {typ} on {sel}: {e}")
@@ -216,6 +402,9 @@ async def mcp_guided_scraping(
                 continue
 
         elif action == "FINISH":
+            logger.info(f"Planner stats: {mcp_planner.planner_stats()}")
+            if not generate_answer:
+                return ""
             answer = await mcp_planner.generate_final_answer(user_prompt)
             save_output("final_output.txt", answer)
             summary = format_context_for_display(mcp_planner.context)
@@ -226,4 +415,7 @@ async def mcp_guided_scraping(
             logger.warning(f"Unknown action {action}, default EXTRACT")
             mcp_planner.state = "DEFAULT"
 
+    logger.info(f"Planner stats: {mcp_planner.planner_stats()}")
+    if not generate_answer:
+        return ""
     return await mcp_planner.generate_final_answer(user_prompt)
\ No newline at end of file
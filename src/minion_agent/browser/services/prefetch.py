@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .content_extraction import extract_content
+from ..utils.browser_wrapper import BrowserWrapper
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """
+    Speculatively loads and extracts likely next URLs in background pages of
+    the same browser context while the planner is deciding.
+
+    A prefetch is kept only while its URL is still a candidate: `start`
+    discards the ones that dropped out, `take` hands a finished (or in-flight)
+    prefetch over to the caller, and `close` discards the rest.
+    """
+
+    def __init__(self, user_prompt: str, page: BrowserWrapper, page_extraction_llm, depth: int = 1):
+        """
+        Args:
+            user_prompt: The goal extraction is performed against
+            page: The main BrowserWrapper; background pages share its context and navigation policy
+            page_extraction_llm: Extraction LLM used for the speculative extractions
+            depth: Maximum number of URLs prefetched at once
+        """
+        self.user_prompt = user_prompt
+        self.page = page
+        self.page_extraction_llm = page_extraction_llm
+        self.depth = depth
+        self.hits = 0
+        self.discarded = 0
+        self._tasks: Dict[str, asyncio.Future] = {}
+
+    async def _load(self, url: str) -> Tuple[Any, Dict[str, Any]]:
+        context = (await self.page.get_current_page()).context
+        side_page = await context.new_page()
+        try:
+            side_wrapper = BrowserWrapper(side_page, self.page.navigation_policy)
+            await side_wrapper.goto(url)
+            result = await extract_content(
+                self.user_prompt, side_wrapper, self.page_extraction_llm, target_selector="div#main"
+            )
+        except BaseException:
+            await side_page.close()
+            raise
+        return side_page, result
+
+    async def start(self, urls: Iterable[str]) -> None:
+        """
+        Prefetch the first `depth` of `urls`, discarding prefetches of URLs
+        that are no longer among them.
+        """
+        wanted = []
+        for url in urls:
+            if url not in wanted:
+                wanted.append(url)
+            if len(wanted) >= self.depth:
+                break
+        for url in [u for u in self._tasks if u not in wanted]:
+            await self._discard(url)
+        for url in wanted:
+            if url not in self._tasks:
+                logger.info(f"Prefetching {url}")
+                self._tasks[url] = asyncio.ensure_future(self._load(url))
+
+    async def take(self, url: str) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        """
+        Hand over the prefetch of `url`, waiting for it if still loading.
+
+        Returns:
+            Optional[Tuple[Any, Dict[str, Any]]]: (page, extraction result), or
+            None if `url` was not prefetched or the prefetch failed
+        """
+        task = self._tasks.pop(url, None)
+        if task is None:
+            return None
+        try:
+            prefetched = await task
+        except Exception as e:
+            logger.warning(f"Prefetch of {url} failed: {e}")
+            return None
+        self.hits += 1
+        logger.info(f"Adopting prefetched page for {url}")
+        return prefetched
+
+    async def _discard(self, url: str) -> None:
+        task = self._tasks.pop(url)
+        self.discarded += 1
+        task.cancel()
+        # cancelled or failed loads close their own page
+        outcome = (await asyncio.gather(task, return_exceptions=True))[0]
+        if isinstance(outcome, tuple):
+            await outcome[0].close()
+
+    async def close(self) -> None:
+        for url in list(self._tasks):
+            await self._discard(url)
+        logger.info(f"Prefetch hits: {self.hits}, discarded: {self.discarded}")
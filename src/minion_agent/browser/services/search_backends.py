@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Sequence, Tuple
+from urllib.parse import parse_qs, parse_qsl, quote_plus, urlencode, urlparse, urlunparse
+
+from .google_search import GOOGLE_RESULTS_SCRIPT
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only track the click and never change the page.
+TRACKING_PARAMS = {
+    "gclid", "fbclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "_ga", "_gl", "spm", "srsltid",
+}
+
+_DUCKDUCKGO_RESULTS_SCRIPT = '''() => {
+    return Array.from(document.querySelectorAll('a.result__a'))
+        .filter(a => !a.closest('.result--ad'))
+        .map(a => ({title: a.innerText, url: a.href}));
+}'''
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL for deduplication: http and https treated alike, lowercase
+    host without "www.", no fragment, no tracking parameters and no trailing slash.
+    """
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parsed.port and parsed.port not in (80, 443):
+        host = f"{host}:{parsed.port}"
+    query = urlencode([
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ])
+    path = parsed.path.rstrip("/")
+    scheme = parsed.scheme.lower()
+    if scheme in ("", "http"):
+        scheme = "https"
+    return urlunparse((scheme, host, path, "", query, ""))
+
+
+class SearchBackend(ABC):
+    """
+    A search engine the agent can query. Subclasses must implement `search`.
+
+    Backends that scrape a results page in the browser set `requires_page`;
+    they are handed a fresh page of the agent's browser context per call.
+    """
+    name = "base"
+    requires_page = True
+    results_per_page = 10
+
+    @abstractmethod
+    async def search(self, query: str, page: Any = None, page_number: int = 0) -> List[Dict[str, str]]:
+        """
+        Return one page of results as {"title", "url"} dicts, best first.
+
+        Args:
+            query: The search query
+            page: Playwright page to load the results in (for `requires_page` backends)
+            page_number: Zero-based results page
+        """
+
+
+class GoogleSearchBackend(SearchBackend):
+    name = "google"
+
+    async def search(self, query: str, page: Any = None, page_number: int = 0) -> List[Dict[str, str]]:
+        url = f"https://www.google.com/search?q={quote_plus(query)}&udm=14&start={page_number * 10}"
+        await page.goto(url, wait_until="domcontentloaded")
+        return await page.evaluate(GOOGLE_RESULTS_SCRIPT)
+
+
+class DuckDuckGoSearchBackend(SearchBackend):
+    """
+    The JavaScript-free DuckDuckGo HTML endpoint; cheap to load and rarely
+    serves a captcha.
+    """
+    name = "duckduckgo"
+    results_per_page = 30
+
+    async def search(self, query: str, page: Any = None, page_number: int = 0) -> List[Dict[str, str]]:
+        url = f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
+        if page_number:
+            offset = page_number * self.results_per_page
+            url += f"&s={offset}&dc={offset + 1}"
+        await page.goto(url, wait_until="domcontentloaded")
+        results = await page.evaluate(_DUCKDUCKGO_RESULTS_SCRIPT)
+        return [{"title": r["title"], "url": self._decode_result_url(r["url"])} for r in results]
+
+    @staticmethod
+    def _decode_result_url(url: str) -> str:
+        # result links go through a redirect: //duckduckgo.com/l/?uddg=<target>
+        parsed = urlparse(url)
+        if parsed.path.startswith("/l/"):
+            target = parse_qs(parsed.query).get("uddg")
+            if target:
+                return target[0]
+        return url
+
+
+class StubSearchBackend(SearchBackend):
+    """
+    Serves canned results without a browser, for tests and offline runs.
+    """
+    name = "stub"
+    requires_page = False
+
+    def __init__(self, results: Dict[str, List[Dict[str, str]]], page_size: int = 10, name: str = "stub"):
+        """
+        Args:
+            results: Results per query; "*" is used for queries not listed
+            page_size: Results per page
+            name: Backend name reported in each result's "source"
+        """
+        self.results = results
+        self.page_size = page_size
+        self.results_per_page = page_size
+        self.name = name
+        self.calls = 0
+
+    async def search(self, query: str, page: Any = None, page_number: int = 0) -> List[Dict[str, str]]:
+        self.calls += 1
+        results = self.results.get(query, self.results.get("*", []))
+        start = page_number * self.page_size
+        return [dict(r) for r in results[start:start + self.page_size]]
+
+
+class SearchAggregator:
+    """
+    Queries several backends (and several result pages of each) in parallel,
+    merges the results by rank, deduplicates them by canonical URL and caches
+    the merged list per query.
+
+    One aggregator is shared by concurrent tasks, so it keeps no per-task
+    state: callers pass the query and result page to `search_more`.
+    """
+
+    def __init__(
+        self,
+        backends: Sequence[SearchBackend],
+        pages_per_backend: int = 1,
+        max_results: int = 20,
+        cache_ttl: float = 3600.0
+    ):
+        """
+        Args:
+            backends: Backends to query, in order of preference
+            pages_per_backend: Result pages fetched from each backend per search
+            max_results: Maximum merged results returned per search
+            cache_ttl: Seconds a cached query result stays valid
+        """
+        if not backends:
+            raise ValueError("At least one search backend is required")
+        self.backends = list(backends)
+        self.pages_per_backend = max(1, pages_per_backend)
+        self.max_results = max_results
+        self.cache_ttl = cache_ttl
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[Dict[str, str]]]] = {}
+
+    @staticmethod
+    def _cache_query(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    async def _query(self, backend: SearchBackend, query: str, page_number: int, context) -> List[Dict[str, str]]:
+        if not backend.requires_page:
+            return await backend.search(query, None, page_number)
+        page = await context.new_page()
+        try:
+            return await backend.search(query, page, page_number)
+        finally:
+            await page.close()
+
+    async def _search_pages(self, query: str, first_page: int, browser) -> List[Dict[str, str]]:
+        key = (self._cache_query(query), first_page)
+        cached = self._cache.get(key)
+        if cached and time.time() - cached[0] < self.cache_ttl:
+            logger.info(f'Search cache hit for "{query}"')
+            return [dict(r) for r in cached[1]]
+
+        context = None
+        if any(backend.requires_page for backend in self.backends):
+            page = await browser.get_current_page() if hasattr(browser, "get_current_page") else browser
+            context = page.context
+        jobs = [
+            (backend, page_number)
+            for backend in self.backends
+            for page_number in range(first_page, first_page + self.pages_per_backend)
+        ]
+        outcomes = await asyncio.gather(
+            *(self._query(backend, query, page_number, context) for backend, page_number in jobs),
+            return_exceptions=True
+        )
+
+        ranked: List[Tuple[int, int, Dict[str, str]]] = []
+        for job_index, ((backend, page_number), outcome) in enumerate(zip(jobs, outcomes)):
+            if isinstance(outcome, BaseException):
+                logger.warning(f"{backend.name} search (page {page_number}) failed: {outcome}")
+                continue
+            # rank by position in the backend's full result list, so a short
+            # page does not shift later pages' ranks
+            offset = (page_number - first_page) * backend.results_per_page
+            for rank, result in enumerate(outcome):
+                if result.get("url"):
+                    ranked.append((offset + rank, job_index, {**result, "source": backend.name}))
+
+        # interleave engines by rank so each one's best results come first
+        merged: List[Dict[str, str]] = []
+        seen = set()
+        for _, _, result in sorted(ranked, key=lambda item: (item[0], item[1])):
+            canonical = canonicalize_url(result["url"])
+            if canonical in seen:
+                continue
+            seen.add(canonical)
+            merged.append(result)
+            if len(merged) >= self.max_results:
+                break
+
+        self._cache[key] = (time.time(), merged)
+        logger.info(f'Searched for "{query}" on {len(self.backends)} backends. Found {len(merged)} results.')
+        return [dict(r) for r in merged]
+
+    async def search(self, query: str, browser) -> List[Dict[str, str]]:
+        """
+        Search all backends for `query`.
+
+        Args:
+            query: The search query
+            browser: BrowserWrapper or Playwright page whose context hosts the result pages
+
+        Returns:
+            List[Dict[str, str]]: Merged {"title", "url", "source"} results
+        """
+        return await self._search_pages(query, 0, browser)
+
+    async def search_more(self, browser, query: str, first_page: int) -> List[Dict[str, str]]:
+        """
+        Fetch further results for `query`, starting at result page `first_page`
+        of each backend. `search` covers pages [0, pages_per_backend), so the
+        first call continues at pages_per_backend.
+
+        Returns:
+            List[Dict[str, str]]: Merged {"title", "url", "source"} results
+        """
+        if not query:
+            return []
+        return await self._search_pages(query, first_page, browser)
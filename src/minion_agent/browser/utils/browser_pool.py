@@ -0,0 +1,264 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlparse
+from playwright.async_api import async_playwright, Browser, BrowserContext
+
+logger = logging.getLogger(__name__)
+
+CHROMIUM_LAUNCH_ARGS = [
+    '--no-sandbox',
+    '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-infobars',
+    '--disable-background-timer-throttling',
+    '--disable-popup-blocking',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+    '--disable-window-activation',
+    '--disable-focus-on-load',
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--no-startup-window',
+    '--window-position=0,0',
+]
+
+
+class _PooledContext:
+    """
+    Bookkeeping for a single pre-warmed BrowserContext owned by the pool.
+    A `context` of None marks a slot whose context could not be rebuilt; it
+    is created again when the slot is next leased.
+    """
+
+    def __init__(self, context: Optional[BrowserContext]):
+        self.context = context
+        self.tasks_run = 0
+        # origins whose documents were loaded, so their storage can be cleared
+        self.origins: Set[str] = set()
+
+
+class BrowserPool:
+    """
+    A long-lived Chromium instance that leases isolated, pre-warmed
+    BrowserContexts to agent runs.
+
+    Between leases a context's pages, cookies, permissions and the storage
+    of every origin it visited are cleared. Contexts are recycled (closed
+    and replaced by a fresh one) when that cleanup fails, after
+    `max_tasks_per_context` leases or once their JS heap grows past
+    `max_memory_mb`, so many tasks can run back-to-back or concurrently
+    without paying the Chromium cold start each time.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        headless: bool = True,
+        max_tasks_per_context: int = 20,
+        max_memory_mb: Optional[float] = 512,
+        launch_args: Optional[List[str]] = None,
+        context_options: Optional[Dict[str, Any]] = None,
+        browser: Optional[Browser] = None
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            size: Number of contexts kept warm (also the maximum number of concurrent leases)
+            headless: Whether to launch Chromium in headless mode
+            max_tasks_per_context: Recycle a context after this many leases
+            max_memory_mb: Recycle a context when its JS heap exceeds this size (None disables the check)
+            launch_args: Chromium command-line flags, defaults to CHROMIUM_LAUNCH_ARGS
+            context_options: Keyword arguments forwarded to `browser.new_context()`
+            browser: An already launched Browser to attach to instead of launching one
+        """
+        if size < 1:
+            raise ValueError("BrowserPool size must be at least 1")
+        self.size = size
+        self.headless = headless
+        self.max_tasks_per_context = max_tasks_per_context
+        self.max_memory_mb = max_memory_mb
+        self.launch_args = launch_args if launch_args is not None else list(CHROMIUM_LAUNCH_ARGS)
+        self.context_options = context_options or {}
+
+        self._browser = browser
+        self._owns_browser = browser is None
+        self._playwright = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._leased: List[_PooledContext] = []
+        self._start_lock = asyncio.Lock()
+        self._closed = False
+
+    @property
+    def started(self) -> bool:
+        return self._idle is not None
+
+    async def start(self) -> "BrowserPool":
+        """
+        Launch Chromium (unless a browser was supplied) and pre-warm the contexts.
+        Safe to call more than once.
+        """
+        async with self._start_lock:
+            if self.started:
+                return self
+            if self._closed:
+                raise RuntimeError("BrowserPool has been closed")
+
+            if self._browser is None:
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(
+                    args=self.launch_args,
+                    headless=self.headless
+                )
+                logger.info("Launched pooled Chromium instance")
+
+            idle: asyncio.Queue = asyncio.Queue()
+            for _ in range(self.size):
+                idle.put_nowait(await self._new_entry())
+            self._idle = idle
+            logger.info(f"Browser pool warmed with {self.size} contexts")
+        return self
+
+    @asynccontextmanager
+    async def lease(self):
+        """
+        Lease a BrowserContext for the duration of the `async with` block.
+        Waits when all contexts are in use.
+
+        Yields:
+            BrowserContext: An isolated context with no pages from earlier leases
+        """
+        await self.start()
+        entry = await self._idle.get()
+        if entry.context is None:
+            try:
+                entry = await self._new_entry()
+            except BaseException:
+                self._idle.put_nowait(entry)
+                raise
+        self._leased.append(entry)
+        try:
+            yield entry.context
+        finally:
+            self._leased.remove(entry)
+            entry.tasks_run += 1
+            if self._closed:
+                await self._close_entry(entry)
+            else:
+                try:
+                    entry = await self._recycle(entry)
+                except Exception as e:
+                    # never lose the slot (or mask the task's own exception)
+                    logger.warning(f"Could not recycle browser context, rebuilding it on next lease: {e}")
+                    entry = _PooledContext(None)
+                self._idle.put_nowait(entry)
+
+    async def close(self) -> None:
+        """
+        Close every context, then the browser and Playwright driver if the pool launched them.
+        Contexts still on lease are closed when they are returned.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._idle is not None:
+            while not self._idle.empty():
+                entry = self._idle.get_nowait()
+                if entry.context is not None:
+                    await self._close_entry(entry)
+        if self._owns_browser and self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.warning(f"Error closing pooled browser: {e}")
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        logger.info("Browser pool closed")
+
+    async def __aenter__(self) -> "BrowserPool":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _new_entry(self) -> _PooledContext:
+        context = await self._browser.new_context(**self.context_options)
+        entry = _PooledContext(context)
+
+        def on_request(request):
+            if request.resource_type == "document":
+                parsed = urlparse(request.url)
+                if parsed.scheme in ("http", "https"):
+                    entry.origins.add(f"{parsed.scheme}://{parsed.netloc}")
+
+        context.on("request", on_request)
+        return entry
+
+    async def _clear_storage(self, entry: _PooledContext) -> None:
+        """
+        Clear localStorage, IndexedDB, cache storage and service workers of
+        every origin the lease visited (sessionStorage goes with its pages).
+        """
+        if not entry.origins:
+            return
+        page = await entry.context.new_page()
+        try:
+            session = await entry.context.new_cdp_session(page)
+            for origin in entry.origins:
+                await session.send("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            await session.detach()
+        finally:
+            await page.close()
+        entry.origins.clear()
+
+    async def _recycle(self, entry: _PooledContext) -> _PooledContext:
+        """
+        Return the entry to a clean state, or replace it with a fresh context
+        when it hit the task or memory limit.
+        """
+        reason = None
+        if entry.tasks_run >= self.max_tasks_per_context:
+            reason = f"served {entry.tasks_run} tasks"
+        else:
+            memory_mb = await self._memory_usage_mb(entry.context)
+            if self.max_memory_mb is not None and memory_mb > self.max_memory_mb:
+                reason = f"JS heap at {memory_mb:.0f} MB"
+
+        if reason is None:
+            try:
+                for page in list(entry.context.pages):
+                    await page.close()
+                await entry.context.clear_cookies()
+                await entry.context.clear_permissions()
+                await self._clear_storage(entry)
+                return entry
+            except Exception as e:
+                reason = f"cleanup failed ({e})"
+
+        logger.info(f"Recycling browser context: {reason}")
+        await self._close_entry(entry)
+        return await self._new_entry()
+
+    async def _memory_usage_mb(self, context: BrowserContext) -> float:
+        """
+        Sum the used JS heap of the context's open pages, in megabytes.
+        """
+        total = 0
+        for page in context.pages:
+            try:
+                used = await page.evaluate(
+                    "() => (performance.memory && performance.memory.usedJSHeapSize) || 0"
+                )
+                total += used or 0
+            except Exception:
+                continue
+        return total / (1024 * 1024)
+
+    async def _close_entry(self, entry: _PooledContext) -> None:
+        try:
+            await entry.context.close()
+        except Exception as e:
+            logger.warning(f"Error closing browser context: {e}")
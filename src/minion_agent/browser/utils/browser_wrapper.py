@@ -1,6 +1,8 @@
 import logging
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 from playwright.async_api import Page
+from .resource_blocking import apply_resource_profile
+from ..services.navigation import NavigationPolicy, navigate
 
 logger = logging.getLogger(__name__)
 
@@ -10,14 +12,24 @@ class BrowserWrapper:
     and handle common browser operations.
     """
     
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, navigation_policy: Optional[NavigationPolicy] = None):
         """
         Initialize the browser wrapper.
         
         Args:
             page: The Playwright page object
+            navigation_policy: How `goto` decides a page is ready, defaults to DEFAULT_NAVIGATION_POLICY
         """
-        self.page = page
+        self.current_page = page
+        self.navigation_policy = navigation_policy
+    
+    @property
+    def page(self) -> Page:
+        """The current page; kept as an alias of `current_page` so it follows `switch_to_page`."""
+        return self.current_page
+    
+    @page.setter
+    def page(self, page: Page) -> None:
         self.current_page = page
     
     async def get_current_page(self) -> Page:
@@ -36,10 +48,34 @@ class BrowserWrapper:
         Args:
             url: The URL to navigate to
         """
-        await self.current_page.goto(url)
-        await self.current_page.wait_for_load_state()
+        await navigate(self.current_page, url, self.navigation_policy)
         logger.info(f"Navigated to {url}")
     
+    async def switch_to_page(self, page: Page, close_previous: bool = True) -> None:
+        """
+        Make another page of the same context the current page, e.g. one
+        that was loaded in the background.
+        
+        Args:
+            page: The Playwright page to switch to
+            close_previous: Whether to close the page being replaced
+        """
+        previous = self.current_page
+        self.current_page = page
+        if close_previous and previous is not page:
+            await previous.close()
+        logger.info(f"Switched to page {page.url}")
+    
+    async def set_resource_profile(self, profile: str = "full", blocked_domains: Optional[Iterable[str]] = None) -> None:
+        """
+        Block resource types and ad/analytics hosts for the current page.
+        
+        Args:
+            profile: "full", "no_media" or "text_only"
+            blocked_domains: Optional hosts to block, see apply_resource_profile
+        """
+        await apply_resource_profile(self.current_page, profile, blocked_domains)
+    
     async def get_url(self) -> str:
         """
         Get the current URL.
@@ -0,0 +1,193 @@
+import logging
+import re
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+BWE_ID_ATTRIBUTE = "data-bwe-id"
+
+_ELEMENT_ID_RE = re.compile(r"^e\d+$")
+
+# Tags the planner's candidate elements with a stable BWE_ID_ATTRIBUTE. Ids
+# survive across snapshots of the same document: an element keeps its id, new
+# elements get the next free one, and an id -> element Map on the window
+# resolves an id without querying the DOM.
+#
+# With `incremental`, only the changes since the previous snapshot are
+# returned. A MutationObserver marks the registry dirty when the DOM changes;
+# if it is clean the page is not rescanned at all.
+_REGISTRY_SNAPSHOT_SCRIPT = r"""
+(opts) => {
+    const attr = opts.attr;
+    let registry = window.__bweRegistry;
+    if (!registry) {
+        registry = window.__bweRegistry = {next: 0, byId: new Map(), last: null, dirty: true};
+        registry.observer = new MutationObserver(() => { registry.dirty = true; });
+        registry.observer.observe(document.documentElement, {
+            childList: true, subtree: true, attributes: true, characterData: true
+        });
+    }
+    if (opts.incremental && registry.last && !registry.dirty) {
+        return {full: false, added: [], removed: [], changed: []};
+    }
+    for (const [id, el] of registry.byId) {
+        if (!el.isConnected) registry.byId.delete(id);
+    }
+    const text = (el) => (el.textContent || '').trim().replace(/\s+/g, ' ').slice(0, 80);
+    const elements = [];
+    const seen = new Set();
+    const add = (el, kind, label) => {
+        if (!el || seen.has(el)) return;
+        seen.add(el);
+        let id = el.getAttribute(attr);
+        if (!id || registry.byId.get(id) !== el) {
+            id = `e${registry.next++}`;
+            el.setAttribute(attr, id);
+            registry.byId.set(id, el);
+        }
+        elements.push({id: id, kind: kind, text: label});
+    };
+    // 1) labels with inputs (checkboxes, radios)
+    for (const lbl of Array.from(document.querySelectorAll('label')).slice(0, 20)) {
+        const input = lbl.querySelector('input[type=checkbox], input[type=radio]');
+        if (input) add(input, input.type, text(lbl));
+    }
+    // 2) selects (dropdowns)
+    for (const sel of Array.from(document.querySelectorAll('select')).slice(0, 10)) {
+        const options = Array.from(sel.options).map(o => o.text.trim()).filter(t => t).slice(0, 10);
+        add(sel, 'select', options.length ? `<dropdown: ${options.join(' | ')}>` : '<dropdown>');
+    }
+    // 3) text/search inputs
+    for (const inp of Array.from(document.querySelectorAll('input[type=text], input[type=search]')).slice(0, 10)) {
+        add(inp, 'input', (inp.getAttribute('placeholder') || '').trim() || '<text>');
+    }
+    // 4) hyperlinks
+    for (const link of Array.from(document.querySelectorAll('a[href]')).slice(0, 20)) {
+        add(link, 'link', text(link) || (link.getAttribute('href') || '').slice(0, 80));
+    }
+    // 5) buttons
+    for (const btn of Array.from(document.querySelectorAll('button')).slice(0, 10)) {
+        add(btn, 'button', text(btn) || '<button>');
+    }
+
+    const previous = registry.last;
+    registry.last = new Map(elements.map(e => [e.id, e]));
+    // drop the mutations caused by our own tagging
+    registry.observer.takeRecords();
+    registry.dirty = false;
+    if (!opts.incremental || !previous) {
+        return {full: true, elements: elements};
+    }
+    const added = [];
+    const changed = [];
+    for (const e of elements) {
+        const before = previous.get(e.id);
+        if (!before) added.push(e);
+        else if (before.text !== e.text || before.kind !== e.kind) changed.push(e);
+    }
+    const removed = Array.from(previous.keys()).filter(id => !registry.last.has(id));
+    return {full: false, added: added, removed: removed, changed: changed};
+}
+"""
+
+_REGISTRY_RESOLVE_SCRIPT = r"""
+(id) => {
+    const el = window.__bweRegistry && window.__bweRegistry.byId.get(id);
+    return el && el.isConnected ? el : null;
+}
+"""
+
+
+class ElementRegistry:
+    """
+    Gives the planner short, stable ids ("e0", "e1", ...) for the interactive
+    elements of the current page instead of selector strings.
+
+    `snapshot` tags elements in the page and returns {"id", "kind", "text"}
+    entries; `resolve` turns an id back into an element handle through the
+    in-page Map. Anything that is not an id is treated as a selector, so
+    older selector-based interactions keep working. `snapshot_changes`
+    returns only what changed since the previous snapshot.
+    """
+
+    def __init__(self):
+        self.elements: Dict[str, Dict[str, str]] = {}
+
+    @staticmethod
+    def is_element_id(ref: Any) -> bool:
+        return isinstance(ref, str) and bool(_ELEMENT_ID_RE.match(ref))
+
+    async def snapshot(self, page) -> List[Dict[str, str]]:
+        """
+        Tag and list the page's checkboxes, radios, selects, text inputs,
+        links and buttons in a single round trip.
+
+        Returns:
+            List[Dict[str, str]]: {"id", "kind", "text"} per element
+        """
+        try:
+            result = await page.evaluate(
+                _REGISTRY_SNAPSHOT_SCRIPT, {"attr": BWE_ID_ATTRIBUTE, "incremental": False}
+            )
+        except Exception as e:
+            logger.warning(f"Error snapshotting interactive elements: {e}")
+            return []
+        self.elements = {element["id"]: element for element in result["elements"]}
+        return result["elements"]
+
+    async def snapshot_changes(self, page) -> Dict[str, Any]:
+        """
+        Snapshot only what changed since the previous snapshot of this document.
+
+        Returns:
+            Dict[str, Any]: "elements" (the full current list, kept up to date
+            here), "full" (True when there was nothing to diff against, e.g.
+            after a navigation), and "added", "changed" (elements) and
+            "removed" (ids) since the previous snapshot
+        """
+        try:
+            # without a previous snapshot of our own there is nothing to apply a diff to
+            result = await page.evaluate(
+                _REGISTRY_SNAPSHOT_SCRIPT, {"attr": BWE_ID_ATTRIBUTE, "incremental": bool(self.elements)}
+            )
+        except Exception as e:
+            logger.warning(f"Error snapshotting interactive elements: {e}")
+            return {"full": True, "elements": [], "added": [], "changed": [], "removed": []}
+        if result["full"]:
+            self.elements = {element["id"]: element for element in result["elements"]}
+            return {
+                "full": True, "elements": result["elements"],
+                "added": result["elements"], "changed": [], "removed": []
+            }
+        for ref in result["removed"]:
+            self.elements.pop(ref, None)
+        for element in result["added"] + result["changed"]:
+            self.elements[element["id"]] = element
+        logger.info(
+            f"Element snapshot diff: {len(result['added'])} added, {len(result['changed'])} changed, "
+            f"{len(result['removed'])} removed, {len(self.elements)} total"
+        )
+        return {
+            "full": False, "elements": list(self.elements.values()),
+            "added": result["added"], "changed": result["changed"], "removed": result["removed"]
+        }
+
+    async def resolve(self, page, ref: str):
+        """
+        Return the element handle for an element id (or a selector), or None
+        if it is no longer on the page.
+        """
+        if not self.is_element_id(ref):
+            return await page.query_selector(ref)
+        handle = await page.evaluate_handle(_REGISTRY_RESOLVE_SCRIPT, ref)
+        element = handle.as_element()
+        if element is None:
+            await handle.dispose()
+            # the page's registry is gone (e.g. it was reloaded); fall back to the tag
+            return await page.query_selector(f'[{BWE_ID_ATTRIBUTE}="{ref}"]')
+        return element
+
+    def describe(self, ref: str) -> str:
+        """Human-readable name of an element id for logs."""
+        element = self.elements.get(ref)
+        return f'{ref} ({element["kind"]} "{element["text"]}")' if element else str(ref)
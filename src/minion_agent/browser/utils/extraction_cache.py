@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "minion-agent", "extraction_cache.sqlite3")
+
+# Stripped before hashing so per-request nonces, inline analytics and
+# whitespace churn don't defeat the cache for otherwise identical pages.
+_VOLATILE_HTML_RE = re.compile(r"<script\b.*?</script>|<style\b.*?</style>|<!--.*?-->", re.IGNORECASE | re.DOTALL)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class ExtractionCache:
+    """
+    Persistent, content-addressed cache of page extraction results, stored in SQLite.
+
+    Entries are keyed by the normalized content hash, the goal and the model,
+    expire after `ttl_seconds` and are evicted least-recently-used once the
+    cache holds more than `max_entries`.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_entries: int = 5000
+    ):
+        """
+        Args:
+            path: SQLite database file, or ":memory:" for a process-local cache
+            ttl_seconds: Age after which an entry is treated as a miss
+            max_entries: Maximum number of entries kept before LRU eviction
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS extractions ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS extractions_accessed ON extractions (accessed_at)"
+            )
+
+    @staticmethod
+    def make_key(content: str, goal: str, model: str = "") -> str:
+        """
+        Build the cache key for a piece of page content (HTML or text).
+        """
+        normalized = _WHITESPACE_RE.sub(" ", _VOLATILE_HTML_RE.sub("", content)).strip()
+        content_hash = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        normalized_goal = _WHITESPACE_RE.sub(" ", goal).strip().lower()
+        return hashlib.sha256(f"{model}\0{normalized_goal}\0{content_hash}".encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached result for `key`, or None on a miss or expired entry.
+        """
+        result = await self._run(self._get, key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            logger.info("Extraction cache hit")
+        return result
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        await self._run(self._set, key, value)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_event_loop()
+        try:
+            return await loop.run_in_executor(None, fn, *args)
+        except sqlite3.Error as e:
+            logger.warning(f"Extraction cache error: {e}")
+            return None
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE extractions SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def _set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extractions (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+            self._conn.execute("DELETE FROM extractions WHERE created_at < ?", (now - self.ttl_seconds,))
+            self._conn.execute(
+                "DELETE FROM extractions WHERE key IN ("
+                " SELECT key FROM extractions ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
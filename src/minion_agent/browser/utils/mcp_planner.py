@@ -1,8 +1,9 @@
 import logging
 import json
-from typing import Any, Dict, Optional, List
+from typing import Any, AsyncIterator, Dict, Optional, List
 from langchain_core.language_models.base import BaseLanguageModel
 from langchain_core.messages import SystemMessage, HumanMessage
+from .planner_context import RollingContext
 
 logger = logging.getLogger(__name__)
 
@@ -10,7 +11,21 @@ class MCPPlanner:
     """
     Model Context Protocol (MCP) Planner with LLM-guided page interactions.
     """
-    def __init__(self, llm: BaseLanguageModel):
+    def __init__(
+        self,
+        llm: BaseLanguageModel,
+        recent_extractions: int = 3,
+        context_token_budget: int = 3000,
+        rule_based: bool = True
+    ):
+        """
+        Args:
+            llm: The LangChain chat model used for planning and synthesis
+            recent_extractions: Extractions shown in full to the planner; older ones are summarized
+            context_token_budget: Token budget for the extraction and search context in the planner prompt
+            rule_based: Decide transitions fully determined by the planner guidelines
+                locally, calling the LLM only for ambiguous ones
+        """
         self.llm = llm
         self.context: Dict[str, Any] = {
             "visited_urls": [],
@@ -20,6 +35,15 @@ class MCPPlanner:
         }
         self.state = "INITIAL"
         self.max_visited_urls = 15
+        self.rule_based = rule_based
+        self.llm_calls = 0
+        self.llm_calls_saved = 0
+        # Bounded prompt view of the context; the full lists above are kept for the final answer
+        self.memory = RollingContext(
+            recent_k=recent_extractions,
+            token_budget=context_token_budget,
+            model=getattr(llm, "model_name", None) or getattr(llm, "model", None)
+        )
 
     def add_search_query(self, query: str) -> None:
         self.context["search_queries"].append(query)
@@ -30,6 +54,7 @@ class MCPPlanner:
 
     def add_extracted_content(self, url: str, content: Dict[str, Any]) -> None:
         self.context["extracted_content"].append({"url": url, "content": content})
+        self.memory.add(url, content)
         logger.info(f"Added extracted content for {url}")
 
     def should_continue_scraping(self) -> bool:
@@ -40,55 +65,132 @@ class MCPPlanner:
             return False
         return True
 
+    def _unvisited_search_urls(self) -> List[str]:
+        visited = set(self.context.get("visited_urls", []))
+        urls = []
+        for result in self.context.get("search_results", []):
+            url = result.get("url")
+            if url and url not in visited and url not in urls:
+                urls.append(url)
+        return urls
+
+    def _rule_based_action(
+        self,
+        user_goal: str,
+        current_url: Optional[str],
+        page_elements: Optional[List[Dict[str, str]]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the action the planner guidelines dictate for the current state,
+        or None when the decision needs the LLM.
+        """
+        unvisited = self._unvisited_search_urls()
+        extracted = self.context.get("extracted_content", [])
+
+        # the last extraction answered the goal
+        if self.state in ("DONE", "CURRENT_DONE"):
+            return {"action": "FINISH"}
+        # nothing searched and nowhere to go yet
+        if not current_url and not self.context.get("search_results") and not self.context.get("search_queries"):
+            return {"action": "SEARCH", "query": user_goal}
+        # on a page that has not been extracted yet
+        if current_url and self.state != "ERROR" and not any(item["url"] == current_url for item in extracted):
+            return {"action": "EXTRACT"}
+        # fresh results, a failed page, or an extracted page with nothing to interact with
+        if unvisited and (
+            self.state in ("SEARCH_RESULTS_AVAILABLE", "ERROR")
+            or (self.state == "EXTRACTED" and not page_elements)
+        ):
+            return {"action": "NAVIGATE", "url": unvisited[0]}
+        return None
+
+    @staticmethod
+    def _page_elements_view(
+        page_elements: List[Dict[str, str]],
+        page_changes: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        if not page_changes or page_changes.get("full"):
+            return {"page_elements": page_elements}
+        updated = {e["id"] for e in page_changes["added"] + page_changes["changed"]}
+        return {
+            "page_elements_changes": {
+                "added": page_changes["added"],
+                "changed": page_changes["changed"],
+                "removed": page_changes["removed"]
+            },
+            "page_elements": [
+                f'{e["id"]} {e["kind"]}: {e["text"]}' for e in page_elements if e["id"] not in updated
+            ]
+        }
+
+    def planner_stats(self) -> Dict[str, int]:
+        return {"llm_calls": self.llm_calls, "llm_calls_saved": self.llm_calls_saved}
+
     async def decide_next_action(
         self,
         user_goal: str,
         current_url: Optional[str] = None,
-        page_elements: Optional[List[Dict[str, str]]] = None
+        page_elements: Optional[List[Dict[str, str]]] = None,
+        page_changes: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Decide the next action. When PAGE_INTERACTIONS is chosen, LLM returns
-        an `interactions` list of {selector,type,value}.
-        The planner receives a snapshot of `page_elements` to choose from.
+        an `interactions` list of {id,type,value}.
+        The planner receives a snapshot of `page_elements` ({id,kind,text}) to choose from.
+        With `page_changes` (ElementRegistry.snapshot_changes), the prompt carries
+        the added/changed/removed elements in full and the unchanged ones in a
+        compact "id kind: text" form.
+        Transitions the guidelines fully determine are decided locally when
+        `rule_based` is set.
         """
-        # Build context summary
+        if self.rule_based:
+            action_data = self._rule_based_action(user_goal, current_url, page_elements)
+            if action_data is not None:
+                self.llm_calls_saved += 1
+                logger.info(
+                    f"Rule-based planner decision from state {self.state}: {action_data['action']} "
+                    f"({self.llm_calls_saved} LLM calls saved)"
+                )
+                return action_data
+
+        # Build a bounded context summary: running summary of older pages, the
+        # last few extractions, deduplicated key points, unvisited results only
+        search_results = self.context.get("search_results", [])
+        memory = self.memory.render(search_results, self.context.get("visited_urls", []))
         summary = {
             "visited_urls": self.context.get("visited_urls", [])[-5:],
             "search_queries": self.context.get("search_queries", []),
-            "search_results_available": len(self.context.get("search_results", [])),
+            "search_results_available": len(memory["unvisited_search_results"]),
             "extracted_count": len(self.context.get("extracted_content", [])),
             "current_url": current_url,
             "state": self.state,
-            "extracted_content":self.context.get("extracted_content",[]),
-            "page_elements": page_elements or []
+            **memory,
+            **self._page_elements_view(page_elements or [], page_changes)
         }
-        search_results = self.context.get("search_results", [])
         if search_results:
-            # Only include first 3 results for brevity
-            search_results_summary = search_results
-            summary["search_results_available"] = len(search_results)
-            summary["search_results_sample"] = search_results_summary
-            # summary["current_extracted_content"] = 
-            
             # Check if we're in a search loop
             search_count = len(self.context.get("search_queries", []))
             if search_count >= 3 and len(self.context.get("visited_urls", [])) == 0:
                 summary["search_loop_detected"] = True
                 logger.warning("Search loop detected - recommend NAVIGATE action")
-        else:
-            summary["search_results_available"] = 0
-        logger.info(f"extracted content>>> : {summary.get('extracted_content',[])}")
+        logger.info(
+            f"Planner context: {summary['extracted_count']} extractions, "
+            f"{len(memory['running_summary'])} summarized, {len(memory['key_points'])} key points"
+        )
 
         # Prepare prompt
         messages = [
             SystemMessage(content=(
                 "You are a proactive web-scraping planner. Given the context summary below, choose exactly one action: SEARCH, NAVIGATE, EXTRACT, PAGE_INTERACTIONS, or FINISH."
                 f"Context Summary:```json {summary}```"
+                "extracted_content holds the most recent extractions; running_summary and key_points cover earlier pages. "
+                "search_results_available counts unvisited_search_results. "
+                "When page_elements_changes is present it lists the page elements added, changed or removed since the last step; page_elements then holds the unchanged ones as \"id kind: text\"."
                 "Actions:"
                 "• SEARCH: Perform a new Google search when no search_results are available or previous results were exhausted. Return `{\"action\":\"SEARCH\",\"query\":\"...\"}`."
-                "• NAVIGATE: Visit the next unvisited search_result URL. Return `{\"action\":\"NAVIGATE\",\"url\":\"...\"}`."
+                "• NAVIGATE: Visit the next URL from unvisited_search_results. Return `{\"action\":\"NAVIGATE\",\"url\":\"...\"}`."
                 "• EXTRACT: Extract content from the current page without interacting. Return `{\"action\":\"EXTRACT\"}`."
-                "• PAGE_INTERACTIONS: Interact with visible page_elements (filters, dropdowns, inputs, links) to reveal or refine content. Use when extract_count > 0 but content incomplete, or extract_count == 0 with available page_elements. Return `{\"action\":\"PAGE_INTERACTIONS\",\"interactions\":[...]}` with precise selectors and types."
+                "• PAGE_INTERACTIONS: Interact with visible page_elements (filters, dropdowns, inputs, links) to reveal or refine content. Use when extract_count > 0 but content incomplete, or extract_count == 0 with available page_elements. Return `{\"action\":\"PAGE_INTERACTIONS\",\"interactions\":[{\"id\":\"e3\",\"type\":\"click|fill|select\",\"value\":\"...\"}]}` using the ids of page_elements; value is the text to fill or the option to select."
                 "• FINISH: Stop when extracted_content contains at least one item marked final or with a clear non-empty output that answers the user goal. Return `{\"action\":\"FINISH\"}`."
                 "Guidelines:"
                 "1. After NAVIGATE, if no EXTRACT has occurred yet, choose EXTRACT."
@@ -96,7 +198,7 @@ class MCPPlanner:
                 "3. Only use PAGE_INTERACTIONS when page_elements list is non-empty."
                 "4. Use SEARCH only if search_results_available == 0 or all NAVIGATE URLs have been visited."
                 "5. Use NAVIGATE if unvisited search_results exist and no EXTRACT or PAGE_INTERACTIONS is currently needed."
-                "6. Only FINISH when extracted_content includes at least one item with action \"final\" or a non-empty output answering the goal."
+                "6. Only FINISH when final_found is true, or extracted_content includes at least one item with action \"final\" or a non-empty output answering the goal."
                 "7. Always respond with valid JSON containing only the keys: action, and query/url/interactions as required."
             )),
             HumanMessage(content=(
@@ -105,6 +207,7 @@ class MCPPlanner:
             ))
         ]
         # Invoke LLM
+        self.llm_calls += 1
         response = await self.llm.ainvoke(input=messages)
         raw = response.content.strip()
         if raw.startswith("```"):
@@ -116,18 +219,35 @@ class MCPPlanner:
             action_data = {"action": "EXTRACT"}
         return action_data
 
-    async def generate_final_answer(self, user_goal: str) -> str:
+    def _final_answer_messages(self, user_goal: str) -> List[Any]:
         relevant = [
                 {"url": it["url"], "summary": it["content"].get("output", "")}  
                 for it in self.context["extracted_content"] if it["content"].get("output")
             ]
-        messages = [
+        return [
             SystemMessage(content=(
                 "You are an expert synthesizer. Combine summaries into a final answer.")),
             HumanMessage(content=f"Goal: {user_goal}\nData: {json.dumps(relevant, indent=2)}")
         ]
-        resp = await self.llm.ainvoke(input=messages)
+
+    async def generate_final_answer(self, user_goal: str) -> str:
+        resp = await self.llm.ainvoke(input=self._final_answer_messages(user_goal))
         ans = resp.content.strip()
         self.context["final_answers"].append(ans)
         self.state = "FINISHED"
         return ans
+
+    async def stream_final_answer(self, user_goal: str) -> AsyncIterator[str]:
+        """
+        Stream the final answer token by token as the LLM produces it.
+        Once the stream completes, the full answer is recorded in
+        `context["final_answers"]` exactly as generate_final_answer does.
+        """
+        parts: List[str] = []
+        async for chunk in self.llm.astream(input=self._final_answer_messages(user_goal)):
+            text = chunk.content if isinstance(chunk.content, str) else ""
+            if text:
+                parts.append(text)
+                yield text
+        self.context["final_answers"].append("".join(parts).strip())
+        self.state = "FINISHED"
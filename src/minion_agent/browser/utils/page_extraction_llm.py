@@ -1,9 +1,13 @@
+import asyncio
 import logging
 import json
+import random
 import re
-from typing import Dict, Any, List
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 from langchain_core.language_models.base import BaseLanguageModel
+from .extraction_cache import ExtractionCache
+from .text_chunking import TokenCounter, chunk_markdown, context_window_for
 
 logger = logging.getLogger(__name__)
 
@@ -13,33 +17,116 @@ class OpenAIPageExtractionLLM:
     handling arbitrarily large content by chunking and then uses an LLM call
     to decide finality based on the merged output.
     """
-    MAX_CHUNK_CHARS = 15000  # tweak to fit your token limits
+    # Share of the model's context window a single chunk may use; the rest is
+    # left for the instructions, the goal and the function-call response.
+    CHUNK_CONTEXT_FRACTION = 0.25
 
-    def __init__(self, llm: BaseLanguageModel):
+    def __init__(
+        self,
+        llm: BaseLanguageModel,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        chunk_tokens: Optional[int] = None,
+        chunk_overlap_tokens: int = 200,
+        cache: Optional[ExtractionCache] = None
+    ):
+        """
+        Args:
+            llm: The LangChain chat model used for extraction
+            max_concurrency: Maximum chunk extractions in flight at once for this instance
+            max_retries: Retries per LLM call when the provider rate-limits us
+            backoff_base: Initial backoff delay in seconds, doubled on every retry
+            backoff_max: Upper bound for a single backoff delay in seconds
+            chunk_tokens: Token budget per chunk, derived from the model's context window by default
+            chunk_overlap_tokens: Tokens of trailing context repeated at the start of the next chunk
+            cache: Optional ExtractionCache consulted by content extraction before calling the LLM
+        """
         self.llm = llm
+        self.cache = cache
+        self.chunk_tokens = chunk_tokens or int(context_window_for(self.model_name) * self.CHUNK_CONTEXT_FRACTION)
+        self.chunk_overlap_tokens = chunk_overlap_tokens
+        self._token_counter: Optional[TokenCounter] = None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
 
     async def extract_with_function_call(self, content: str, goal: str) -> Dict[str, Any]:
-        # 1) chunk the page
+        # 1) chunk the page and extract every chunk concurrently
         chunks = self._chunk_content(content)
-        partials: List[Dict[str, Any]] = []
-        for idx, chunk in enumerate(chunks, start=1):
-            logger.info(f"Processing chunk {idx}/{len(chunks)} (len={len(chunk)})")
-            partials.append(await self._extract_chunk(chunk, goal))
+
+        async def extract(idx: int, chunk: str) -> Dict[str, Any]:
+            async with self._semaphore:
+                logger.info(f"Processing chunk {idx}/{len(chunks)} (len={len(chunk)} chars)")
+                return await self._with_backoff(lambda: self._extract_chunk(chunk, goal))
+
+        # gather keeps the partials in document order
+        partials: List[Dict[str, Any]] = await asyncio.gather(
+            *(extract(idx, chunk) for idx, chunk in enumerate(chunks, start=1))
+        )
 
         # 2) merge them
         merged = self._merge_partials(partials)
 
         # 3) decide finality with a fresh LLM call
-        merged["action"] = await self._decide_action(merged["output"], goal)
+        merged["action"] = await self._with_backoff(lambda: self._decide_action(merged["output"], goal))
         return merged
 
+    async def _with_backoff(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await `call()`, retrying with exponential backoff and jitter while the
+        provider answers with a rate-limit error. Honours Retry-After when present.
+        """
+        attempt = 0
+        while True:
+            try:
+                return await call()
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_rate_limited(e):
+                    raise
+                delay = self._retry_after(e)
+                if delay is None:
+                    delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                    delay += random.uniform(0, self.backoff_base)
+                attempt += 1
+                logger.warning(f"Rate limited by LLM provider, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _is_rate_limited(error: Exception) -> bool:
+        status = getattr(error, "status_code", None)
+        if status is None:
+            status = getattr(getattr(error, "response", None), "status_code", None)
+        return status == 429 or "ratelimit" in type(error).__name__.lower()
+
+    @staticmethod
+    def _retry_after(error: Exception):
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            value = headers.get("retry-after")
+            return float(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.llm, "model_name", None) or getattr(self.llm, "model", None) or ""
+
+    @property
+    def token_counter(self) -> TokenCounter:
+        if self._token_counter is None:
+            self._token_counter = TokenCounter(self.model_name or None)
+        return self._token_counter
+
     def _chunk_content(self, content: str) -> List[str]:
-        if len(content) <= self.MAX_CHUNK_CHARS:
-            return [content]
-        return [
-            content[i : i + self.MAX_CHUNK_CHARS]
-            for i in range(0, len(content), self.MAX_CHUNK_CHARS)
-        ]
+        return chunk_markdown(
+            content,
+            self.chunk_tokens,
+            counter=self.token_counter,
+            overlap_tokens=self.chunk_overlap_tokens
+        )
 
     async def _extract_chunk(self, chunk: str, goal: str) -> Dict[str, Any]:
         functions = [{
@@ -120,7 +207,8 @@ class OpenAIPageExtractionLLM:
         )
 
         # extract the JSON arguments
-        return self._parse_function_response(response)
+        decision = self._parse_function_response(response)
+        return decision.get("action", "next_url") if isinstance(decision, dict) else "next_url"
 
     def _parse_function_response(self, response: Any) -> Dict[str, Any]:
         # (same as before) tries dict, response.function_call, additional_kwargs, embedded JSON
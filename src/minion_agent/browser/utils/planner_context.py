@@ -0,0 +1,147 @@
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from .text_chunking import TokenCounter
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _shorten(text: Any, max_chars: int) -> str:
+    text = _WHITESPACE_RE.sub(" ", str(text or "")).strip()
+    if len(text) <= max_chars:
+        return text
+    return text[: max_chars - 3].rstrip() + "..."
+
+
+class RollingContext:
+    """
+    Bounded view of the planner's memory for its prompt.
+
+    The last `recent_k` extractions are kept (trimmed) as-is; older ones are
+    folded into a one-line-per-page running summary. Key points are
+    deduplicated across pages, and the rendered view is shrunk until it fits
+    `token_budget`, so the planner prompt stays roughly the same size however
+    many pages have been visited.
+    """
+
+    def __init__(
+        self,
+        recent_k: int = 3,
+        token_budget: int = 3000,
+        max_key_points: int = 40,
+        max_search_results: int = 10,
+        item_chars: int = 1200,
+        model: Optional[str] = None
+    ):
+        """
+        Args:
+            recent_k: Number of most recent extractions kept in full
+            token_budget: Token budget for the rendered context
+            max_key_points: Deduplicated key points kept, newest first
+            max_search_results: Unvisited search results included in the view
+            item_chars: Character cap for each text field of a recent extraction
+            model: Model name used for token counting
+        """
+        self.recent_k = max(1, recent_k)
+        self.token_budget = token_budget
+        self.max_key_points = max_key_points
+        self.max_search_results = max_search_results
+        self.item_chars = item_chars
+        self.model = model
+        self.recent: List[Dict[str, Any]] = []
+        self.summary_lines: List[str] = []
+        self.key_points: List[str] = []
+        self._seen_points = set()
+        self.final_found = False
+        self._counter: Optional[TokenCounter] = None
+
+    @property
+    def counter(self) -> TokenCounter:
+        if self._counter is None:
+            self._counter = TokenCounter(self.model)
+        return self._counter
+
+    def add(self, url: str, content: Dict[str, Any]) -> None:
+        content = content if isinstance(content, dict) else {"output": content}
+        if content.get("action") == "final":
+            self.final_found = True
+        for point in content.get("key_points") or []:
+            normalized = _WHITESPACE_RE.sub(" ", str(point)).strip().lower().rstrip(".")
+            if normalized and normalized not in self._seen_points:
+                self._seen_points.add(normalized)
+                self.key_points.append(_shorten(point, 300))
+        if len(self.key_points) > self.max_key_points:
+            self.key_points = self.key_points[-self.max_key_points:]
+        self.recent.append({
+            "url": url,
+            "action": content.get("action", ""),
+            "summary": _shorten(content.get("summary", ""), self.item_chars),
+            "output": _shorten(content.get("output", ""), self.item_chars),
+        })
+        while len(self.recent) > self.recent_k:
+            self._fold(self.recent.pop(0))
+
+    def _fold(self, item: Dict[str, Any]) -> None:
+        gist = item["summary"] or item["output"] or "nothing relevant"
+        self.summary_lines.append(f"{item['url']} [{item['action'] or 'n/a'}]: {_shorten(gist, 200)}")
+
+    def render(
+        self,
+        search_results: Optional[List[Dict[str, Any]]] = None,
+        visited_urls: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the bounded context view for the planner prompt.
+
+        Args:
+            search_results: The planner's current search results
+            visited_urls: URLs already visited; their search results are left out
+
+        Returns:
+            Dict[str, Any]: running_summary, key_points, extracted_content (recent
+            extractions), final_found and unvisited_search_results
+        """
+        visited = set(visited_urls or [])
+        unvisited = [
+            {"url": r.get("url"), "title": _shorten(r.get("title", ""), 120)}
+            for r in (search_results or []) if r.get("url") and r.get("url") not in visited
+        ]
+        view = {
+            "running_summary": list(self.summary_lines),
+            "key_points": list(self.key_points),
+            "extracted_content": [dict(item) for item in self.recent],
+            "final_found": self.final_found,
+            "unvisited_search_results": unvisited[: self.max_search_results],
+        }
+        self._fit(view)
+        return view
+
+    def _tokens(self, view: Dict[str, Any]) -> int:
+        return self.counter.count(json.dumps(view, ensure_ascii=False))
+
+    def _fit(self, view: Dict[str, Any]) -> None:
+        """
+        Shrink `view` in place until it fits the token budget: the oldest
+        summary lines and key points go first, then recent extractions are
+        trimmed, then search results are cut.
+        """
+        while self._tokens(view) > self.token_budget:
+            if len(view["running_summary"]) > 1:
+                view["running_summary"].pop(0)
+            elif len(view["key_points"]) > 5:
+                view["key_points"].pop(0)
+            elif any(len(item["output"]) + len(item["summary"]) > 200 for item in view["extracted_content"]):
+                for item in view["extracted_content"]:
+                    item["output"] = _shorten(item["output"], max(100, len(item["output"]) // 2))
+                    item["summary"] = _shorten(item["summary"], max(100, len(item["summary"]) // 2))
+            elif len(view["unvisited_search_results"]) > 3:
+                view["unvisited_search_results"].pop()
+            elif len(view["extracted_content"]) > 1:
+                view["extracted_content"].pop(0)
+            else:
+                logger.warning("Planner context still exceeds its token budget after trimming")
+                break
@@ -0,0 +1,96 @@
+import logging
+from typing import Any, Iterable, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Playwright resource types aborted by each load profile.
+RESOURCE_PROFILES = {
+    "full": frozenset(),
+    "no_media": frozenset({"image", "media", "font"}),
+    # Stylesheets are dropped too, which can change layout-based visibility checks.
+    "text_only": frozenset({"image", "media", "font", "stylesheet", "texttrack", "eventsource", "manifest"}),
+}
+
+# Ad, analytics and tracking hosts; subdomains are matched as well.
+DEFAULT_BLOCKED_DOMAINS = [
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "adservice.google.com",
+    "connect.facebook.net",
+    "analytics.twitter.com",
+    "ads.linkedin.com",
+    "adnxs.com",
+    "criteo.com",
+    "taboola.com",
+    "outbrain.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "hotjar.com",
+    "mixpanel.com",
+    "cdn.segment.com",
+    "api.segment.io",
+    "chartbeat.com",
+    "nr-data.net",
+    "amazon-adsystem.com",
+    "moatads.com",
+]
+
+ROUTE_PATTERN = "**/*"
+
+
+def is_blocked_host(host: Optional[str], blocked_domains: Iterable[str]) -> bool:
+    """
+    Check whether `host` is one of `blocked_domains` or a subdomain of one.
+    """
+    if not host:
+        return False
+    host = host.lower()
+    return any(host == domain or host.endswith("." + domain) for domain in blocked_domains)
+
+
+async def apply_resource_profile(
+    target: Any,
+    profile: str = "full",
+    blocked_domains: Optional[Iterable[str]] = None
+) -> None:
+    """
+    Install request interception on a BrowserContext or Page.
+
+    Any routing installed by a previous call is removed first, so pooled
+    contexts can be reconfigured between leases.
+
+    Args:
+        target: Playwright BrowserContext or Page
+        profile: One of RESOURCE_PROFILES ("full", "no_media", "text_only")
+        blocked_domains: Hosts to abort requests to. Defaults to DEFAULT_BLOCKED_DOMAINS
+            for every profile except "full"; pass an empty list to disable
+    """
+    if profile not in RESOURCE_PROFILES:
+        raise ValueError(f"Unknown resource profile '{profile}', expected one of {sorted(RESOURCE_PROFILES)}")
+    blocked_types = RESOURCE_PROFILES[profile]
+    if blocked_domains is None:
+        blocked_domains = [] if profile == "full" else DEFAULT_BLOCKED_DOMAINS
+    domains = tuple(d.lower().lstrip(".") for d in blocked_domains)
+
+    try:
+        await target.unroute(ROUTE_PATTERN)
+    except Exception as e:
+        logger.debug(f"No previous routing to remove: {e}")
+
+    if not blocked_types and not domains:
+        return
+
+    async def handle(route):
+        request = route.request
+        if request.resource_type in blocked_types or is_blocked_host(urlparse(request.url).hostname, domains):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await target.route(ROUTE_PATTERN, handle)
+    logger.info(f"Applied '{profile}' resource profile ({len(domains)} blocked domains)")
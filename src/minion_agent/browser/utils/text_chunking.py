@@ -0,0 +1,222 @@
+import logging
+import math
+import re
+from typing import Dict, List, Optional
+
+# tiktoken is optional: without it (or without its encoding files) token counts
+# fall back to a characters-per-token estimate.
+HAS_TIKTOKEN = False
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    pass
+
+logger = logging.getLogger(__name__)
+
+# Context windows (in tokens) by model-name prefix; the longest matching prefix wins.
+MODEL_CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-4o": 128000,
+    "gpt-4.1": 1047576,
+    "gpt-4-turbo": 128000,
+    "gpt-4-32k": 32768,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+    "o1": 200000,
+    "o3": 200000,
+    "o4": 200000,
+}
+DEFAULT_CONTEXT_WINDOW = 16385
+CHARS_PER_TOKEN = 4
+
+_HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s")
+_encoding_cache: Dict[str, object] = {}
+_warned_missing_tiktoken = False
+
+
+def context_window_for(model: Optional[str]) -> int:
+    """
+    Look up the context window for a model name, falling back to DEFAULT_CONTEXT_WINDOW.
+    """
+    if not model:
+        return DEFAULT_CONTEXT_WINDOW
+    name = model.lower()
+    matches = [prefix for prefix in MODEL_CONTEXT_WINDOWS if name.startswith(prefix)]
+    if not matches:
+        return DEFAULT_CONTEXT_WINDOW
+    return MODEL_CONTEXT_WINDOWS[max(matches, key=len)]
+
+
+class TokenCounter:
+    """
+    Counts and splits text in tokens of the given model, using tiktoken when
+    its encoding can be loaded and a character estimate otherwise.
+    """
+
+    def __init__(self, model: Optional[str] = None):
+        self.model = model
+        self.encoding = self._load_encoding(model)
+
+    @staticmethod
+    def _load_encoding(model: Optional[str]):
+        global _warned_missing_tiktoken
+        if not HAS_TIKTOKEN:
+            if not _warned_missing_tiktoken:
+                logger.warning("tiktoken not found, token counts will be estimated from character length")
+                _warned_missing_tiktoken = True
+            return None
+        key = model or ""
+        if key not in _encoding_cache:
+            try:
+                try:
+                    encoding = tiktoken.encoding_for_model(model) if model else None
+                except KeyError:
+                    encoding = None
+                _encoding_cache[key] = encoding or tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                # Encoding files are fetched on first use; remember the failure
+                # so offline runs don't retry the download for every page.
+                logger.warning(f"Could not load tiktoken encoding, estimating tokens: {e}")
+                _encoding_cache[key] = None
+        return _encoding_cache[key]
+
+    def count(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        """
+        Hard-split text into pieces of at most `max_tokens` tokens.
+        """
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            return [
+                self.encoding.decode(tokens[i : i + max_tokens])
+                for i in range(0, len(tokens), max_tokens)
+            ]
+        size = max_tokens * CHARS_PER_TOKEN
+        return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def split_markdown_blocks(text: str) -> List[str]:
+    """
+    Split markdown into structural blocks: each heading, paragraph, list and
+    table becomes one block. Tables are never split from their own rows.
+    """
+    blocks: List[str] = []
+    current: List[str] = []
+    in_table = False
+
+    def flush():
+        nonlocal current
+        if current:
+            blocks.append("\n".join(current))
+            current = []
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        is_table_row = stripped.startswith("|")
+        if not stripped:
+            flush()
+            in_table = False
+        elif _HEADING_RE.match(line):
+            flush()
+            blocks.append(line)
+            in_table = False
+        elif is_table_row != in_table:
+            # entering or leaving a table starts a new block
+            flush()
+            current.append(line)
+            in_table = is_table_row
+        else:
+            current.append(line)
+    flush()
+    return blocks
+
+
+def _split_oversized_block(block: str, max_tokens: int, counter: TokenCounter) -> List[str]:
+    """
+    Split a single block larger than the budget on line boundaries, repeating
+    a table's header rows in every piece so each one stays readable.
+    """
+    lines = block.splitlines()
+    header: List[str] = []
+    if len(lines) > 2 and lines[0].strip().startswith("|") and set(lines[1].strip()) <= set("|-: "):
+        header, lines = lines[:2], lines[2:]
+    header_tokens = counter.count("\n".join(header)) if header else 0
+
+    pieces: List[str] = []
+    current: List[str] = []
+    current_tokens = header_tokens
+    for line in lines:
+        line_tokens = counter.count(line) + 1
+        if line_tokens + header_tokens > max_tokens:
+            if current:
+                pieces.append("\n".join(header + current))
+                current, current_tokens = [], header_tokens
+            pieces.extend(counter.split(line, max_tokens))
+            continue
+        if current and current_tokens + line_tokens > max_tokens:
+            pieces.append("\n".join(header + current))
+            current, current_tokens = [], header_tokens
+        current.append(line)
+        current_tokens += line_tokens
+    if current:
+        pieces.append("\n".join(header + current))
+    return pieces
+
+
+def chunk_markdown(
+    text: str,
+    max_tokens: int,
+    counter: Optional[TokenCounter] = None,
+    overlap_tokens: int = 0
+) -> List[str]:
+    """
+    Pack markdown into chunks of at most `max_tokens` tokens, breaking only on
+    heading, paragraph and table boundaries where possible.
+
+    Args:
+        text: The markdown to chunk
+        max_tokens: Token budget per chunk
+        counter: TokenCounter used for measuring, defaults to the estimate-based counter
+        overlap_tokens: Up to this many tokens of trailing blocks are repeated
+            at the start of the next chunk for context
+
+    Returns:
+        List[str]: The chunks in document order
+    """
+    counter = counter or TokenCounter()
+    if counter.count(text) <= max_tokens:
+        return [text]
+
+    blocks: List[str] = []
+    for block in split_markdown_blocks(text):
+        if counter.count(block) > max_tokens:
+            blocks.extend(_split_oversized_block(block, max_tokens, counter))
+        else:
+            blocks.append(block)
+    sizes = [counter.count(block) + 2 for block in blocks]
+
+    chunks: List[str] = []
+    current: List[int] = []
+    current_tokens = 0
+    for idx, block in enumerate(blocks):
+        # prefer starting a new chunk at a heading once the current one is half full
+        starts_section = bool(_HEADING_RE.match(block)) and current_tokens > max_tokens // 2
+        if current and (current_tokens + sizes[idx] > max_tokens or starts_section):
+            chunks.append("\n\n".join(blocks[i] for i in current))
+            carried: List[int] = []
+            carried_tokens = 0
+            for i in reversed(current):
+                if carried_tokens + sizes[i] > overlap_tokens or carried_tokens + sizes[i] + sizes[idx] > max_tokens:
+                    break
+                carried.insert(0, i)
+                carried_tokens += sizes[i]
+            current, current_tokens = carried, carried_tokens
+        current.append(idx)
+        current_tokens += sizes[idx]
+    if current:
+        chunks.append("\n\n".join(blocks[i] for i in current))
+    return chunks
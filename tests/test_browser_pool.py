@@ -0,0 +1,149 @@
+import asyncio
+import pytest
+from src.minion_agent.browser.utils.browser_pool import BrowserPool
+
+class DummyPage:
+    def __init__(self, heap_bytes=0):
+        self.heap_bytes = heap_bytes
+        self.closed = False
+    async def evaluate(self, script):
+        return self.heap_bytes
+    async def close(self):
+        self.closed = True
+
+class DummyRequest:
+    def __init__(self, url, resource_type="document"):
+        self.url = url
+        self.resource_type = resource_type
+
+class DummyCDPSession:
+    def __init__(self):
+        self.sent = []
+    async def send(self, method, params=None):
+        self.sent.append((method, params))
+    async def detach(self):
+        pass
+
+class DummyContext:
+    def __init__(self):
+        self.pages = []
+        self.closed = False
+        self.cookies_cleared = 0
+        self.permissions_cleared = 0
+        self.listeners = {}
+        self.cdp = DummyCDPSession()
+    def on(self, event, listener):
+        self.listeners.setdefault(event, []).append(listener)
+    def visit(self, url):
+        for listener in self.listeners.get("request", []):
+            listener(DummyRequest(url))
+    async def new_page(self, heap_bytes=0):
+        page = DummyPage(heap_bytes)
+        self.pages.append(page)
+        return page
+    async def new_cdp_session(self, page):
+        return self.cdp
+    async def clear_cookies(self):
+        self.cookies_cleared += 1
+    async def clear_permissions(self):
+        self.permissions_cleared += 1
+    async def close(self):
+        self.closed = True
+
+class DummyBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.closed = False
+        self.fail_new_context = 0
+    async def new_context(self, **kwargs):
+        if self.fail_new_context:
+            self.fail_new_context -= 1
+            raise RuntimeError("browser crashed")
+        context = DummyContext()
+        self.contexts.append(context)
+        return context
+    async def close(self):
+        self.closed = True
+
+@pytest.mark.asyncio
+async def test_lease_reuses_warm_context():
+    browser = DummyBrowser()
+    async with BrowserPool(size=1, browser=browser) as pool:
+        async with pool.lease() as first:
+            page = await first.new_page()
+        async with pool.lease() as second:
+            pass
+    assert first is second
+    assert page.closed
+    assert first.cookies_cleared >= 1
+    assert len(browser.contexts) == 1
+    # Attached browsers are left running for their owner.
+    assert not browser.closed
+    assert first.closed
+
+@pytest.mark.asyncio
+async def test_context_recycled_after_task_limit():
+    browser = DummyBrowser()
+    async with BrowserPool(size=1, max_tasks_per_context=2, browser=browser) as pool:
+        for _ in range(3):
+            async with pool.lease():
+                pass
+    assert len(browser.contexts) == 2
+    assert browser.contexts[0].closed
+
+@pytest.mark.asyncio
+async def test_context_recycled_over_memory_threshold():
+    browser = DummyBrowser()
+    async with BrowserPool(size=1, max_memory_mb=1, browser=browser) as pool:
+        async with pool.lease() as context:
+            await context.new_page(heap_bytes=5 * 1024 * 1024)
+        async with pool.lease() as context:
+            pass
+    assert context is browser.contexts[1]
+    assert browser.contexts[0].closed
+
+@pytest.mark.asyncio
+async def test_concurrent_leases_bounded_by_size():
+    browser = DummyBrowser()
+    active = 0
+    peak = 0
+
+    async def task(pool):
+        nonlocal active, peak
+        async with pool.lease():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async with BrowserPool(size=2, browser=browser) as pool:
+        await asyncio.gather(*(task(pool) for _ in range(6)))
+    assert peak == 2
+    assert len(browser.contexts) == 2
+
+@pytest.mark.asyncio
+async def test_storage_and_permissions_cleared_between_leases():
+    browser = DummyBrowser()
+    async with BrowserPool(size=1, browser=browser) as pool:
+        async with pool.lease() as context:
+            context.visit("https://example.com/a")
+            context.visit("https://example.com/b")
+            context.visit("https://cdn.example.com/x.js")
+    assert context.permissions_cleared == 1
+    assert sorted(params["origin"] for _, params in context.cdp.sent) == [
+        "https://cdn.example.com", "https://example.com"
+    ]
+    assert all(method == "Storage.clearDataForOrigin" for method, _ in context.cdp.sent)
+
+@pytest.mark.asyncio
+async def test_failed_recycle_keeps_slot_and_task_error():
+    browser = DummyBrowser()
+    async with BrowserPool(size=1, max_tasks_per_context=1, browser=browser) as pool:
+        browser.fail_new_context = 1
+        with pytest.raises(ValueError):
+            async with pool.lease():
+                raise ValueError("task failed")
+        # the slot is rebuilt lazily instead of being lost
+        async with pool.lease() as context:
+            pass
+    assert context is browser.contexts[1]
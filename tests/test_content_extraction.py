@@ -1,5 +1,12 @@
+import asyncio
 import pytest
-from src.minion_agent.browser.services.content_extraction import extract_content
+from concurrent.futures import Future
+from src.minion_agent.browser.services import content_extraction
+from src.minion_agent.browser.services.content_extraction import (
+    extract_content,
+    fast_html_to_markdown,
+    convert_html_to_markdown,
+)
 
 class DummyElement:
     async def inner_html(self):
@@ -31,3 +38,215 @@ async def test_extract_content():
     result = await extract_content("Test Question", dummy_browser, dummy_llm, target_selector="div#main")
     assert result["action"] == "final"
     assert result["output"] == "Extracted Content"
+
+
+SAMPLE_HTML = """
+<html><head><style>.x{}</style></head><body>
+<h2>Pricing</h2><p>See <a href="https://example.com/plans">our plans</a>.</p>
+<ul><li>Basic</li><li>Pro</li></ul>
+<table><tr><th>Plan</th><th>Price</th></tr><tr><td>Basic</td><td>$5</td></tr></table>
+<script>var hidden = "<p>nope</p>";</script>
+</body></html>
+"""
+
+def test_fast_html_to_markdown_keeps_structure():
+    markdown = fast_html_to_markdown(SAMPLE_HTML)
+    assert "## Pricing" in markdown
+    assert "[our plans](https://example.com/plans)" in markdown
+    assert "- Basic\n- Pro" in markdown
+    assert "| Plan | Price |\n| --- | --- |\n| Basic | $5 |" in markdown
+    assert "nope" not in markdown and ".x{}" not in markdown
+
+def test_fast_html_to_markdown_handles_implied_end_tags():
+    markdown = fast_html_to_markdown(
+        "<table><tr><th>A<th>B<tr><td><a href='/x'>1</a><td><a href='/y'>2</table><p>after</p>"
+    )
+    assert "| A | B |\n| --- | --- |\n| [1](/x) | 2 |" in markdown
+    assert markdown.rstrip().endswith("after")
+
+class MainContentPage:
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.scripts = []
+    async def evaluate(self, script, *args):
+        self.scripts.append(script)
+        if self.error:
+            raise self.error
+        return self.result
+
+@pytest.mark.asyncio
+async def test_main_content_returns_pruned_region():
+    article = "<article><p>" + "Body text. " * 40 + "</p></article>"
+    page = MainContentPage({"html": article, "score": 48.5, "textLength": 440})
+    assert await content_extraction.extract_main_content_html(page) == article
+    assert page.scripts == [content_extraction._MAIN_CONTENT_SCRIPT]
+
+@pytest.mark.asyncio
+async def test_main_content_falls_back_below_threshold():
+    # too little text kept, too low a score, no candidate, or a failed script: use the full page
+    weak = MainContentPage({"html": "<div>Short</div>", "score": 55, "textLength": 5})
+    low = MainContentPage({"html": "<div>" + "x" * 400 + "</div>", "score": 3, "textLength": 400})
+    empty = MainContentPage({"html": "", "score": 0, "textLength": 0})
+    broken = MainContentPage(error=RuntimeError("detached"))
+    for page in (weak, low, empty, broken):
+        assert await content_extraction.extract_main_content_html(page) is None
+        assert len(page.scripts) == 1
+
+@pytest.mark.asyncio
+async def test_convert_html_to_markdown_selects_converter(monkeypatch):
+    assert "## Pricing" in await convert_html_to_markdown(SAMPLE_HTML, "fast")
+    monkeypatch.setattr(content_extraction, "FAST_CONVERTER_MIN_CHARS", 10)
+    monkeypatch.setattr(content_extraction, "OFFLOAD_MIN_CHARS", 10)
+    assert await convert_html_to_markdown(SAMPLE_HTML) == fast_html_to_markdown(SAMPLE_HTML)
+    with pytest.raises(ValueError):
+        await convert_html_to_markdown(SAMPLE_HTML, "missing")
+
+
+class BatchExtractionLLM:
+    def __init__(self, final_marker=None):
+        self.final_marker = final_marker
+        self.seen = []
+
+    async def extract_with_function_call(self, page_content_markdown, question):
+        self.seen.append(page_content_markdown)
+        action = "final" if self.final_marker and self.final_marker in page_content_markdown else "next_url"
+        return {"action": action, "output": page_content_markdown.strip()[-6:], "summary": "s",
+                "key_points": ["shared"], "context": ""}
+
+def fake_pdf_batches(monkeypatch, batches):
+    async def iter_pdf_text(url, max_pages=None, batch_pages=None):
+        for batch in batches:
+            yield batch
+    monkeypatch.setattr(content_extraction, "iter_pdf_text", iter_pdf_text)
+
+@pytest.mark.asyncio
+async def test_pdf_pipeline_stops_at_final_batch(monkeypatch):
+    fake_pdf_batches(monkeypatch, ["batch1", "batch2", "batch3"])
+    llm = BatchExtractionLLM(final_marker="batch2")
+    result = await content_extraction.extract_pdf_with_pipeline("http://x/doc.pdf", "Doc", "goal", llm)
+    assert result["action"] == "final"
+    assert len(llm.seen) == 2
+
+@pytest.mark.asyncio
+async def test_pdf_pipeline_merges_non_final_batches(monkeypatch):
+    fake_pdf_batches(monkeypatch, ["batch1", "   ", "batch2"])
+    llm = BatchExtractionLLM()
+    result = await content_extraction.extract_pdf_with_pipeline("http://x/doc.pdf", "Doc", "goal", llm)
+    assert result["action"] == "next_url"
+    assert result["output"] == "batch1\n\nbatch2"
+    assert result["key_points"] == ["shared"]
+    assert len(llm.seen) == 2
+
+@pytest.mark.asyncio
+async def test_pdf_workers_read_from_a_temp_file(monkeypatch):
+    import io, os
+    from pypdf import PdfWriter
+    writer = PdfWriter()
+    for _ in range(5):
+        writer.add_blank_page(width=100, height=100)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+
+    calls = []
+    def submit_inline(fn, *args):
+        calls.append(args)
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+    monkeypatch.setattr(content_extraction, "_submit_cpu_bound", submit_inline)
+
+    batches = [b async for b in content_extraction.iter_pdf_bytes_text(buffer.getvalue(), batch_pages=2)]
+    assert len(batches) == 3
+    # workers get a path and a page range, never the document bytes
+    assert all(isinstance(args[0], str) for args in calls)
+    assert not os.path.exists(calls[0][0])
+
+@pytest.mark.asyncio
+async def test_closing_pdf_iteration_waits_for_running_batches(monkeypatch):
+    import os
+    loop = asyncio.get_running_loop()
+    batches = []
+    def submit(fn, *args):
+        future = Future()
+        if fn is content_extraction._pdf_page_count:
+            future.set_result(6)
+            return future
+        if not batches:
+            future.set_result("first")
+        else:
+            # already picked up by a worker: cancel() cannot stop it
+            future.set_running_or_notify_cancel()
+            loop.call_later(0.05, future.set_result, "late")
+        batches.append((args, future))
+        return future
+    monkeypatch.setattr(content_extraction, "_submit_cpu_bound", submit)
+
+    pages = content_extraction.iter_pdf_bytes_text(b"%PDF-1.4", batch_pages=2)
+    assert await pages.__anext__() == "first"
+    await pages.aclose()
+    assert all(future.done() for _, future in batches)
+    assert not os.path.exists(batches[0][0][0])
+
+class FakeProcessPool:
+    def __init__(self, error):
+        self.error = error
+        self.shutdowns = []
+    def submit(self, fn, *args):
+        from concurrent.futures import Future
+        future = Future()
+        future.set_exception(self.error)
+        return future
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shutdowns.append((wait, cancel_futures))
+
+@pytest.mark.asyncio
+async def test_converter_errors_propagate_and_keep_the_pool(monkeypatch):
+    pool = FakeProcessPool(RecursionError("too deep"))
+    monkeypatch.setattr(content_extraction, "_process_pool", pool)
+    with pytest.raises(RecursionError):
+        await content_extraction._run_cpu_bound(len, "abc")
+    assert content_extraction._process_pool is pool
+    assert pool.shutdowns == []
+
+@pytest.mark.asyncio
+async def test_broken_pool_is_shut_down_and_falls_back_to_a_thread(monkeypatch):
+    from concurrent.futures.process import BrokenProcessPool
+    pool = FakeProcessPool(BrokenProcessPool("worker died"))
+    monkeypatch.setattr(content_extraction, "_process_pool", pool)
+    assert await content_extraction._run_cpu_bound(len, "abc") == 3
+    assert pool.shutdowns == [(False, True)]
+    assert content_extraction._process_pool is None
+
+class DummyAPIResponse:
+    ok = True
+    status = 200
+    async def body(self):
+        return b"%PDF-1.4 not really"
+
+class DummyAPIRequest:
+    def __init__(self):
+        self.urls = []
+    async def get(self, url, timeout=None):
+        self.urls.append(url)
+        return DummyAPIResponse()
+
+class DummyPdfPage:
+    def __init__(self):
+        self.request = DummyAPIRequest()
+    async def evaluate(self, script):
+        return None
+
+@pytest.mark.asyncio
+async def test_extract_pdf_content_pipes_binary_body(monkeypatch):
+    received = []
+    async def fake_pdftotext(data, timeout=30.0):
+        received.append(data)
+        return "pdf text"
+    monkeypatch.setattr(content_extraction, "_pdftotext", fake_pdftotext)
+    browser = DummyBrowser()
+    browser.page = DummyPdfPage()
+    text = await content_extraction.extract_pdf_content(browser, "http://x/doc.pdf")
+    assert text == "pdf text"
+    assert received == [b"%PDF-1.4 not really"]
+    assert browser.page.request.urls == ["http://x/doc.pdf"]
@@ -0,0 +1,71 @@
+import pytest
+from src.minion_agent.browser.utils.element_registry import BWE_ID_ATTRIBUTE, ElementRegistry
+
+class DummyHandle:
+    def __init__(self, element):
+        self.element = element
+        self.disposed = False
+    def as_element(self):
+        return self.element
+    async def dispose(self):
+        self.disposed = True
+
+def link(ref, text):
+    return {"id": ref, "kind": "link", "text": text}
+
+class RegistryPage:
+    """Stands in for the in-page registry: `tagged` maps element ids to elements."""
+    def __init__(self, tagged, diffs=()):
+        self.tagged = tagged
+        self.diffs = list(diffs)
+        self.queries = []
+        self.snapshot_args = []
+    async def evaluate(self, script, arg=None):
+        assert arg["attr"] == BWE_ID_ATTRIBUTE
+        self.snapshot_args.append(arg)
+        if arg["incremental"] and self.diffs:
+            return {"full": False, **self.diffs.pop(0)}
+        return {"full": True, "elements": [link(ref, text) for ref, text in self.tagged.items()]}
+    async def evaluate_handle(self, script, arg=None):
+        return DummyHandle(self.tagged.get(arg))
+    async def query_selector(self, selector):
+        self.queries.append(selector)
+        return None
+
+@pytest.mark.asyncio
+async def test_snapshot_lists_short_ids():
+    registry = ElementRegistry()
+    elements = await registry.snapshot(RegistryPage({"e0": "Pricing", "e1": "Docs"}))
+    assert [e["id"] for e in elements] == ["e0", "e1"]
+    assert all("selector" not in e for e in elements)
+    assert registry.describe("e1") == 'e1 (link "Docs")'
+
+@pytest.mark.asyncio
+async def test_resolve_uses_in_page_map():
+    page = RegistryPage({"e0": "Pricing"})
+    assert await ElementRegistry().resolve(page, "e0") == "Pricing"
+    assert page.queries == []
+
+@pytest.mark.asyncio
+async def test_resolve_falls_back_to_tag_and_selectors():
+    page = RegistryPage({})
+    registry = ElementRegistry()
+    assert await registry.resolve(page, "e7") is None
+    assert await registry.resolve(page, "button#go") is None
+    assert page.queries == [f'[{BWE_ID_ATTRIBUTE}="e7"]', "button#go"]
+
+@pytest.mark.asyncio
+async def test_snapshot_changes_applies_diff():
+    page = RegistryPage(
+        {"e0": "Pricing", "e1": "Docs"},
+        diffs=[{"added": [link("e2", "Enterprise")], "changed": [link("e0", "Plans")], "removed": ["e1"]}]
+    )
+    registry = ElementRegistry()
+    first = await registry.snapshot_changes(page)
+    assert first["full"] and [e["id"] for e in first["elements"]] == ["e0", "e1"]
+    second = await registry.snapshot_changes(page)
+    assert not second["full"]
+    assert [e["id"] for e in second["added"]] == ["e2"]
+    assert second["removed"] == ["e1"]
+    assert second["elements"] == [link("e0", "Plans"), link("e2", "Enterprise")]
+    assert [arg["incremental"] for arg in page.snapshot_args] == [False, True]
@@ -0,0 +1,54 @@
+import pytest
+from src.minion_agent.browser.utils import extraction_cache
+from src.minion_agent.browser.utils.extraction_cache import ExtractionCache
+from src.minion_agent.browser.services.content_extraction import process_extracted_content
+
+class CountingLLM:
+    model_name = "gpt-4o"
+    def __init__(self, cache):
+        self.cache = cache
+        self.calls = 0
+    async def extract_with_function_call(self, content, goal):
+        self.calls += 1
+        return {"action": "final", "output": "answer", "summary": "s", "key_points": [], "context": ""}
+
+def test_key_ignores_whitespace_and_scripts():
+    a = ExtractionCache.make_key("<p>Hello   world</p><script>var n=1</script>", "Goal", "m")
+    b = ExtractionCache.make_key("<p>Hello world</p>\n<script>var n=2</script>", "goal ", "m")
+    assert a == b
+    assert a != ExtractionCache.make_key("<p>Hello world</p>", "goal", "other-model")
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl(monkeypatch):
+    cache = ExtractionCache(":memory:", ttl_seconds=10)
+    now = [1000.0]
+    monkeypatch.setattr(extraction_cache.time, "time", lambda: now[0])
+    await cache.set("k", {"output": "x"})
+    assert await cache.get("k") == {"output": "x"}
+    now[0] += 11
+    assert await cache.get("k") is None
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_evicted(monkeypatch):
+    cache = ExtractionCache(":memory:", max_entries=2)
+    now = [1000.0]
+    monkeypatch.setattr(extraction_cache.time, "time", lambda: now[0])
+    for key in ("a", "b"):
+        now[0] += 1
+        await cache.set(key, {"key": key})
+    now[0] += 1
+    await cache.get("a")
+    now[0] += 1
+    await cache.set("c", {"key": "c"})
+    assert await cache.get("b") is None
+    assert await cache.get("a") == {"key": "a"}
+    assert await cache.get("c") == {"key": "c"}
+
+@pytest.mark.asyncio
+async def test_process_extracted_content_skips_llm_on_hit():
+    llm = CountingLLM(ExtractionCache(":memory:"))
+    first = await process_extracted_content("same text", "Title", "http://a.com", "goal", llm)
+    second = await process_extracted_content("same  text", "Other", "http://b.com", "goal", llm)
+    assert llm.calls == 1
+    assert second["output"] == first["output"]
+    assert second["page_url"] == "http://b.com"
@@ -0,0 +1,255 @@
+import asyncio
+import time
+import pytest
+from src.minion_agent.browser.services import interactive_actions
+from src.minion_agent.browser.services.interactive_actions import ElementSelector
+
+class DummyResponse:
+    def __init__(self, content):
+        self.content = content
+
+class SlowLLM:
+    def __init__(self, reply, delay=0.1):
+        self.reply = reply
+        self.delay = delay
+        self.calls = 0
+
+    async def ainvoke(self, input):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return DummyResponse(self.reply)
+
+ELEMENTS = [{"id": "e1", "text": "Home"}, {"id": "e2", "text": "Pricing"}]
+
+@pytest.mark.asyncio
+async def test_selections_run_concurrently_on_shared_llm():
+    llm = SlowLLM('```json\n{"element_id": "e2", "reason": "pricing"}\n```')
+    selectors = [ElementSelector(llm=llm) for _ in range(5)]
+    started = time.monotonic()
+    chosen = await asyncio.gather(*(
+        s.select_best_element([dict(e) for e in ELEMENTS], "price", {"title": "t", "url": "u"})
+        for s in selectors
+    ))
+    assert time.monotonic() - started < 0.3
+    assert [c["id"] for c in chosen] == ["e2"] * 5
+    assert llm.calls == 5
+
+@pytest.mark.asyncio
+async def test_pooled_openai_client_is_shared(monkeypatch):
+    if not interactive_actions.HAS_OPENAI:
+        pytest.skip("openai not installed")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    first, second = ElementSelector(), ElementSelector()
+    assert first.client is second.client
+
+def test_selector_without_key_is_disabled(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    assert ElementSelector().client is None
+
+FORM_GROUP = {
+    "description": "Flight search",
+    "selector": "form#search",
+    "inputs": [
+        {"id": "input_1", "type": "text", "label": "From", "selector": "#from"},
+        {"id": "input_2", "type": "text", "label": "To", "selector": "#to"},
+    ],
+    "dropdowns": [],
+    "checkbox_radio": [{"id": "check_radio_1", "type": "checkbox", "label": "Direct only", "selector": "#direct"}],
+}
+
+class DummyField:
+    def __init__(self):
+        self.value = None
+        self.checked = False
+
+    async def is_visible(self):
+        return True
+
+    async def fill(self, value):
+        self.value = value
+
+    async def is_checked(self):
+        return self.checked
+
+    async def check(self):
+        self.checked = True
+
+    async def uncheck(self):
+        self.checked = False
+
+    async def query_selector_all(self, selector):
+        return []
+
+class DummyFormPage:
+    def __init__(self):
+        self.fields = {}
+        self.settles = 0
+
+    def on(self, event, listener):
+        pass
+
+    def remove_listener(self, event, listener):
+        pass
+
+    async def evaluate(self, script, arg=None):
+        self.settles += 1
+        return True
+
+    async def query_selector(self, selector):
+        return self.fields.setdefault(selector, DummyField())
+
+@pytest.mark.asyncio
+async def test_plan_form_validates_values_in_one_call():
+    llm = SlowLLM('{"input_1": "Delhi", "input_2": null, "check_radio_1": "yes", '
+                  '"dropdown_1": "economy", "dropdown_2": "Submarine"}', delay=0)
+    fields = [
+        interactive_actions.form_field_schema("input", {"id": "input_1", "type": "text"}),
+        interactive_actions.form_field_schema("input", {"id": "input_2", "type": "text"}),
+        interactive_actions.form_field_schema("checkbox", {"id": "check_radio_1", "type": "checkbox"}),
+        interactive_actions.form_field_schema("dropdown", {"id": "dropdown_1", "options": ["Economy", "Business"]}),
+        interactive_actions.form_field_schema("dropdown", {"id": "dropdown_2", "options": ["Car", "Train"]}),
+    ]
+    plan = await ElementSelector(llm=llm).plan_form(fields, "flights", {"title": "t", "url": "u"})
+    assert plan == {"input_1": "Delhi", "check_radio_1": True, "dropdown_1": "Economy"}
+    assert llm.calls == 1
+
+@pytest.mark.asyncio
+async def test_form_group_filled_from_single_plan():
+    llm = SlowLLM('{"input_1": "Delhi", "input_2": "Leh", "check_radio_1": true}', delay=0)
+    page = DummyFormPage()
+    filled = await interactive_actions.interact_with_form_group(
+        page, FORM_GROUP, "flights from Delhi to Leh", ElementSelector(llm=llm), {"title": "t", "url": "u"}
+    )
+    assert filled
+    assert llm.calls == 1
+    assert page.fields["#from"].value == "Delhi"
+    assert page.fields["#to"].value == "Leh"
+    assert page.fields["#direct"].checked
+
+class PlanRecordingSelector:
+    def __init__(self):
+        self.planned = []
+
+    async def plan_form(self, fields, user_prompt, page_info, form_description=""):
+        self.planned.append([field["id"] for field in fields])
+        return {field["id"]: "Price" for field in fields if field["kind"] == "dropdown"}
+
+    async def select_best_element(self, elements, user_prompt, page_info):
+        return None
+
+class InteractionPage:
+    url = "https://example.com/flights"
+
+    async def title(self):
+        return "Flights"
+
+@pytest.mark.asyncio
+async def test_page_plan_leaves_out_form_group_fields(monkeypatch):
+    standalone = {"id": "dropdown_9", "label": "Sort by", "options": ["Price", "Duration"], "selector": "#sort"}
+    details = {
+        "clickable": [],
+        "inputs": FORM_GROUP["inputs"],
+        "dropdowns": [standalone],
+        "checkbox_radio": FORM_GROUP["checkbox_radio"],
+    }
+    filled_groups, handled = [], []
+
+    async def noop(*args, **kwargs):
+        return None
+
+    async def fake_details(page):
+        return details
+
+    async def fake_groups(page, element_details):
+        return [FORM_GROUP]
+
+    async def fake_group(page, group, *args):
+        filled_groups.append(group["description"])
+        return True
+
+    async def fake_dropdown(page, dropdown, *args, **kwargs):
+        handled.append(dropdown["id"])
+        return False
+
+    async def fake_checkbox(page, element, *args, **kwargs):
+        handled.append(element["id"])
+        return False
+
+    monkeypatch.setattr(interactive_actions, "extract_page_content_snippet", noop)
+    monkeypatch.setattr(interactive_actions, "thorough_page_scrolling", noop)
+    monkeypatch.setattr(interactive_actions, "get_interactive_elements_with_details", fake_details)
+    monkeypatch.setattr(interactive_actions, "identify_form_groups", fake_groups)
+    monkeypatch.setattr(interactive_actions, "find_search_form", noop)
+    monkeypatch.setattr(interactive_actions, "interact_with_form_group", fake_group)
+    monkeypatch.setattr(interactive_actions, "interact_with_dropdown", fake_dropdown)
+    monkeypatch.setattr(interactive_actions, "interact_with_checkbox_radio", fake_checkbox)
+
+    class Browser:
+        async def get_current_page(self):
+            return InteractionPage()
+
+    selector = PlanRecordingSelector()
+    await interactive_actions.perform_page_interactions(Browser(), "flights", element_selector=selector)
+    assert filled_groups == ["Flight search"]
+    # the form's inputs and checkbox are filled with their group, not planned again
+    assert selector.planned == [["dropdown_9"]]
+    assert handled == ["dropdown_9"]
+
+class ScrollPage:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    async def evaluate(self, script, arg=None):
+        self.calls.append(arg)
+        if self.error:
+            raise self.error
+        return {"steps": 3, "height": 2400, "added_nodes": 0, "reason": "settled", "elapsed_ms": 900}
+
+@pytest.mark.asyncio
+async def test_scrolling_runs_in_one_evaluate_with_budgets():
+    page = ScrollPage()
+    stats = await interactive_actions.thorough_page_scrolling(page, max_items=50, timeout_seconds=2)
+    assert stats["reason"] == "settled"
+    assert len(page.calls) == 1
+    assert page.calls[0]["maxItems"] == 50
+    assert page.calls[0]["timeoutMs"] == 2000
+
+@pytest.mark.asyncio
+async def test_scrolling_failure_is_not_fatal():
+    assert await interactive_actions.thorough_page_scrolling(ScrollPage(RuntimeError("navigated"))) == {}
+
+
+class InventoryPage:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    async def evaluate(self, script, arg=None):
+        self.calls.append((script, arg))
+        if self.error:
+            raise self.error
+        return {
+            "clickable": [{"id": "clickable_1", "text": "Search", "selector": "#go", "element_type": "button"}],
+            "inputs": [{"id": "input_1", "type": "text", "label": "From", "selector": "#from"}],
+            "dropdowns": [{"id": "dropdown_1", "label": "Class", "options": ["Economy"], "selector": "#class"}],
+            "checkbox_radio": [],
+        }
+
+@pytest.mark.asyncio
+async def test_element_inventory_takes_one_evaluate():
+    page = InventoryPage()
+    details = await interactive_actions.get_interactive_elements_with_details(page)
+    assert len(page.calls) == 1
+    script, arg = page.calls[0]
+    assert script == interactive_actions._ELEMENT_INVENTORY_SCRIPT
+    assert set(arg) == {"clickable", "inputs", "dropdowns", "checkbox_radio"}
+    assert set(details) == {"clickable", "inputs", "dropdowns", "checkbox_radio"}
+    assert details["inputs"][0]["selector"] == "#from"
+
+@pytest.mark.asyncio
+async def test_element_inventory_failure_keeps_shape():
+    page = InventoryPage(RuntimeError("navigated"))
+    details = await interactive_actions.get_interactive_elements_with_details(page)
+    assert len(page.calls) == 1
+    assert details == {"clickable": [], "inputs": [], "dropdowns": [], "checkbox_radio": []}
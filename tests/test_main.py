@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from src.minion_agent.browser.main import MinionAgent
+from src.minion_agent.browser.utils.browser_pool import BrowserPool
+from tests.test_browser_pool import DummyBrowser
+
+def make_agent(pool, delays):
+    agent = MinionAgent(llm=object(), browser_pool=pool)
+
+    async def fake_run_task(task, context):
+        await asyncio.sleep(delays[task])
+        return f"result for {task}"
+
+    agent._run_task = fake_run_task
+    return agent
+
+@pytest.mark.asyncio
+async def test_run_many_returns_results_in_input_order():
+    pool = BrowserPool(size=2, browser=DummyBrowser())
+    agent = make_agent(pool, {"a": 0.03, "b": 0.01, "c": 0.0})
+    results = await agent.run_many(["a", "b", "c"], concurrency=2)
+    await pool.close()
+    assert results == ["result for a", "result for b", "result for c"]
+
+@pytest.mark.asyncio
+async def test_iter_many_streams_in_completion_order_with_timeout():
+    pool = BrowserPool(size=2, browser=DummyBrowser())
+    agent = make_agent(pool, {"slow": 1.0, "fast": 0.0})
+    seen = [item async for item in agent.iter_many(["slow", "fast"], concurrency=2, timeout=0.1)]
+    await pool.close()
+    assert seen[0] == (1, "fast", "result for fast")
+    assert seen[1][0] == 0
+    assert "timed out" in seen[1][2]
+
+@pytest.mark.asyncio
+async def test_iter_many_timeout_excludes_waiting_for_a_context():
+    # one context, three 0.05s tasks: the last waits 0.1s for the lease but must not time out
+    pool = BrowserPool(size=1, browser=DummyBrowser())
+    agent = make_agent(pool, {"a": 0.05, "b": 0.05, "c": 0.05})
+    results = await agent.run_many(["a", "b", "c"], concurrency=3, timeout=0.08)
+    await pool.close()
+    assert results == ["result for a", "result for b", "result for c"]
+
+@pytest.mark.asyncio
+async def test_run_requires_task():
+    agent = MinionAgent(llm=object())
+    with pytest.raises(ValueError):
+        await agent.run()
+
+@pytest.mark.asyncio
+async def test_stream_yields_tokens_and_stores_result(monkeypatch):
+    from src.minion_agent.browser import main
+
+    async def fake_stream_web_scraper(task, page, extraction_llm, llm, planner, **kwargs):
+        for token in ["par", "tial"]:
+            yield token
+
+    monkeypatch.setattr(main, "stream_web_scraper", fake_stream_web_scraper)
+    pool = BrowserPool(size=1, browser=DummyBrowser())
+    agent = MinionAgent(task="goal", llm=object(), browser_pool=pool)
+    tokens = [token async for token in agent.stream()]
+    await pool.close()
+    assert tokens == ["par", "tial"]
+    assert agent.result == "partial"
@@ -0,0 +1,123 @@
+import json
+import pytest
+from src.minion_agent.browser.utils.mcp_planner import MCPPlanner
+from src.minion_agent.browser.utils.planner_context import RollingContext
+
+class DummyResponse:
+    def __init__(self, content):
+        self.content = content
+
+class DummyLLM:
+    model_name = "gpt-4o"
+
+    def __init__(self, reply='{"action": "EXTRACT"}'):
+        self.reply = reply
+        self.prompts = []
+
+    async def ainvoke(self, input):
+        self.prompts.append(input[0].content)
+        return DummyResponse(self.reply)
+
+def extraction(i, text_len=2000):
+    return {
+        "action": "next_url",
+        "summary": f"summary {i} " + "x" * text_len,
+        "key_points": [f"Point {i}", "Shared point", "shared point."],
+        "output": f"output {i} " + "y" * text_len,
+    }
+
+def test_rolling_context_keeps_recent_and_folds_older():
+    memory = RollingContext(recent_k=2, token_budget=100000)
+    for i in range(5):
+        memory.add(f"http://site/{i}", extraction(i, text_len=10))
+    view = memory.render()
+    assert [item["url"] for item in view["extracted_content"]] == ["http://site/3", "http://site/4"]
+    assert len(view["running_summary"]) == 3
+    assert view["running_summary"][0].startswith("http://site/0 [next_url]: summary 0")
+    # duplicate key points collapse regardless of case and trailing dot
+    assert view["key_points"] == ["Point 0", "Shared point", "Point 1", "Point 2", "Point 3", "Point 4"]
+
+def test_rolling_context_respects_token_budget_and_skips_visited_results():
+    memory = RollingContext(recent_k=3, token_budget=800)
+    for i in range(15):
+        memory.add(f"http://site/{i}", extraction(i))
+    results = [{"url": f"http://site/{i}", "title": f"Result {i}"} for i in range(20)]
+    view = memory.render(results, visited_urls=[f"http://site/{i}" for i in range(15)])
+    assert memory.counter.count(json.dumps(view)) <= 800
+    assert all(int(r["url"].rsplit("/", 1)[1]) >= 15 for r in view["unvisited_search_results"])
+
+@pytest.mark.asyncio
+async def test_planner_prompt_stays_bounded():
+    llm = DummyLLM()
+    planner = MCPPlanner(llm, recent_extractions=3, context_token_budget=1500, rule_based=False)
+    sizes = []
+    for i in range(15):
+        planner.add_visited_url(f"http://site/{i}")
+        planner.add_extracted_content(f"http://site/{i}", extraction(i))
+        assert await planner.decide_next_action("goal") == {"action": "EXTRACT"}
+        sizes.append(len(llm.prompts[-1]))
+    assert len(planner.context["extracted_content"]) == 15
+    assert max(sizes[3:]) < 1.5 * sizes[3]
+
+@pytest.mark.asyncio
+async def test_rule_based_transitions_skip_the_llm():
+    llm = DummyLLM('{"action": "PAGE_INTERACTIONS", "interactions": []}')
+    planner = MCPPlanner(llm)
+
+    assert await planner.decide_next_action("goal") == {"action": "SEARCH", "query": "goal"}
+
+    planner.add_search_query("goal")
+    planner.context["search_results"] = [{"url": "http://a.com"}, {"url": "http://b.com"}]
+    planner.state = "SEARCH_RESULTS_AVAILABLE"
+    assert await planner.decide_next_action("goal") == {"action": "NAVIGATE", "url": "http://a.com"}
+
+    planner.add_visited_url("http://a.com")
+    planner.state = "NAVIGATED"
+    assert await planner.decide_next_action("goal", current_url="http://a.com") == {"action": "EXTRACT"}
+
+    planner.add_extracted_content("http://a.com", {"action": "next_url", "output": ""})
+    planner.state = "EXTRACTED"
+    assert await planner.decide_next_action("goal", current_url="http://a.com", page_elements=[]) == {
+        "action": "NAVIGATE", "url": "http://b.com"
+    }
+    assert llm.prompts == []
+
+    # page elements make the choice ambiguous, so the LLM decides
+    elements = [{"selector": "#more", "text": "More"}]
+    action = await planner.decide_next_action("goal", current_url="http://a.com", page_elements=elements)
+    assert action["action"] == "PAGE_INTERACTIONS"
+
+    planner.state = "DONE"
+    assert await planner.decide_next_action("goal", current_url="http://a.com") == {"action": "FINISH"}
+    assert planner.planner_stats() == {"llm_calls": 1, "llm_calls_saved": 5}
+
+@pytest.mark.asyncio
+async def test_prompt_carries_element_diff():
+    llm = DummyLLM()
+    planner = MCPPlanner(llm, rule_based=False)
+    elements = [{"id": f"e{i}", "kind": "link", "text": f"Link number {i}"} for i in range(30)]
+    added = {"id": "e30", "kind": "button", "text": "Load more results"}
+    changes = {"full": False, "added": [added], "changed": [], "removed": ["e29"]}
+    await planner.decide_next_action("goal", current_url="http://a.com", page_elements=elements)
+    await planner.decide_next_action(
+        "goal", current_url="http://a.com", page_elements=elements[:29] + [added], page_changes=changes
+    )
+    full_prompt, diff_prompt = llm.prompts
+    assert "'page_elements_changes'" not in full_prompt
+    assert "'added': [{'id': 'e30'" in diff_prompt
+    assert "'e3 link: Link number 3'" in diff_prompt
+    assert len(diff_prompt) < len(full_prompt)
+
+class StreamingLLM(DummyLLM):
+    async def astream(self, input):
+        for piece in ["The ", "answer", " is 42. "]:
+            yield DummyResponse(piece)
+
+@pytest.mark.asyncio
+async def test_stream_final_answer_records_full_text():
+    planner = MCPPlanner(StreamingLLM())
+    planner.add_extracted_content("http://a.com", {"action": "final", "output": "42"})
+    tokens = [token async for token in planner.stream_final_answer("goal")]
+    assert tokens == ["The ", "answer", " is 42. "]
+    assert planner.context["final_answers"] == ["The answer is 42."]
+    assert planner.state == "FINISHED"
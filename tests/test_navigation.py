@@ -1,11 +1,24 @@
+import asyncio
 import pytest
-from src.minion_agent.browser.services.navigation import go_to_url, wait_seconds
+from src.minion_agent.browser.services.navigation import (
+    go_to_url, wait_seconds, navigate, settle, NavigationPolicy
+)
 
 class DummyPage:
-    async def goto(self, url):
+    def __init__(self, content_ready=True):
+        self.content_ready = content_ready
+        self.goto_kwargs = None
+        self.load_states = []
+    async def goto(self, url, **kwargs):
         self.url = url
-    async def wait_for_load_state(self, state="load"):
-        pass
+        self.goto_kwargs = kwargs
+    async def wait_for_load_state(self, state="load", timeout=None):
+        self.load_states.append((state, timeout))
+    async def wait_for_function(self, script, arg=None, timeout=None, polling=None):
+        self.content_timeout = timeout
+        if not self.content_ready:
+            raise TimeoutError("content never appeared")
+        return True
 
 class DummyBrowser:
     def __init__(self):
@@ -23,3 +36,81 @@ async def test_go_to_url():
     dummy_browser = DummyBrowser()
     result = await go_to_url("http://example.com", dummy_browser)
     assert "Navigated to http://example.com" in result
+
+@pytest.mark.asyncio
+async def test_navigate_uses_domain_timeout():
+    page = DummyPage()
+    policy = NavigationPolicy(strategy="domcontentloaded", timeout=10, domain_timeouts={"slow.com": 25})
+    assert await navigate(page, "https://www.slow.com/a", policy) == "ready"
+    assert page.goto_kwargs == {"wait_until": "domcontentloaded", "timeout": 25000}
+
+@pytest.mark.asyncio
+async def test_network_idle_wait_is_capped():
+    page = DummyPage()
+    await navigate(page, "https://example.com", NavigationPolicy(strategy="networkidle", network_idle_cap=2))
+    assert page.load_states == [("networkidle", 2000)]
+
+@pytest.mark.asyncio
+async def test_content_strategy_proceeds_when_content_never_appears():
+    page = DummyPage(content_ready=False)
+    assert await navigate(page, "https://example.com", NavigationPolicy(strategy="content")) == "timeout"
+    # the content wait has its own short cap rather than the whole deadline
+    assert page.content_timeout == 3000
+
+def test_unknown_strategy_rejected():
+    with pytest.raises(ValueError):
+        NavigationPolicy(strategy="idle")
+
+class DummyRequest:
+    resource_type = "xhr"
+
+class SettlePage(DummyPage):
+    """Page whose DOM is quiet at once; `request` starts while it is watched and finishes after `request_time`."""
+    def __init__(self, request=None, request_time=0.2, navigates=False):
+        super().__init__()
+        self.url = "https://example.com"
+        self.main_frame = object()
+        self.listeners = {}
+        self.request = request
+        self.request_time = request_time
+        self.navigates = navigates
+    def on(self, event, listener):
+        self.listeners.setdefault(event, []).append(listener)
+    def remove_listener(self, event, listener):
+        self.listeners[event].remove(listener)
+    def fire(self, event, arg):
+        for listener in list(self.listeners.get(event, [])):
+            listener(arg)
+    async def evaluate(self, script, arg=None):
+        if self.navigates:
+            raise RuntimeError("Execution context was destroyed")
+        if self.request:
+            self.fire("request", self.request)
+            asyncio.get_event_loop().call_later(self.request_time, self.fire, "requestfinished", self.request)
+            self.request = None
+        return True
+    async def wait_for_selector(self, selector, state="visible", timeout=None):
+        raise TimeoutError(selector)
+
+@pytest.mark.asyncio
+async def test_settle_returns_once_quiet():
+    page = SettlePage()
+    assert await settle(page, timeout=1) == "quiet"
+    assert all(not listeners for listeners in page.listeners.values())
+
+@pytest.mark.asyncio
+async def test_settle_waits_for_inflight_requests():
+    page = SettlePage(request=DummyRequest())
+    started = asyncio.get_event_loop().time()
+    assert await settle(page, timeout=2) == "quiet"
+    assert 0.15 < asyncio.get_event_loop().time() - started < 1
+
+@pytest.mark.asyncio
+async def test_settle_follows_navigation():
+    page = SettlePage(navigates=True)
+    assert await settle(page, timeout=1) == "navigation"
+    assert page.load_states[0][0] == "domcontentloaded"
+
+@pytest.mark.asyncio
+async def test_settle_selector_is_bounded():
+    assert await settle(SettlePage(), selector="#results", timeout=0.1) == "timeout"
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from src.minion_agent.browser.services.orchestrator import ai_web_scraper
 
@@ -36,3 +37,122 @@ async def test_ai_web_scraper():
     result = await ai_web_scraper("Test Question", dummy_browser, dummy_llm, dummy_gpt)
     # With dummy_llm always returning next_url, orchestrator should finish without a final outcome.
     assert "Scraper finished execution" in result
+
+
+class FanOutPage:
+    def __init__(self, context):
+        self.context = context
+        self.url = None
+        self.closed = False
+    async def close(self):
+        self.closed = True
+
+class FanOutContext:
+    def __init__(self):
+        self.pages = []
+    async def new_page(self):
+        page = FanOutPage(self)
+        self.pages.append(page)
+        return page
+
+class FanOutBrowser:
+    def __init__(self, page):
+        self.page = page
+    async def get_current_page(self):
+        return self.page
+    async def goto(self, url):
+        self.page.url = url
+
+@pytest.mark.asyncio
+async def test_fan_out_navigate_stops_on_final(monkeypatch):
+    from src.minion_agent.browser.services import orchestrator
+    from src.minion_agent.browser.utils.mcp_planner import MCPPlanner
+
+    async def fake_goto(self, url):
+        self.current_page.url = url
+
+    async def fake_extract(goal, browser, llm, target_selector=""):
+        page = await browser.get_current_page()
+        if page.url == "http://b.com":
+            return {"action": "final", "output": "answer"}
+        await asyncio.sleep(0.05)
+        return {"action": "next_url", "output": ""}
+
+    monkeypatch.setattr(orchestrator.BrowserWrapper, "goto", fake_goto)
+    monkeypatch.setattr(orchestrator, "extract_content", fake_extract)
+
+    context = FanOutContext()
+    browser = FanOutBrowser(FanOutPage(context))
+    planner = MCPPlanner(llm=None)
+    state = await orchestrator.fan_out_navigate(
+        "goal", browser, None, planner, "http://a.com", ["http://b.com", "http://c.com"], max_workers=3
+    )
+    assert state == "DONE"
+    # all dispatched URLs are marked visited, only the finished one is extracted
+    assert planner.context["visited_urls"] == ["http://a.com", "http://b.com", "http://c.com"]
+    assert [item["url"] for item in planner.context["extracted_content"]] == ["http://b.com"]
+    assert all(page.closed for page in context.pages)
+
+
+class HeldPrefetcher:
+    def __init__(self, held):
+        self.held = held
+    async def take(self, url):
+        return self.held.pop(url, None)
+
+@pytest.mark.asyncio
+async def test_fan_out_navigate_takes_prefetched_pages(monkeypatch):
+    from src.minion_agent.browser.services import orchestrator
+    from src.minion_agent.browser.utils.mcp_planner import MCPPlanner
+
+    loaded = []
+
+    async def fake_goto(self, url):
+        loaded.append(url)
+        self.current_page.url = url
+
+    async def fake_extract(goal, browser, llm, target_selector=""):
+        return {"action": "next_url", "output": ""}
+
+    monkeypatch.setattr(orchestrator.BrowserWrapper, "goto", fake_goto)
+    monkeypatch.setattr(orchestrator, "extract_content", fake_extract)
+
+    context = FanOutContext()
+    browser = FanOutBrowser(FanOutPage(context))
+    prefetched_page = FanOutPage(context)
+    prefetcher = HeldPrefetcher({"http://b.com": (prefetched_page, {"action": "next_url", "output": "b"})})
+    planner = MCPPlanner(llm=None)
+    state = await orchestrator.fan_out_navigate(
+        "goal", browser, None, planner, "http://a.com", ["http://b.com", "http://c.com"],
+        max_workers=3, prefetcher=prefetcher
+    )
+    assert state == "EXTRACTED"
+    # b.com comes from the prefetcher and is not loaded again
+    assert loaded == ["http://c.com"]
+    assert prefetched_page.closed
+    assert len(context.pages) == 1
+    extracted = {item["url"]: item for item in planner.context["extracted_content"]}
+    assert set(extracted) == {"http://a.com", "http://b.com", "http://c.com"}
+
+
+class SnapshotPage:
+    def __init__(self):
+        self.calls = []
+    async def evaluate(self, script, arg=None):
+        self.calls.append(arg)
+        return {"full": True, "elements": [
+            {"id": "e0", "kind": "checkbox", "text": "Direct only"},
+            {"id": "e1", "kind": "link", "text": "Pricing"},
+        ]}
+
+@pytest.mark.asyncio
+async def test_snapshot_interactive_elements_makes_one_round_trip():
+    from src.minion_agent.browser.services.orchestrator import snapshot_interactive_elements
+
+    page = SnapshotPage()
+    elements = await snapshot_interactive_elements(FanOutBrowser(page))
+    assert len(page.calls) == 1
+    assert elements == [
+        {"id": "e0", "kind": "checkbox", "text": "Direct only"},
+        {"id": "e1", "kind": "link", "text": "Pricing"},
+    ]
@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from src.minion_agent.browser.utils.page_extraction_llm import OpenAIPageExtractionLLM
+
+class RateLimitError(Exception):
+    status_code = 429
+
+class DummyLLM:
+    def __init__(self, delays=None, rate_limited_calls=0):
+        self.delays = delays or {}
+        self.rate_limited_calls = rate_limited_calls
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def ainvoke(self, input, functions, function_call):
+        self.calls += 1
+        if self.rate_limited_calls:
+            self.rate_limited_calls -= 1
+            raise RateLimitError("slow down")
+        if function_call["name"] == "decide_action":
+            return {"action": "final"}
+        chunk = input[-1]["content"].split("Page Content:\n", 1)[1]
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delays.get(chunk[0], 0))
+        self.in_flight -= 1
+        return {"action": "next_url", "summary": chunk[0], "key_points": [chunk[0]], "context": "", "output": chunk[0]}
+
+@pytest.mark.asyncio
+async def test_chunks_extracted_concurrently_and_merged_in_order(monkeypatch):
+    llm = DummyLLM(delays={"a": 0.03, "b": 0.0, "c": 0.01})
+    extractor = OpenAIPageExtractionLLM(llm, max_concurrency=2)
+    monkeypatch.setattr(extractor, "_chunk_content", lambda content: ["a", "b", "c"])
+    result = await extractor.extract_with_function_call("ignored", "goal")
+    assert result["key_points"] == ["a", "b", "c"]
+    assert result["output"] == "a\nb\nc\n"
+    assert result["action"] == "final"
+    assert llm.peak == 2
+
+@pytest.mark.asyncio
+async def test_rate_limited_calls_are_retried():
+    llm = DummyLLM(rate_limited_calls=2)
+    extractor = OpenAIPageExtractionLLM(llm, backoff_base=0.001)
+    result = await extractor.extract_with_function_call("x", "goal")
+    assert result["summary"] == "x\n"
+    assert llm.calls == 4
+
+@pytest.mark.asyncio
+async def test_rate_limit_gives_up_after_max_retries():
+    llm = DummyLLM(rate_limited_calls=10)
+    extractor = OpenAIPageExtractionLLM(llm, max_retries=1, backoff_base=0.001)
+    with pytest.raises(RateLimitError):
+        await extractor.extract_with_function_call("x", "goal")
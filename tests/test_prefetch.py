@@ -0,0 +1,45 @@
+import asyncio
+import pytest
+from src.minion_agent.browser.services import prefetch
+from src.minion_agent.browser.services.prefetch import Prefetcher
+from src.minion_agent.browser.utils.browser_wrapper import BrowserWrapper
+from tests.test_orchestrator import FanOutContext, FanOutPage
+
+@pytest.fixture
+def fake_loading(monkeypatch):
+    async def fake_goto(self, url):
+        self.current_page.url = url
+
+    async def fake_extract(goal, browser, llm, target_selector=""):
+        page = await browser.get_current_page()
+        await asyncio.sleep(0.01)
+        return {"action": "next_url", "output": f"content of {page.url}"}
+
+    monkeypatch.setattr(BrowserWrapper, "goto", fake_goto)
+    monkeypatch.setattr(prefetch, "extract_content", fake_extract)
+
+@pytest.mark.asyncio
+async def test_prefetch_adopts_chosen_url_and_discards_the_rest(fake_loading):
+    context = FanOutContext()
+    first_page = FanOutPage(context)
+    wrapper = BrowserWrapper(first_page)
+    prefetcher = Prefetcher("goal", wrapper, None, depth=2)
+
+    await prefetcher.start(["http://a.com", "http://b.com", "http://c.com"])
+    page, result = await prefetcher.take("http://a.com")
+    assert page.url == "http://a.com" and not page.closed
+    assert result["output"] == "content of http://a.com"
+    assert await prefetcher.take("http://a.com") is None
+
+    # b dropped out of the candidates, so its page is discarded
+    await prefetcher.start(["http://c.com"])
+    await asyncio.sleep(0.05)
+    await prefetcher.close()
+    assert [p.url for p in context.pages if p.closed] == ["http://b.com", "http://c.com"]
+    assert (prefetcher.hits, prefetcher.discarded) == (1, 2)
+
+    await wrapper.switch_to_page(page)
+    assert await wrapper.get_current_page() is page
+    # `page` follows the switch, the replaced page is closed
+    assert wrapper.page is page
+    assert first_page.closed
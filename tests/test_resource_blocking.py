@@ -0,0 +1,60 @@
+import pytest
+from src.minion_agent.browser.utils.resource_blocking import apply_resource_profile, is_blocked_host
+
+class DummyRequest:
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+class DummyRoute:
+    def __init__(self, url, resource_type):
+        self.request = DummyRequest(url, resource_type)
+        self.outcome = None
+    async def abort(self):
+        self.outcome = "abort"
+    async def continue_(self):
+        self.outcome = "continue"
+
+class DummyContext:
+    def __init__(self):
+        self.handlers = {}
+    async def route(self, pattern, handler):
+        self.handlers[pattern] = handler
+    async def unroute(self, pattern):
+        self.handlers.pop(pattern, None)
+
+def test_subdomains_are_blocked():
+    assert is_blocked_host("stats.g.doubleclick.net", ["doubleclick.net"])
+    assert not is_blocked_host("notdoubleclick.net", ["doubleclick.net"])
+
+@pytest.mark.asyncio
+async def test_no_media_profile_blocks_images_and_trackers():
+    context = DummyContext()
+    await apply_resource_profile(context, "no_media")
+    handler = context.handlers["**/*"]
+    outcomes = {}
+    for url, kind in [("https://site.com/a.png", "image"),
+                      ("https://site.com/", "document"),
+                      ("https://www.google-analytics.com/collect", "xhr"),
+                      ("https://site.com/app.css", "stylesheet")]:
+        route = DummyRoute(url, kind)
+        await handler(route)
+        outcomes[url] = route.outcome
+    assert outcomes == {
+        "https://site.com/a.png": "abort",
+        "https://site.com/": "continue",
+        "https://www.google-analytics.com/collect": "abort",
+        "https://site.com/app.css": "continue",
+    }
+
+@pytest.mark.asyncio
+async def test_full_profile_removes_previous_routing():
+    context = DummyContext()
+    await apply_resource_profile(context, "text_only")
+    await apply_resource_profile(context, "full")
+    assert context.handlers == {}
+
+@pytest.mark.asyncio
+async def test_unknown_profile_rejected():
+    with pytest.raises(ValueError):
+        await apply_resource_profile(DummyContext(), "images_only")
@@ -0,0 +1,82 @@
+import pytest
+from src.minion_agent.browser.services.search_backends import (
+    DuckDuckGoSearchBackend, SearchAggregator, SearchBackend, StubSearchBackend, canonicalize_url
+)
+
+def test_canonicalize_url_strips_noise():
+    assert canonicalize_url("HTTPS://www.Example.com/a/?utm_source=x&id=3&gclid=y#top") == "https://example.com/a?id=3"
+    assert canonicalize_url("https://example.com/a") == canonicalize_url("https://www.example.com/a/")
+
+def test_duckduckgo_redirect_links_are_decoded():
+    url = "https://duckduckgo.com/l/?uddg=https%3A%2F%2Fexample.com%2Fpage&rut=abc"
+    assert DuckDuckGoSearchBackend._decode_result_url(url) == "https://example.com/page"
+
+class FailingBackend(SearchBackend):
+    name = "failing"
+    requires_page = False
+    async def search(self, query, page=None, page_number=0):
+        raise RuntimeError("blocked")
+
+@pytest.mark.asyncio
+async def test_aggregator_merges_dedupes_and_caches():
+    first = StubSearchBackend({"*": [
+        {"title": "A", "url": "https://www.a.com/"},
+        {"title": "B", "url": "https://b.com/x?utm_medium=cpc"},
+    ]}, name="first")
+    second = StubSearchBackend({"*": [
+        {"title": "B again", "url": "http://b.com/x"},
+        {"title": "A again", "url": "https://a.com"},
+        {"title": "C", "url": "https://c.com"},
+    ]}, name="second")
+    aggregator = SearchAggregator([first, second, FailingBackend()])
+
+    results = await aggregator.search("query", browser=None)
+    assert [(r["title"], r["source"]) for r in results] == [
+        ("A", "first"), ("B again", "second"), ("C", "second")
+    ]
+    await aggregator.search("  QUERY ", browser=None)
+    assert (first.calls, second.calls) == (1, 1)
+
+@pytest.mark.asyncio
+async def test_aggregator_fetches_parallel_and_further_pages():
+    backend = StubSearchBackend({"q": [{"title": str(i), "url": f"https://s.com/{i}"} for i in range(7)]}, page_size=2)
+    aggregator = SearchAggregator([backend], pages_per_backend=2)
+    assert [r["title"] for r in await aggregator.search("q", browser=None)] == ["0", "1", "2", "3"]
+    assert [r["title"] for r in await aggregator.search_more(None, "q", 2)] == ["4", "5", "6"]
+    assert await aggregator.search_more(None, "q", 4) == []
+
+@pytest.mark.asyncio
+async def test_shared_aggregator_pages_each_query_independently():
+    backend = StubSearchBackend({
+        "a": [{"title": f"a{i}", "url": f"https://a.com/{i}"} for i in range(4)],
+        "b": [{"title": f"b{i}", "url": f"https://b.com/{i}"} for i in range(4)],
+    }, page_size=2)
+    aggregator = SearchAggregator([backend])
+    await aggregator.search("a", browser=None)
+    # another task searching in between does not redirect the first task's paging
+    await aggregator.search("b", browser=None)
+    assert [r["title"] for r in await aggregator.search_more(None, "a", 1)] == ["a2", "a3"]
+
+class ShortPageBackend(SearchBackend):
+    name = "short"
+    requires_page = False
+    results_per_page = 3
+    async def search(self, query, page=None, page_number=0):
+        return [{"title": f"s{page_number}", "url": f"https://s.com/{page_number * 3}"}]
+
+@pytest.mark.asyncio
+async def test_short_pages_keep_their_rank():
+    full = StubSearchBackend({"*": [{"title": f"y{i}", "url": f"https://y.com/{i}"} for i in range(6)]},
+                             page_size=3, name="full")
+    aggregator = SearchAggregator([ShortPageBackend(), full], pages_per_backend=2)
+    results = await aggregator.search("q", None)
+    assert [r["url"] for r in results] == [
+        "https://s.com/0", "https://y.com/0", "https://y.com/1", "https://y.com/2",
+        "https://s.com/3", "https://y.com/3", "https://y.com/4", "https://y.com/5",
+    ]
+
+def test_backend_without_search_fails_at_construction():
+    class Incomplete(SearchBackend):
+        name = "incomplete"
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,63 @@
+import logging
+from src.minion_agent.browser.utils import text_chunking
+from src.minion_agent.browser.utils.text_chunking import (
+    TokenCounter, chunk_markdown, context_window_for, split_markdown_blocks
+)
+
+class WordCounter:
+    """Counts whitespace-separated words as tokens, for deterministic tests."""
+    def count(self, text):
+        return len(text.split())
+    def split(self, text, max_tokens):
+        words = text.split()
+        return [" ".join(words[i:i + max_tokens]) for i in range(0, len(words), max_tokens)]
+
+def test_context_window_uses_longest_prefix():
+    assert context_window_for("gpt-4o-mini") == 128000
+    assert context_window_for("gpt-4-0613") == 8192
+    assert context_window_for("unknown-model") == context_window_for(None)
+
+def test_blocks_split_on_headings_paragraphs_and_tables():
+    text = "# Title\nintro line\n\npara one\n| a | b |\n|---|---|\n| 1 | 2 |\nafter table"
+    assert split_markdown_blocks(text) == [
+        "# Title",
+        "intro line",
+        "para one",
+        "| a | b |\n|---|---|\n| 1 | 2 |",
+        "after table",
+    ]
+
+def test_small_content_is_a_single_chunk():
+    assert chunk_markdown("just a few words", 100, counter=WordCounter()) == ["just a few words"]
+
+def test_chunks_respect_budget_and_block_boundaries():
+    paragraphs = [" ".join(f"p{i}w{j}" for j in range(8)) for i in range(6)]
+    chunks = chunk_markdown("\n\n".join(paragraphs), 20, counter=WordCounter())
+    assert len(chunks) == 3
+    for chunk in chunks:
+        # no paragraph is cut in half
+        assert all(part in paragraphs for part in chunk.split("\n\n"))
+
+def test_overlap_repeats_trailing_block():
+    paragraphs = [" ".join(f"p{i}w{j}" for j in range(8)) for i in range(4)]
+    chunks = chunk_markdown("\n\n".join(paragraphs), 20, counter=WordCounter(), overlap_tokens=10)
+    assert chunks[1].startswith(paragraphs[1])
+    assert paragraphs[1] in chunks[0]
+
+def test_oversized_table_keeps_header_in_every_piece():
+    rows = "\n".join(f"| r{i} | v{i} |" for i in range(30))
+    table = "| name | value |\n|---|---|\n" + rows
+    chunks = chunk_markdown(table, 40, counter=WordCounter())
+    assert len(chunks) > 1
+    assert all(chunk.startswith("| name | value |\n|---|---|") for chunk in chunks)
+
+def test_missing_tiktoken_warns_once_on_first_fallback(monkeypatch, caplog):
+    monkeypatch.setattr(text_chunking, "HAS_TIKTOKEN", False)
+    monkeypatch.setattr(text_chunking, "_warned_missing_tiktoken", False)
+    with caplog.at_level(logging.WARNING, logger=text_chunking.__name__):
+        first, second = TokenCounter("gpt-4o"), TokenCounter("gpt-4")
+    assert first.encoding is None and second.encoding is None
+    assert first.count("abcdefgh") == 2
+    warnings = [r for r in caplog.records if "tiktoken not found" in r.getMessage()]
+    assert len(warnings) == 1
+    assert warnings[0].name == text_chunking.__name__